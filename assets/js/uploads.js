@@ -0,0 +1,91 @@
+// رفع الملفات الكبيرة على أجزاء قابلة للاستئناف (الخادم: school/uploads.py)
+//
+//     const uploadId = await resumableUpload(file, fraction => { ... });
+//
+// ثم يرسل upload_id مع النموذج بدل الملف. إذا انقطع الاتصال يعاد الجزء الحالي فقط، وإذا أعيد
+// اختيار نفس الملف بعد إغلاق الصفحة يكمل الرفع من آخر جزء وصل للخادم.
+
+const UPLOAD_RETRIES = 5;
+
+function uploadStorageKey(file) {
+    return `upload:${file.name}:${file.size}:${file.lastModified}`;
+}
+
+async function uploadRequest(url, options) {
+    const response = await fetch(url, options);
+    const body = await response.json().catch(() => ({}));
+    if (!response.ok) {
+        const error = new Error(body.message || `HTTP ${response.status}`);
+        error.status = response.status;
+        throw error;
+    }
+    return body;
+}
+
+function sendUploadChunk(uploadId, offset, chunk, onLoaded) {
+    // XMLHttpRequest وليس fetch لمعرفة تقدم إرسال الجزء
+    return new Promise((resolve, reject) => {
+        const xhr = new XMLHttpRequest();
+        xhr.open('PATCH', `/admin/uploads/${uploadId}`);
+        xhr.setRequestHeader('Content-Type', 'application/octet-stream');
+        xhr.setRequestHeader('Upload-Offset', String(offset));
+        xhr.upload.onprogress = event => onLoaded(event.loaded);
+        xhr.onload = () => {
+            let body = {};
+            try {
+                body = JSON.parse(xhr.responseText);
+            } catch (e) {}
+            if (xhr.status === 200) {
+                resolve(body);
+                return;
+            }
+            const error = new Error(body.message || `HTTP ${xhr.status}`);
+            error.status = xhr.status;
+            error.offset = body.offset;
+            reject(error);
+        };
+        xhr.onerror = () => reject(new Error('انقطع الاتصال أثناء رفع الملف'));
+        xhr.send(chunk);
+    });
+}
+
+async function resumableUpload(file, onProgress) {
+    const key = uploadStorageKey(file);
+    let state = null;
+    const savedId = localStorage.getItem(key);
+    if (savedId) {
+        state = await uploadRequest(`/admin/uploads/${savedId}`).catch(() => null);
+    }
+    if (!state) {
+        state = await uploadRequest('/admin/uploads', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({filename: file.name, size: file.size})
+        });
+        localStorage.setItem(key, state.upload_id);
+    }
+
+    let offset = state.offset;
+    let retries = 0;
+    if (onProgress) onProgress(offset / (file.size || 1));
+    while (offset < file.size) {
+        const chunk = file.slice(offset, offset + state.chunk_size);
+        try {
+            const result = await sendUploadChunk(state.upload_id, offset, chunk,
+                loaded => onProgress && onProgress((offset + loaded) / file.size));
+            offset = result.offset;
+            retries = 0;
+        } catch (error) {
+            // 409: الخادم يحدد الإزاحة الصحيحة؛ 403/404/413 لا فائدة من إعادتها
+            if ([403, 404, 413].includes(error.status) || ++retries > UPLOAD_RETRIES) {
+                if (error.status === 404) localStorage.removeItem(key);
+                throw error;
+            }
+            if (error.offset !== undefined) offset = error.offset;
+            await new Promise(resolve => setTimeout(resolve, 1000 * retries));
+        }
+    }
+    localStorage.removeItem(key);
+    if (onProgress) onProgress(1);
+    return state.upload_id;
+}
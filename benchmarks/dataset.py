@@ -0,0 +1,200 @@
+"""توليد قاعدة بيانات تجريبية بأحجام واقعية لقياس الأداء
+
+الاستخدام:
+    python benchmarks/dataset.py --db /tmp/school-bench.db            # الأحجام الافتراضية
+    python benchmarks/dataset.py --db /tmp/school-bench.db --scale 5  # خمسة أضعاف
+
+البيانات عشوائية بنواة ثابتة (--seed) فتتطابق بين التشغيلات والفروع. ملفات الوسائط
+(صور الأخبار والأنشطة) مسجلة في الجداول فقط ولا تنشأ على القرص، فالقياس لقاعدة
+البيانات وعرض القوالب وليس لقراءة الملفات.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# عدد السجلات عند --scale 1 (مدرسة متوسطة الحجم)
+BASE_VOLUMES = {
+    'students': 3000,
+    'seats': 3000,
+    'inquiries': 4000,
+    'users': 120,
+    'observers': 300,
+    'news': 300,
+    'activities': 200,
+    'media_per_activity': 6,
+    'materials': 500,
+    'calendar_events': 150,
+    'activity_log': 50000,
+}
+
+FIRST_NAMES = ['محمد', 'أحمد', 'عبدالله', 'خالد', 'فهد', 'سعود', 'يوسف', 'علي', 'حمد', 'ناصر', 'سالم', 'عمر']
+FAMILY_NAMES = ['العتيبي', 'المطيري', 'الرشيدي', 'العنزي', 'الشمري', 'الهاجري', 'العجمي', 'الدوسري', 'الكندري', 'الصباح']
+GRADES = ['العاشر', 'الحادي عشر', 'الثاني عشر']
+SECTIONS = [str(i) for i in range(1, 11)]
+SUBJECTS = ['اللغة العربية', 'اللغة الإنجليزية', 'الرياضيات', 'الفيزياء', 'الكيمياء', 'الأحياء', 'التربية الإسلامية', 'الاجتماعيات']
+COMMITTEES = ['الأولى', 'الثانية', 'الثالثة', 'الرابعة', 'الخامسة', 'السادسة']
+LOG_TABLES = ['users', 'seats', 'observers', 'students', 'news', 'school_activities', 'educational_materials', 'inquiries']
+PARAGRAPH = ('تقيم المدرسة هذا الأسبوع برنامجاً متكاملاً يشارك فيه الطلاب والمعلمون، '
+             'ويهدف إلى تنمية المهارات وتعزيز روح التعاون والعمل الجماعي داخل المجتمع المدرسي. ')
+
+
+def _name(rng):
+    return f'{rng.choice(FIRST_NAMES)} {rng.choice(FIRST_NAMES)} {rng.choice(FAMILY_NAMES)}'
+
+
+def _civil_id(index, prefix='3'):
+    return f'{prefix}{index:011d}'
+
+
+# عدد كلمات مرور الطلاب المختلفة: تشفير كل طالب على حدة يجعل التوليد يستغرق دقائق
+STUDENT_PASSWORDS = 50
+
+
+def student_password(civil_id):
+    """كلمة مرور الطالب المولدة (لاستخدامها في سيناريو تسجيل الدخول)"""
+    return str(100000 + int(civil_id) % STUDENT_PASSWORDS)
+
+
+def volumes_for(scale):
+    return {key: value if key == 'media_per_activity' else max(1, int(value * scale))
+            for key, value in BASE_VOLUMES.items()}
+
+
+def populate(volumes, seed=1):
+    """ملء قاعدة البيانات الحالية (داخل سياق التطبيق) بالبيانات المولدة"""
+    from sqlalchemy import insert
+    from werkzeug.security import generate_password_hash
+    from school.passwords import hash_student_passwords
+    from school.models import (db, ActivityLog, ActivityMedia, CalendarEvent, EducationalMaterial, Inquiry,
+                               News, Observer, Seat, Student, Subject, User, SchoolActivity)
+
+    rng = random.Random(seed)
+    now = datetime(2025, 1, 1, 8, 0)
+
+    def bulk(model, rows):
+        for start in range(0, len(rows), 5000):
+            db.session.execute(insert(model), rows[start:start + 5000])
+
+    plain_passwords = [str(100000 + i) for i in range(STUDENT_PASSWORDS)]
+    hashed_passwords = dict(zip(plain_passwords, hash_student_passwords(plain_passwords)))
+    students = []
+    for i in range(volumes['students']):
+        civil_id = _civil_id(i)
+        students.append({'civil_id': civil_id, 'name': _name(rng), 'grade': rng.choice(GRADES),
+                         'section': rng.choice(SECTIONS), 'password': student_password(civil_id)})
+    bulk(Student, [dict(s, password=hashed_passwords[s['password']]) for s in students])
+
+    bulk(Seat, [{'civil_id': s['civil_id'], 'name': s['name'], 'seat_number': str(1000 + i),
+                 'main_committee': rng.choice(COMMITTEES), 'sub_committee': rng.choice(SECTIONS),
+                 'location': f'المبنى {rng.randint(1, 4)} - الدور {rng.randint(1, 3)}'}
+                for i, s in enumerate(students[:volumes['seats']])])
+
+    # كلمة مرور واحدة مشفرة لكل المستخدمين حتى لا يستغرق التوليد دقائق
+    staff_password = generate_password_hash('bench-password')
+    users = [{'civil_id': _civil_id(0, '2'), 'name': 'مشرف القياس', 'subject': 'الإدارة',
+              'password': staff_password, 'role': 'مشرف', 'job_title': 'مدير'}]
+    users += [{'civil_id': _civil_id(i, '2'), 'name': _name(rng), 'subject': rng.choice(SUBJECTS),
+               'password': staff_password, 'role': 'عادي', 'job_title': 'معلم'}
+              for i in range(1, volumes['users'])]
+    bulk(User, users)
+
+    bulk(Observer, [{'civil_id': rng.choice(users)['civil_id'], 'name': _name(rng), 'subject': rng.choice(SUBJECTS),
+                     'assignment': rng.choice(['ملاحظ', 'رئيس لجنة']), 'main_committee': rng.choice(COMMITTEES),
+                     'sub_committee': rng.choice(SECTIONS), 'location': 'المبنى الرئيسي',
+                     'day': rng.choice(['الأحد', 'الاثنين', 'الثلاثاء', 'الأربعاء', 'الخميس']),
+                     'date': (date(2025, 1, 5) + timedelta(days=rng.randint(0, 10))).isoformat()}
+                    for _ in range(volumes['observers'])])
+
+    bulk(Inquiry, [{'student_civil_id': s['civil_id'], 'student_name': s['name'], 'student_grade': s['grade'],
+                    'student_section': s['section'], 'user_type': rng.choice(['طالب', 'طالب', 'معلم']),
+                    'message_type': rng.choice(['استفسار', 'شكوى', 'مقترح']), 'title': f'استفسار رقم {i}',
+                    'message': PARAGRAPH * rng.randint(1, 4), 'phone': f'9{rng.randint(1000000, 9999999)}',
+                    'status': rng.choice(['قيد المراجعة', 'تم الرد']),
+                    'response': PARAGRAPH if rng.random() < 0.5 else None, 'is_read': rng.random() < 0.5,
+                    'submission_date': now - timedelta(minutes=rng.randint(0, 60 * 24 * 180)),
+                    'last_updated': now}
+                   for i, s in enumerate(rng.choices(students, k=volumes['inquiries']))])
+
+    bulk(News, [{'title': f'خبر مدرسي رقم {i}', 'details': f'<p>{PARAGRAPH * rng.randint(2, 8)}</p>',
+                 'image': f'bench_news_{i}.jpg', 'cover_image': f'bench_news_{i}.jpg',
+                 'excerpt': PARAGRAPH[:200], 'date': (date(2024, 9, 1) + timedelta(days=i % 240)).isoformat()}
+                for i in range(volumes['news'])])
+
+    bulk(SchoolActivity, [{'id': i + 1, 'name': f'نشاط مدرسي رقم {i}', 'description': PARAGRAPH,
+                           'activity_date': date(2024, 9, 1) + timedelta(days=rng.randint(0, 240)), 'upload_date': now}
+                          for i in range(volumes['activities'])])
+    media = []
+    for activity_id in range(1, volumes['activities'] + 1):
+        for order in range(volumes['media_per_activity']):
+            is_video = rng.random() < 0.2
+            name = f'bench_{activity_id}_{order}.{"mp4" if is_video else "jpg"}'
+            media.append({'activity_id': activity_id, 'media_type': 'فيديو' if is_video else 'صورة',
+                          'file_path': name, 'file_name': name,
+                          'thumbnail_path': f'thumb_{name}.jpg' if is_video else None,
+                          'is_primary': order == 0, 'display_order': order, 'upload_date': now})
+    bulk(ActivityMedia, media)
+
+    stages = ['المرحلة المتوسطة', 'المرحلة الثانوية']
+    bulk(Subject, [{'stage': stage, 'subject': subject} for stage in stages for subject in SUBJECTS])
+    bulk(EducationalMaterial, [{'stage': rng.choice(stages), 'subject': rng.choice(SUBJECTS),
+                                'title': f'مادة تعليمية رقم {i}', 'description': PARAGRAPH * 2,
+                                'material_type': 'PDF' if i % 3 else 'فيديو',
+                                'file_path': f'bench_material_{i}.pdf' if i % 3 else None,
+                                'video_url': None if i % 3 else 'https://www.youtube.com/watch?v=dQw4w9WgXcQ',
+                                'upload_date': now - timedelta(days=i % 200)}
+                               for i in range(volumes['materials'])])
+
+    bulk(CalendarEvent, [{'title': f'حدث رقم {i}', 'event_type': rng.choice(['exam', 'activity', 'holiday', 'meeting']),
+                          'start_date': date(2024, 9, 1) + timedelta(days=i % 280),
+                          'end_date': date(2024, 9, 1) + timedelta(days=i % 280 + rng.randint(0, 3)),
+                          'location': 'المدرسة', 'description': PARAGRAPH, 'created_at': now, 'updated_at': now}
+                         for i in range(volumes['calendar_events'])])
+
+    bulk(ActivityLog, [{'operation_type': rng.choice(['إضافة', 'تعديل', 'حذف']), 'table_name': rng.choice(LOG_TABLES),
+                        'record_id': str(rng.randint(1, 5000)), 'user_civil_id': user['civil_id'],
+                        'user_name': user['name'], 'user_subject': user['subject'], 'user_job_title': user['job_title'],
+                        'old_data': json.dumps({'name': user['name']}, ensure_ascii=False),
+                        'new_data': json.dumps({'name': user['name'], 'index': i}, ensure_ascii=False),
+                        'description': f'عملية رقم {i}', 'ip_address': '10.0.0.1', 'user_agent': 'Mozilla/5.0',
+                        'created_at': now - timedelta(seconds=i * 37)}
+                       for i, user in enumerate(rng.choices(users[:20], k=volumes['activity_log']))])
+    db.session.commit()
+
+
+def generate(path, scale=1.0, seed=1):
+    """إنشاء قاعدة بيانات جديدة في path بالترحيلات الحالية ثم ملؤها، وإرجاع أعداد السجلات"""
+    from school import create_app
+    from school.helpers import get_school_settings
+    from school.migrations import run_migrations
+
+    path = os.path.abspath(path)
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}', 'PROFILING_ENABLED': False})
+    volumes = volumes_for(scale)
+    with app.app_context():
+        run_migrations()
+        get_school_settings()
+        populate(volumes, seed)
+    return volumes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', required=True, help='مسار ملف قاعدة البيانات (يستبدل إن وجد)')
+    parser.add_argument('--scale', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    volumes = generate(args.db, args.scale, args.seed)
+    print(json.dumps(volumes, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""قياس ضغط الصور المرفوعة (compress_image): الزمن وذاكرة العملية لصور جوال بأحجام مختلفة
+
+الاستخدام:
+    python benchmarks/images.py                    # صور مولدة 12 و 48 ميغابكسل
+    python benchmarks/images.py --photos ~/Pictures --repeat 3
+
+يقارن الطريقة الحالية (فك JPEG بدقة مخفضة ثم التدوير حسب EXIF، وكتابة واحدة من الرفع) بالطريقة
+السابقة (حفظ الرفع ثم إعادة كتابته في مكانه، دون تدوير) وبالتدوير قبل التصغير الذي يفك الصورة
+بدقتها الكاملة. كل طريقة في عملية جديدة حتى تكون ذروة الذاكرة (VmHWM) لها وحدها.
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (الاسم، العرض، الارتفاع): مقاسات كاميرات الجوال الشائعة
+SAMPLE_PHOTOS = [
+    ('phone_12mp', 4032, 3024),
+    ('phone_48mp', 8064, 6048),
+]
+
+# يضغط كل صورة بالطريقة المطلوبة ويطبع الأزمنة وذروة الذاكرة
+PROBE = r'''
+import io, json, os, shutil, sys, tempfile, time
+from PIL import Image, ImageOps
+sys.path.insert(0, os.getcwd())
+from school.helpers import compress_image
+
+def previous(data, workdir):
+    # الرفع يحفظ كما هو ثم يعاد فتحه وكتابته في مكانه
+    path = os.path.join(workdir, 'upload.jpg')
+    with open(path, 'wb') as f:
+        f.write(data)
+    with Image.open(path) as img:
+        if img.mode in ('RGBA', 'LA', 'P'):
+            img = img.convert('RGB')
+        img.thumbnail((800, 600), Image.Resampling.LANCZOS)
+        img.save(path, 'JPEG', quality=85, optimize=True)
+    return path
+
+def full_decode(data, workdir):
+    # التدوير حسب EXIF قبل التصغير يفك الصورة بدقتها الكاملة
+    path = os.path.join(workdir, 'output.jpg')
+    with Image.open(io.BytesIO(data)) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+        img.thumbnail((800, 600), Image.Resampling.LANCZOS)
+        img.save(path, 'JPEG', quality=85, optimize=True)
+    return path
+
+def current(data, workdir):
+    path = os.path.join(workdir, 'output.jpg')
+    compress_image(io.BytesIO(data), path)
+    return path
+
+def peak_rss_mb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) / 1024
+    return 0
+
+method = {'previous': previous, 'full_decode': full_decode, 'current': current}[sys.argv[1]]
+repeat = int(sys.argv[2])
+results = {}
+baseline_mb = peak_rss_mb()
+for photo in sys.argv[3:]:
+    with open(photo, 'rb') as f:
+        data = f.read()
+    workdir = tempfile.mkdtemp()
+    try:
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            output = method(data, workdir)
+            samples.append((time.perf_counter() - start) * 1000)
+        with Image.open(output) as img:
+            size = img.size
+    finally:
+        shutil.rmtree(workdir)
+    results[os.path.basename(photo)] = {'ms': samples, 'size': size}
+print(json.dumps({'photos': results, 'peak_rss_mb': peak_rss_mb() - baseline_mb}))
+'''
+
+METHODS = ('previous', 'full_decode', 'current')
+
+
+def generate_photos(directory):
+    """صور JPEG بتدرج وتشويش (حجم ملف قريب من صور الكاميرا) مع EXIF بتدوير 90 درجة كصور الجوال العمودية"""
+    from PIL import Image
+    paths = []
+    for name, width, height in SAMPLE_PHOTOS:
+        gradient = Image.linear_gradient('L').resize((width, height))
+        img = Image.merge('RGB', (gradient, Image.effect_noise((width, height), 40), gradient.transpose(Image.Transpose.ROTATE_180)))
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        exif[0x010F] = 'Benchmark'
+        path = os.path.join(directory, f'{name}.jpg')
+        img.save(path, 'JPEG', quality=90, exif=exif)
+        paths.append(path)
+    return paths
+
+
+def run_method(method, repeat, photos):
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE, method, str(repeat)] + photos,
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--photos', help='مجلد صور JPEG حقيقية بدلاً من الصور المولدة')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.photos:
+            photos = sorted(glob.glob(os.path.join(os.path.expanduser(args.photos), '*.[jJ][pP]*[gG]')))
+            if not photos:
+                parser.error(f'لا توجد صور JPEG في {args.photos}')
+        else:
+            photos = generate_photos(directory)
+        results = {method: run_method(method, args.repeat, photos) for method in METHODS}
+
+    report = {}
+    for method, result in results.items():
+        report[method] = {
+            'peak_rss_mb': round(result['peak_rss_mb'], 1),
+            'photos': {name: {'ms_median': round(statistics.median(photo['ms']), 1), 'output': photo['size']}
+                       for name, photo in result['photos'].items()},
+        }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    for name in report['current']['photos']:
+        previous = report['previous']['photos'][name]['ms_median']
+        full = report['full_decode']['photos'][name]['ms_median']
+        current = report['current']['photos'][name]['ms_median']
+        print(f"{name}: {current:.0f} ms (السابقة {previous:.0f} ms، التدوير قبل التصغير {full:.0f} ms)")
+
+
+if __name__ == '__main__':
+    main()
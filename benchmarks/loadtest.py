@@ -0,0 +1,157 @@
+"""اختبار حمل محلي لعدد الطلبات في الثانية على الصفحات العامة وصفحات الطالب
+
+يشغل gunicorn (wsgi:app) بعدد مختلف من العمال، ويرسل الطلبات من عدة خيوط لمدة
+محددة، ثم يطبع جدولاً بعدد الطلبات في الثانية وزمن الاستجابة لكل مجموعة صفحات.
+
+الاستخدام:
+    python benchmarks/loadtest.py --workers 1,2,4 --threads 4 --duration 15
+    python benchmarks/loadtest.py --student-civil-id 123 --student-password 456
+    python benchmarks/loadtest.py --url http://127.0.0.1:8000   # خادم يعمل مسبقاً
+
+بدون بيانات طالب تختبر الصفحات العامة فقط. يفضل تشغيله على نسخة من قاعدة البيانات
+(DATABASE_URL=sqlite:////tmp/school-copy.db) لأن تسجيل الدخول يكتب في الجلسات والسجل.
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PUBLIC_ROUTES = ['/', '/news_all', '/activities', '/calendar']
+STUDENT_ROUTES = ['/student_home', '/student_seat', '/student_materials', '/api/student_materials']
+
+
+def wait_for_port(host, port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'الخادم لم يبدأ على {host}:{port}')
+
+
+def start_server(workers, threads, port):
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), WEB_THREADS=str(threads),
+               BIND=f'127.0.0.1:{port}', ACCESS_LOG='/dev/null', LOG_LEVEL='warning')
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    wait_for_port('127.0.0.1', port)
+    return process
+
+
+def student_cookie(host, port, civil_id, password):
+    """تسجيل دخول الطالب مرة واحدة وإرجاع كوكي الجلسة"""
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    body = urllib.parse.urlencode({'civil_id': civil_id, 'password': password})
+    conn.request('POST', '/student_login', body, {'Content-Type': 'application/x-www-form-urlencoded'})
+    response = conn.getresponse()
+    response.read()
+    cookie = response.getheader('Set-Cookie', '').split(';')[0]
+    if response.status != 302 or not cookie:
+        raise RuntimeError('فشل تسجيل دخول الطالب: تحقق من الرقم المدني وكلمة المرور')
+    return cookie
+
+
+def hammer(host, port, routes, headers, deadline):
+    """حلقة طلبات على اتصال واحد مستمر حتى انتهاء المدة"""
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    latencies, errors, index = [], 0, 0
+    while time.monotonic() < deadline:
+        path = routes[index % len(routes)]
+        index += 1
+        start = time.perf_counter()
+        try:
+            conn.request('GET', path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors += 1
+        except (OSError, http.client.HTTPException) as e:
+            # إغلاق اتصال keep-alive عند إعادة تدوير العامل (max_requests) ليس خطأ في الطلب
+            if not isinstance(e, (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)):
+                errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+    return latencies, errors
+
+
+def run_load(host, port, routes, headers, concurrency, duration):
+    deadline = time.monotonic() + duration
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: hammer(host, port, routes, headers, deadline), range(concurrency)))
+    latencies = sorted(l for lat, _ in results for l in lat)
+    errors = sum(err for _, err in results)
+    if not latencies:
+        return {'rps': 0, 'requests': 0, 'errors': errors}
+    return {
+        'rps': round(len(latencies) / duration, 1),
+        'requests': len(latencies),
+        'errors': errors,
+        'p50_ms': round(statistics.median(latencies) * 1000, 1),
+        'p95_ms': round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', default='1,2,4', help='أعداد العمال مفصولة بفواصل')
+    parser.add_argument('--threads', type=int, default=4, help='الخيوط لكل عامل')
+    parser.add_argument('--concurrency', type=int, default=16, help='عدد العملاء المتزامنين')
+    parser.add_argument('--duration', type=float, default=10, help='مدة كل اختبار بالثواني')
+    parser.add_argument('--port', type=int, default=8100)
+    parser.add_argument('--url', help='اختبار خادم يعمل مسبقاً بدلاً من تشغيل gunicorn')
+    parser.add_argument('--student-civil-id', default=os.environ.get('LOADTEST_STUDENT_CIVIL_ID'))
+    parser.add_argument('--student-password', default=os.environ.get('LOADTEST_STUDENT_PASSWORD'))
+    parser.add_argument('--json', action='store_true', help='طباعة النتائج بصيغة JSON')
+    args = parser.parse_args()
+
+    if args.url:
+        parsed = urllib.parse.urlparse(args.url)
+        targets = [('existing', parsed.hostname, parsed.port or 80)]
+    else:
+        targets = [(int(n), '127.0.0.1', args.port) for n in args.workers.split(',')]
+
+    report = []
+    for workers, host, port in targets:
+        process = None if args.url else start_server(workers, args.threads, port)
+        try:
+            groups = [('public', PUBLIC_ROUTES, {})]
+            if args.student_civil_id and args.student_password:
+                cookie = student_cookie(host, port, args.student_civil_id, args.student_password)
+                groups.append(('student', STUDENT_ROUTES, {'Cookie': cookie}))
+            for name, routes, headers in groups:
+                # تسخين: تحميل القوالب وفتح الاتصالات قبل القياس
+                run_load(host, port, routes, headers, 2, 1)
+                result = run_load(host, port, routes, headers, args.concurrency, args.duration)
+                result.update({'workers': workers, 'threads': args.threads, 'group': name})
+                report.append(result)
+                if not args.json:
+                    print(f"workers={workers:<8} threads={args.threads:<3} {name:<8} "
+                          f"{result['rps']:>8} req/s  p50={result.get('p50_ms', '-')}ms  "
+                          f"p95={result.get('p95_ms', '-')}ms  errors={result['errors']}")
+        finally:
+            if process:
+                process.terminate()
+                process.wait()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""قياس زمن استيراد التطبيق وذاكرة العامل (RSS) عند الإقلاع البارد
+
+الاستخدام:
+    python benchmarks/startup.py            # 5 تشغيلات لكل وضع
+    python benchmarks/startup.py --runs 10
+
+يقارن الوضع الحالي (الاستيراد عند أول استخدام) بالوضع السابق الذي كان يستورد
+pandas وcv2 وPIL مع تحميل app.py. كل تشغيل في عملية جديدة حتى يكون الاستيراد باردا.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# يطبع زمن الاستيراد وذاكرة العملية بعد تحميل التطبيق كما يفعل عامل gunicorn
+PROBE = r'''
+import json, sys, time
+start = time.perf_counter()
+for name in sys.argv[1:]:
+    __import__(name)
+import app
+elapsed = time.perf_counter() - start
+rss_kb = 0
+with open('/proc/self/status') as f:
+    for line in f:
+        if line.startswith('VmRSS:'):
+            rss_kb = int(line.split()[1])
+print(json.dumps({'import_ms': elapsed * 1000, 'rss_mb': rss_kb / 1024,
+                  'heavy_loaded': [m for m in ('pandas', 'cv2', 'PIL') if m in sys.modules]}))
+'''
+
+MODES = {
+    'lazy': [],
+    'eager': ['pandas', 'cv2', 'PIL.Image'],
+}
+
+
+def run_once(preload):
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE] + preload,
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    # app.py يطبع رسائل أثناء الإقلاع، والسطر الأخير هو نتيجة القياس
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    report = {}
+    for mode, preload in MODES.items():
+        samples = [run_once(preload) for _ in range(args.runs)]
+        import_ms = [s['import_ms'] for s in samples]
+        rss_mb = [s['rss_mb'] for s in samples]
+        report[mode] = {
+            'import_ms_median': round(statistics.median(import_ms), 1),
+            'import_ms_min': round(min(import_ms), 1),
+            'rss_mb_median': round(statistics.median(rss_mb), 1),
+            'heavy_loaded': samples[-1]['heavy_loaded'],
+        }
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    saved_ms = report['eager']['import_ms_median'] - report['lazy']['import_ms_median']
+    saved_mb = report['eager']['rss_mb_median'] - report['lazy']['rss_mb_median']
+    print(f"التوفير لكل عامل: {saved_ms:.0f} ms و {saved_mb:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+"""مجموعة قياس أداء المسارات الأساسية على بيانات مولدة، بنتائج JSON للمقارنة بين الإصدارات
+
+الاستخدام:
+    python benchmarks/suite.py --output results.json
+    python benchmarks/suite.py --scale 5 --repeat 20 --only home,admin_inquiries
+    python benchmarks/suite.py --compare results.json     # مقارنة بنتيجة سابقة (مثلاً من الفرع الرئيسي)
+
+يولد قاعدة البيانات مرة واحدة (benchmarks/dataset.py) ويحفظها في --db، ثم ينسخها قبل كل
+تشغيل حتى لا تؤثر سيناريوهات الرفع على التشغيلات اللاحقة. كل سيناريو يُنفذ عبر Flask
+test client داخل العملية نفسها، فالقياس لكود التطبيق وقاعدة البيانات والقوالب دون الشبكة.
+عدد الاستعلامات وزمنها يؤخذان من رأس Server-Timing (school/profiling.py).
+
+عند --compare يكون رمز الخروج 1 إذا تباطأ أي سيناريو أكثر من --threshold.
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import platform
+import re
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import dataset  # noqa: E402  (benchmarks/dataset.py)
+
+
+def _excel(columns, rows):
+    import pandas as pd
+    output = io.BytesIO()
+    pd.DataFrame(rows, columns=columns).to_excel(output, index=False, engine='openpyxl')
+    return output.getvalue()
+
+
+# ملفات الإكسل بأرقام مدنية جديدة في كل تكرار حتى تضيف كل عملية رفع صفوفاً فعلاً
+def students_excel(run, rows):
+    return _excel(['الرقم المدني', 'اسم الطالب', 'الصف', 'الشعبة', 'كلمة المرور'],
+                  [[dataset._civil_id(run * rows + i, '4'), 'طالب تجريبي', 'العاشر', '1', '123456'] for i in range(rows)])
+
+
+def seats_excel(run, rows):
+    return _excel(['الرقم المدني', 'الاسم', 'رقم الجلوس', 'اللجنة الرئيسية', 'اللجنة الفرعية', 'موقع اللجنة'],
+                  [[dataset._civil_id(run * rows + i, '5'), 'طالب تجريبي', str(i), 'الأولى', '1', 'المبنى 1'] for i in range(rows)])
+
+
+def observers_excel(run, rows):
+    return _excel(['الرقم المدني', 'الاسم', 'المادة', 'التكليف', 'اللجنة الرئيسية', 'اللجنة الفرعية', 'موقع اللجنة', 'اليوم', 'التاريخ'],
+                  [[dataset._civil_id(run * rows + i, '6'), 'ملاحظ تجريبي', 'الرياضيات', 'ملاحظ', 'الأولى', '1', 'المبنى 1', 'الأحد', '2025-01-05']
+                   for i in range(rows)])
+
+
+def users_excel(run, rows):
+    return _excel(['الرقم المدني', 'الاسم', 'المادة', 'كلمة المرور', 'الصلاحية', 'المسمى الوظيفي'],
+                  [[dataset._civil_id(run * rows + i, '7'), 'معلم تجريبي', 'الرياضيات', 'password', 'عادي', 'معلم'] for i in range(rows)])
+
+
+# (الاسم، الطريقة، المسار، الجلسة، الحالة المتوقعة، مولد ملف الإكسل، نسبة صفوف الإكسل)
+# تشفير كلمات المرور بطيء عمداً، لذلك يرفع سيناريو الطلاب خُمس الصفوف والمستخدمين عُشرها
+SCENARIOS = [
+    ('home', 'GET', '/', None, 200, None, 0),
+    ('activities_gallery', 'GET', '/activities', None, 200, None, 0),
+    ('student_login', 'POST', '/student_login', None, 302, None, 0),
+    ('student_seat', 'GET', '/student_seat', 'student', 200, None, 0),
+    ('admin_inquiries', 'GET', '/admin/inquiries', 'admin', 200, None, 0),
+    ('admin_activity_log', 'GET', '/admin/activity_log', 'admin', 200, None, 0),
+    ('admin_activity_log_deep_page', 'GET', '/admin/activity_log?page=500', 'admin', 200, None, 0),
+    ('export_seats', 'GET', '/admin/seats/export', 'admin', 200, None, 0),
+    ('upload_students', 'POST', '/admin/students/upload', 'admin', 302, students_excel, 0.2),
+    ('upload_seats', 'POST', '/admin/seats/upload', 'admin', 302, seats_excel, 1),
+    ('upload_observers', 'POST', '/admin/observers/upload', 'admin', 302, observers_excel, 1),
+    ('upload_users', 'POST', '/admin/users/upload', 'admin', 302, users_excel, 0.1),
+]
+
+SERVER_TIMING_DB = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+
+def git_revision():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ('-dirty' if dirty else '')
+
+
+def copy_database(source, target):
+    """نسخ قاعدة البيانات عبر backup في SQLite (يشمل ما في ملف WAL)"""
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(target + suffix):
+            os.remove(target + suffix)
+    src, dst = sqlite3.connect(source), sqlite3.connect(target)
+    with dst:
+        src.backup(dst)
+    src.close()
+    dst.close()
+
+
+def make_clients(app, student_civil_id):
+    anonymous = app.test_client()
+    student = app.test_client()
+    with student.session_transaction() as session:
+        session['student_civil_id'] = student_civil_id
+    admin = app.test_client()
+    with admin.session_transaction() as session:
+        session.update({'civil_id': dataset._civil_id(0, '2'), 'name': 'مشرف القياس', 'role': 'مشرف'})
+    return {None: anonymous, 'student': student, 'admin': admin}
+
+
+def run_scenario(clients, scenario, repeat, warmup, excel_rows, student_civil_id):
+    name, method, path, session_kind, expected_status, excel_factory, rows_ratio = scenario
+    client = clients[session_kind]
+    rows = max(1, int(excel_rows * rows_ratio))
+    # تجهيز ملفات الإكسل خارج القياس
+    payloads = [excel_factory(run, rows) if excel_factory else None for run in range(warmup + repeat)]
+    timings, queries, sql_ms, failures = [], [], [], 0
+    for run, payload in enumerate(payloads):
+        if payload is not None:
+            data = {'excel_file': (io.BytesIO(payload), f'{name}.xlsx')}
+        elif name == 'student_login':
+            data = {'civil_id': student_civil_id, 'password': dataset.student_password(student_civil_id)}
+        else:
+            data = None
+        start = time.perf_counter()
+        response = client.open(path, method=method, data=data)
+        response.get_data()
+        elapsed = time.perf_counter() - start
+        if run < warmup:
+            continue
+        if response.status_code != expected_status:
+            failures += 1
+        timings.append(elapsed * 1000)
+        match = SERVER_TIMING_DB.search(response.headers.get('Server-Timing', ''))
+        if match:
+            sql_ms.append(float(match.group(1)))
+            queries.append(int(match.group(2)))
+    timings.sort()
+    result = {
+        'runs': len(timings),
+        'failures': failures,
+        'min_ms': round(timings[0], 2),
+        'median_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(timings[max(0, int(round(0.95 * len(timings))) - 1)], 2),
+        'max_ms': round(timings[-1], 2),
+    }
+    if queries:
+        result['sql_queries'] = round(statistics.mean(queries), 1)
+        result['sql_ms'] = round(statistics.median(sql_ms), 2)
+    if excel_factory:
+        result['excel_rows'] = rows
+        result['rows_per_second'] = round(rows / (result['median_ms'] / 1000), 1)
+    return result
+
+
+def compare(report, baseline, threshold):
+    """طباعة الفرق عن نتيجة سابقة وإرجاع أسماء السيناريوهات المتباطئة"""
+    regressions = []
+    print(f"\nمقارنة مع {baseline['meta'].get('commit')}:", file=sys.stderr)
+    for name, result in report['scenarios'].items():
+        old = baseline['scenarios'].get(name)
+        if not old:
+            continue
+        change = (result['median_ms'] - old['median_ms']) / old['median_ms'] * 100
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = '  << تباطؤ'
+        print(f"  {name:<30} {old['median_ms']:>9.2f} -> {result['median_ms']:>9.2f} ms  {change:+6.1f}%{flag}", file=sys.stderr)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', help='قاعدة البيانات المولدة (الافتراضي في مجلد النظام المؤقت حسب scale و seed)')
+    parser.add_argument('--scale', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--regenerate', action='store_true', help='إعادة توليد قاعدة البيانات حتى لو كانت موجودة')
+    parser.add_argument('--repeat', type=int, default=10, help='عدد القياسات لكل سيناريو')
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--excel-rows', type=int, default=500, help='صفوف ملف الإكسل في سيناريوهات الرفع')
+    parser.add_argument('--only', help='أسماء سيناريوهات مفصولة بفواصل')
+    parser.add_argument('--output', help='حفظ النتائج JSON في ملف (الافتراضي الطباعة)')
+    parser.add_argument('--compare', help='ملف نتائج سابق للمقارنة')
+    parser.add_argument('--threshold', type=float, default=10.0, help='نسبة التباطؤ المعتبرة تراجعاً (%%)')
+    args = parser.parse_args()
+
+    source = os.path.abspath(args.db or os.path.join(tempfile.gettempdir(), f'school-bench-{args.scale:g}-{args.seed}.db'))
+    volumes = dataset.volumes_for(args.scale)
+    if args.regenerate or not os.path.exists(source):
+        print(f'توليد البيانات في {source} ...', file=sys.stderr)
+        dataset.generate(source, args.scale, args.seed)
+    working_copy = source + '.run'
+    copy_database(source, working_copy)
+
+    from school import create_app
+    # السيناريوهات تكرر دخول الطالب نفسه، فتحديد المعدل يوقف القياس
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{working_copy}', 'PROFILING_ENABLED': True,
+                      'RATE_LIMIT_ENABLED': False, 'TESTING': True})
+    # تحذيرات ميزانية الاستعلامات متوقعة هنا، والعدد مسجل في النتائج
+    app.logger.setLevel(logging.ERROR)
+    student_civil_id = dataset._civil_id(volumes['seats'] // 2)
+    clients = make_clients(app, student_civil_id)
+
+    selected = set(args.only.split(',')) if args.only else None
+    report = {
+        'meta': {
+            'commit': git_revision(),
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'scale': args.scale,
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'volumes': volumes,
+        },
+        'scenarios': {},
+    }
+    for scenario in SCENARIOS:
+        if selected and scenario[0] not in selected:
+            continue
+        result = run_scenario(clients, scenario, args.repeat, args.warmup, args.excel_rows, student_civil_id)
+        report['scenarios'][scenario[0]] = result
+        print(f"{scenario[0]:<30} median={result['median_ms']:>9.2f}ms  p95={result['p95_ms']:>9.2f}ms  "
+              f"sql={result.get('sql_queries', '-')}  failures={result['failures']}", file=sys.stderr)
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(working_copy + suffix):
+            os.remove(working_copy + suffix)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""إعدادات gunicorn؛ كل قيمة يمكن تغييرها بمتغير بيئة دون تعديل الملف"""
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND', '0.0.0.0:8000')
+
+# عدد العمليات: الافتراضي (2 × عدد الأنوية) + 1
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+
+# الخيوط داخل كل عامل: أكثر من خيط يعني gthread وهو مناسب لأن أغلب الوقت انتظار SQLite والملفات
+threads = int(os.environ.get('WEB_THREADS', 4))
+worker_class = 'gthread' if threads > 1 else 'sync'
+
+# رفع الفيديوهات وملفات الإكسل قد يستغرق وقتاً
+timeout = int(os.environ.get('WEB_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
+
+# إعادة تشغيل العامل دورياً لتفادي تراكم الذاكرة بعد معالجة الصور والإكسل
+max_requests = int(os.environ.get('WEB_MAX_REQUESTS', 1000))
+max_requests_jitter = max_requests // 10
+
+# كل عامل يفتح اتصالاته بقاعدة البيانات بعد التفرع
+preload_app = False
+
+accesslog = os.environ.get('ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.environ.get('LOG_LEVEL', 'info')
+
+
+def on_starting(server):
+    """حذف لقطات المقاييس وأرشيفها من التشغيل السابق حتى تبدأ العدادات من الصفر"""
+    metrics_dir = os.environ.get('METRICS_DIR')
+    if metrics_dir and os.path.isdir(metrics_dir):
+        for name in os.listdir(metrics_dir):
+            if name.endswith('.json') or name.endswith('.json.tmp'):
+                os.remove(os.path.join(metrics_dir, name))
+
+
+def worker_exit(server, worker):
+    """آخر لقطة مقاييس من العامل قبل خروجه (داخل عملية العامل)"""
+    metrics_dir = os.environ.get('METRICS_DIR')
+    if metrics_dir:
+        from school import metrics
+        metrics.write_snapshot(metrics_dir)
+
+
+def child_exit(server, worker):
+    """ضم لقطة العامل المنتهي إلى archived.json وحذف ملفه حتى لا تتراكم اللقطات مع max_requests"""
+    metrics_dir = os.environ.get('METRICS_DIR')
+    if metrics_dir:
+        from school import metrics
+        metrics.archive_snapshot(metrics_dir, worker.pid)
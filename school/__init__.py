@@ -0,0 +1,108 @@
+"""تطبيق موقع المدرسة: مصنع التطبيق وتسجيل الأقسام (Blueprints)"""
+import os
+from datetime import timedelta
+from importlib import import_module
+from flask import Flask
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+from . import images, media_gc, metrics, profiling, ratelimit, sessions, transcode, uploads, video
+from .models import db
+from .migrations import SCHEMA_VERSION, get_schema_version, migrate_command
+from .passwords import DEFAULT_STUDENT_PASSWORD_METHOD, password_benchmark_command
+from .storage import shard_media_command
+
+# مجلد المشروع: القوالب و instance و assets بجانب app.py
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# الأقسام الاختيارية؛ قسم media يسجل دائماً لأن كل الصفحات تعرض صوراً وملفات
+BLUEPRINTS = ('public', 'teacher', 'student', 'admin', 'api')
+
+def create_app(config=None, blueprints=None):
+    """إنشاء التطبيق مع الأقسام المطلوبة فقط
+
+    blueprints: أسماء الأقسام المراد تسجيلها (الافتراضي متغير البيئة SCHOOL_BLUEPRINTS أو جميع الأقسام).
+    مثال لعمال الواجهة العامة: SCHOOL_BLUEPRINTS=public,student,api
+    """
+    app = Flask(__name__, root_path=PROJECT_ROOT)
+    app.secret_key = sessions.load_secret_key(app)
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///school.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+    # طريقة تقديم ملفات الوسائط: '' (من بايثون) أو 'x-accel' (nginx) أو 'x-sendfile' (Apache/lighttpd)
+    app.config['MEDIA_SENDFILE_MODE'] = os.environ.get('MEDIA_SENDFILE_MODE', '')
+    app.config['MEDIA_X_ACCEL_PREFIX'] = os.environ.get('MEDIA_X_ACCEL_PREFIX', '/_protected_media')
+    app.config['MEDIA_CACHE_MAX_AGE'] = 365 * 24 * 60 * 60
+
+    # قياس أداء الطلبات وتحذير عند تجاوز عدد الاستعلامات في الطلب الواحد
+    app.config['PROFILING_ENABLED'] = os.environ.get('PROFILING_ENABLED', '1') == '1'
+    app.config['PROFILE_QUERY_BUDGET'] = int(os.environ.get('PROFILE_QUERY_BUDGET', 30))
+
+    # مقاييس Prometheus على /metrics؛ METRICS_DIR يجمع مقاييس كل عمال gunicorn
+    app.config['METRICS_DIR'] = os.environ.get('METRICS_DIR', '')
+    app.config['METRICS_ALLOWED_IPS'] = [ip.strip() for ip in os.environ.get('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',') if ip.strip()]
+
+    # تحديد معدل الدخول والاستفسارات؛ RATE_LIMIT_STORAGE مسار ملف SQLite لمشاركة الحدود بين العمال
+    app.config['RATE_LIMIT_ENABLED'] = os.environ.get('RATE_LIMIT_ENABLED', '1') == '1'
+    app.config['RATE_LIMIT_STORAGE'] = os.environ.get('RATE_LIMIT_STORAGE', '')
+    # تعديل حدود محددة: RATE_LIMITS="student_login_ip=1200/minute,login_civil_id=5/10minute"
+    app.config['RATE_LIMITS'] = dict(item.strip().split('=', 1) for item in os.environ.get('RATE_LIMITS', '').split(',') if '=' in item)
+
+    # الجلسات على الخادم: sqlite (instance/sessions.db) أو file (instance/sessions/) أو cookie
+    app.config['SESSION_BACKEND'] = os.environ.get('SESSION_BACKEND', 'sqlite')
+    app.config['SESSION_STORAGE'] = os.environ.get('SESSION_STORAGE', '')
+    # تنتهي الجلسة بعد هذه المدة من آخر استخدام
+    app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=float(os.environ.get('SESSION_LIFETIME_HOURS', 12)))
+
+    # حد حجم الطلب الواحد (يرفض قبل قراءة جسمه)؛ الملفات الأكبر ترفع على أجزاء حتى UPLOAD_MAX_MB
+    app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_CONTENT_LENGTH_MB', 100)) * 1024 * 1024
+    app.config['UPLOAD_MAX_SIZE'] = int(os.environ.get('UPLOAD_MAX_MB', 2048)) * 1024 * 1024
+    app.config['UPLOAD_DIR'] = os.environ.get('UPLOAD_DIR', '')
+
+    # معالجة الفيديو المرفوع: 'thread' في عمال الويب أو 'off' مع عامل منفصل (flask --app app process-media --watch)
+    app.config['MEDIA_WORKER'] = os.environ.get('MEDIA_WORKER', 'thread')
+    # تحويل الفيديو إلى MP4 للمتصفح: 'auto' (ffmpeg إن وجد) أو 'ffmpeg' أو 'opencv' أو 'off'
+    app.config['VIDEO_TRANSCODER'] = os.environ.get('VIDEO_TRANSCODER', 'auto')
+    app.config['FFMPEG_BINARY'] = os.environ.get('FFMPEG_BINARY', '')
+
+    # تكلفة تشفير كلمات مرور الطلاب (flask --app app password-benchmark لتقدير أثرها)
+    app.config['STUDENT_PASSWORD_METHOD'] = os.environ.get('STUDENT_PASSWORD_METHOD', DEFAULT_STUDENT_PASSWORD_METHOD)
+
+    if config:
+        app.config.update(config)
+    app.config['USE_X_SENDFILE'] = app.config['MEDIA_SENDFILE_MODE'] == 'x-sendfile'
+    # عدة عمال وخيوط تكتب في نفس ملف SQLite: انتظار القفل بدلاً من الفشل الفوري
+    if app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {'connect_args': {'timeout': 15}})
+
+    db.init_app(app)
+    profiling.init_app(app)
+    metrics.init_app(app)
+    ratelimit.init_app(app)
+    sessions.init_app(app)
+    uploads.init_app(app)
+    media_gc.init_app(app)
+    video.init_app(app)
+    transcode.init_app(app)
+    images.init_app(app)
+    app.cli.add_command(migrate_command)
+    app.cli.add_command(password_benchmark_command)
+    app.cli.add_command(shard_media_command)
+
+    if blueprints is None:
+        blueprints = [name.strip() for name in os.environ.get('SCHOOL_BLUEPRINTS', ','.join(BLUEPRINTS)).split(',') if name.strip()]
+    # استيراد القسم عند الحاجة فقط حتى لا يحمل عامل الواجهة العامة كود الإدارة
+    for name in ['media'] + [name for name in BLUEPRINTS if name in blueprints]:
+        app.register_blueprint(import_module(f'.{name}', __name__).bp)
+
+    # خلف nginx: أخذ عنوان IP والبروتوكول الحقيقيين من رؤوس الوكيل لسجل العمليات والروابط
+    proxy_count = int(os.environ.get('PROXY_COUNT', app.config.get('PROXY_COUNT', 0)))
+    if proxy_count:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxy_count, x_proto=proxy_count, x_host=proxy_count)
+
+    # إقلاع العامل يتحقق من الإصدار فقط، والترحيل يتم مرة واحدة من سطر الأوامر
+    with app.app_context():
+        current_schema_version = get_schema_version()
+        if current_schema_version < SCHEMA_VERSION:
+            print(f"تنبيه: قاعدة البيانات تحتاج ترحيلاً (الإصدار {current_schema_version} من {SCHEMA_VERSION}). شغّل: flask --app app migrate")
+
+    return app
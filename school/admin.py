@@ -0,0 +1,2482 @@
+"""لوحة تحكم الإدارة"""
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, session, flash, send_file, jsonify
+from werkzeug.utils import secure_filename
+from werkzeug.security import generate_password_hash
+import os
+import io
+import time
+from datetime import datetime
+import json
+from .models import db, ActivityLog, ActivityMedia, EducationalMaterial, Inquiry, News, Observer, SchoolActivity, SchoolSettings, Seat, Student, Subject, User
+from .helpers import clean_html_content, compress_image, get_school_settings, get_system_setting, log_activity, save_uploaded_image, set_system_setting, update_news_summary
+from .images import describe_image
+from .media import media_url
+from .profiling import endpoint_stats, reset_stats
+from .metrics import EXCEL_IMPORT_TIME, EXCEL_ROWS
+from .passwords import hash_student_password, hash_student_passwords
+from .sessions import revoke_sessions
+from .feeds import invalidate_materials_feed
+from .uploads import UploadError, append_chunk, cancel_upload, claim_upload, create_upload, get_upload, progress
+from .storage import LEGACY_MATERIAL_PREFIX, release_file, release_files, store_file, store_upload, temp_path
+from .video import STATUS_PENDING, schedule_processing
+
+bp = Blueprint('admin', __name__)
+
+@bp.route('/admin')
+def admin_dashboard():
+    if 'role' in session and (session['role'] == 'مشرف' or session['role'] == 'مشرف محتوى'):
+        # جلب عدد الاستفسارات المعلقة (قيد المراجعة)
+        try:
+            pending_inquiries_count = Inquiry.query.filter_by(status='قيد المراجعة').count()
+        except Exception as e:
+            # إذا كان هناك خطأ في قاعدة البيانات، عرض رسالة للمشرف
+            pending_inquiries_count = 0
+            flash('يوجد مشكلة في قاعدة البيانات. يرجى الضغط على زر "إصلاح قاعدة البيانات" لحل المشكلة.', 'warning')
+        school_settings = get_school_settings()
+        current_year = datetime.now().year
+        return render_template('admin.html', pending_inquiries_count=pending_inquiries_count, school_settings=school_settings, current_year=current_year)
+    return redirect(url_for('teacher.login'))
+
+@bp.route('/admin/users', methods=['GET', 'POST'])
+def admin_users():
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    if request.method == 'POST':
+        civil_id = request.form.get('civil_id')
+        name = request.form.get('name')
+        subject = request.form.get('subject')
+        subject_other = request.form.get('subject_other')
+        if subject_other and subject_other.strip():
+            subject = subject_other.strip()
+        password = request.form.get('password')
+        role = request.form.get('role')
+        job_title = request.form.get('job_title')
+        if len(civil_id) != 12 or not civil_id.isdigit():
+            flash('الرقم المدني يجب أن يكون 12 رقمًا', 'danger')
+        elif User.query.filter_by(civil_id=civil_id).first():
+            flash('المستخدم بهذا الرقم المدني موجود بالفعل', 'danger')
+        elif not subject or not subject.strip():
+            flash('يجب اختيار أو إدخال المادة', 'danger')
+        elif not job_title or not job_title.strip():
+            flash('يجب اختيار المسمى الوظيفي', 'danger')
+        else:
+            hashed_password = generate_password_hash(password)
+            user = User(civil_id=civil_id, name=name, subject=subject, password=hashed_password, role=role, job_title=job_title)
+            db.session.add(user)
+            db.session.commit()
+            
+            # تسجيل العملية في سجل العمليات
+            log_activity(
+                operation_type='إضافة',
+                table_name='users',
+                record_id=civil_id,
+                new_data={
+                    'civil_id': civil_id,
+                    'name': name,
+                    'subject': subject,
+                    'role': role,
+                    'job_title': job_title
+                },
+                description=f'تم إضافة مستخدم جديد: {name}'
+            )
+            
+            flash('تم إضافة المستخدم بنجاح', 'success')
+        return redirect(url_for('admin.admin_users'))
+    users = User.query.all()
+    subjects = sorted(set(u.subject for u in users if u.subject and u.subject.strip() != '-'))
+    school_settings = get_school_settings()
+    current_year = datetime.now().year
+    return render_template('admin_users.html', users=users, subjects=subjects, school_settings=school_settings, current_year=current_year)
+
+@bp.route('/admin/users/edit/<civil_id>', methods=['GET', 'POST'])
+def edit_user(civil_id):
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    user = User.query.filter_by(civil_id=civil_id).first_or_404()
+    users = User.query.all()
+    subjects = sorted(set(u.subject for u in users if u.subject and u.subject.strip() != '-'))
+    if request.method == 'POST':
+        name = request.form.get('name')
+        subject = request.form.get('subject')
+        subject_other = request.form.get('subject_other')
+        if subject_other and subject_other.strip():
+            subject = subject_other.strip()
+        password = request.form.get('password')
+        role = request.form.get('role')
+        job_title = request.form.get('job_title')
+        # حفظ البيانات القديمة قبل التعديل
+        old_data = {
+            'civil_id': user.civil_id,
+            'name': user.name,
+            'subject': user.subject,
+            'role': user.role,
+            'job_title': user.job_title
+        }
+        
+        # تغيير كلمة المرور أو الصلاحية ينهي جلسات المستخدم المفتوحة
+        revoke = bool(password) or role != user.role
+        user.name = name
+        user.subject = subject
+        if password:
+            user.password = generate_password_hash(password)
+        user.role = role
+        user.job_title = job_title
+        db.session.commit()
+        if revoke:
+            revoke_sessions([civil_id])
+        
+        # تسجيل العملية في سجل العمليات
+        log_activity(
+            operation_type='تعديل',
+            table_name='users',
+            record_id=civil_id,
+            old_data=old_data,
+            new_data={
+                'civil_id': user.civil_id,
+                'name': user.name,
+                'subject': user.subject,
+                'role': user.role,
+                'job_title': user.job_title
+            },
+            description=f'تم تعديل بيانات المستخدم: {name}'
+        )
+        
+        flash('تم تعديل بيانات المستخدم بنجاح', 'success')
+        return redirect(url_for('admin.admin_users'))
+    school_settings = get_school_settings()
+    current_year = datetime.now().year
+    return render_template('edit_user.html', user=user, subjects=subjects, school_settings=school_settings, current_year=current_year)
+
+@bp.route('/admin/users/delete/<civil_id>', methods=['POST'])
+def delete_user(civil_id):
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    user = User.query.filter_by(civil_id=civil_id).first_or_404()
+    
+    # حفظ بيانات المستخدم قبل الحذف
+    user_data = {
+        'civil_id': user.civil_id,
+        'name': user.name,
+        'subject': user.subject,
+        'role': user.role,
+        'job_title': user.job_title
+    }
+    
+    db.session.delete(user)
+    db.session.commit()
+    revoke_sessions([civil_id])
+    
+    # تسجيل العملية في سجل العمليات
+    log_activity(
+        operation_type='حذف',
+        table_name='users',
+        record_id=civil_id,
+        old_data=user_data,
+        description=f'تم حذف المستخدم: {user_data["name"]}'
+    )
+    
+    flash('تم حذف المستخدم', 'success')
+    return redirect(url_for('admin.admin_users'))
+
+@bp.route('/admin/users/delete_all', methods=['POST'])
+def delete_all_users():
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    regular_users = User.query.filter(User.role != 'مشرف', User.role != 'مشرف محتوى')
+    revoked_ids = [civil_id for (civil_id,) in regular_users.with_entities(User.civil_id)]
+    deleted = regular_users.delete()
+    db.session.commit()
+    revoke_sessions(revoked_ids)
+    
+    # تسجيل العملية في سجل العمليات
+    log_activity(
+        operation_type='حذف',
+        table_name='users',
+        description=f'تم حذف {deleted} مستخدم عادي'
+    )
+    
+    flash(f'تم حذف {deleted} مستخدم عادي بنجاح. لم يتم حذف أي مشرف أو مشرف محتوى.', 'success')
+    return redirect(url_for('admin.admin_users'))
+
+@bp.route('/admin/users/upload', methods=['POST'])
+def upload_users():
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    file = request.files.get('excel_file')
+    if not file:
+        flash('يرجى اختيار ملف إكسل', 'danger')
+        return redirect(url_for('admin.admin_users'))
+    try:
+        import pandas as pd
+        import_started = time.perf_counter()
+        df = pd.read_excel(file, engine='openpyxl')
+        required_cols = ['الرقم المدني', 'الاسم', 'المادة', 'كلمة المرور', 'الصلاحية', 'المسمى الوظيفي']
+        if not all(col in df.columns for col in required_cols):
+            flash('ملف الإكسل يجب أن يحتوي على الأعمدة: ' + ', '.join(required_cols), 'danger')
+            return redirect(url_for('admin.admin_users'))
+        added = 0
+        for _, row in df.iterrows():
+            civil_id = str(row['الرقم المدني']) if pd.notna(row['الرقم المدني']) and str(row['الرقم المدني']).strip() else '-'
+            name = str(row['الاسم']) if pd.notna(row['الاسم']) and str(row['الاسم']).strip() else '-'
+            subject = str(row['المادة']) if pd.notna(row['المادة']) and str(row['المادة']).strip() else '-'
+            password = str(row['كلمة المرور']) if pd.notna(row['كلمة المرور']) and str(row['كلمة المرور']).strip() else '-'
+            role = str(row['الصلاحية']) if pd.notna(row['الصلاحية']) and str(row['الصلاحية']).strip() else '-'
+            job_title = str(row['المسمى الوظيفي']) if pd.notna(row['المسمى الوظيفي']) and str(row['المسمى الوظيفي']).strip() else '-'
+            if len(civil_id) == 12 and civil_id.isdigit() and not User.query.filter_by(civil_id=civil_id).first():
+                hashed_password = generate_password_hash(password)
+                user = User(civil_id=civil_id, name=name, subject=subject, password=hashed_password, role=role, job_title=job_title)
+                db.session.add(user)
+                added += 1
+        db.session.commit()
+        EXCEL_ROWS.inc(len(df), table='users')
+        EXCEL_IMPORT_TIME.observe(time.perf_counter() - import_started, table='users')
+        
+        # تسجيل العملية في سجل العمليات
+        log_activity(
+            operation_type='إضافة',
+            table_name='users',
+            description=f'تم رفع ملف إكسل وإضافة {added} مستخدم جديد'
+        )
+        
+        flash(f'تمت إضافة {added} مستخدم جديد', 'success')
+    except Exception as e:
+        flash('حدث خطأ أثناء معالجة الملف: ' + str(e), 'danger')
+    return redirect(url_for('admin.admin_users'))
+
+@bp.route('/admin/users/template')
+def download_users_template():
+    output = io.BytesIO()
+    import pandas as pd
+    df = pd.DataFrame(columns=['الرقم المدني', 'الاسم', 'المادة', 'كلمة المرور', 'الصلاحية', 'المسمى الوظيفي'])
+    df.to_excel(output, index=False, engine='openpyxl')
+    output.seek(0)
+    return send_file(output, as_attachment=True, download_name='users_template.xlsx', mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+
+@bp.route('/admin/seats', methods=['GET', 'POST'])
+def admin_seats():
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    if request.method == 'POST':
+        civil_id = request.form.get('civil_id')
+        name = request.form.get('name')
+        seat_number = request.form.get('seat_number')
+        main_committee = request.form.get('main_committee')
+        sub_committee = request.form.get('sub_committee')
+        location = request.form.get('location')
+        if len(civil_id) != 12 or not civil_id.isdigit():
+            flash('الرقم المدني يجب أن يكون 12 رقمًا', 'danger')
+        elif Seat.query.filter_by(civil_id=civil_id).first():
+            flash('يوجد رقم جلوس مسجل لهذا الرقم المدني بالفعل', 'danger')
+        else:
+            seat = Seat(civil_id=civil_id, name=name, seat_number=seat_number, main_committee=main_committee, sub_committee=sub_committee, location=location)
+            db.session.add(seat)
+            db.session.commit()
+            
+            # تسجيل العملية في سجل العمليات
+            log_activity(
+                operation_type='إضافة',
+                table_name='seats',
+                record_id=civil_id,
+                new_data={
+                    'civil_id': civil_id,
+                    'name': name,
+                    'seat_number': seat_number,
+                    'main_committee': main_committee,
+                    'sub_committee': sub_committee,
+                    'location': location
+                },
+                description=f'تم إضافة رقم جلوس للطالب: {name}'
+            )
+            
+            flash('تم تسجيل رقم الجلوس بنجاح', 'success')
+        return redirect(url_for('admin.admin_seats'))
+    seats = Seat.query.all()
+    main_committees = ['الأولى','الثانية','الثالثة','الرابعة','الخامسة','السادسة']
+    sub_committees = [str(i) for i in range(1, 11)]
+    school_settings = get_school_settings()
+    current_year = datetime.now().year
+    return render_template('admin_seats.html', seats=seats, main_committees=main_committees, sub_committees=sub_committees, school_settings=school_settings, current_year=current_year)
+
+@bp.route('/admin/seats/upload', methods=['POST'])
+def upload_seats():
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    file = request.files.get('excel_file')
+    if not file:
+        flash('يرجى اختيار ملف إكسل', 'danger')
+        return redirect(url_for('admin.admin_seats'))
+    try:
+        import pandas as pd
+        import_started = time.perf_counter()
+        df = pd.read_excel(file, engine='openpyxl')
+        required_cols = ['الرقم المدني', 'الاسم', 'رقم الجلوس', 'اللجنة الرئيسية', 'اللجنة الفرعية', 'موقع اللجنة']
+        if not all(col in df.columns for col in required_cols):
+            flash('ملف الإكسل يجب أن يحتوي على الأعمدة: الرقم المدني، الاسم، رقم الجلوس، اللجنة الرئيسية، اللجنة الفرعية، موقع اللجنة', 'danger')
+            return redirect(url_for('admin.admin_seats'))
+        added = 0
+        for _, row in df.iterrows():
+            civil_id = str(row['الرقم المدني'])
+            name = str(row['الاسم'])
+            seat_number = str(row['رقم الجلوس'])
+            main_committee = str(row['اللجنة الرئيسية'])
+            sub_committee = str(row['اللجنة الفرعية'])
+            location = str(row['موقع اللجنة'])
+            if len(civil_id) == 12 and civil_id.isdigit() and not Seat.query.filter_by(civil_id=civil_id).first():
+                seat = Seat(civil_id=civil_id, name=name, seat_number=seat_number, main_committee=main_committee, sub_committee=sub_committee, location=location)
+                db.session.add(seat)
+                added += 1
+        db.session.commit()
+        EXCEL_ROWS.inc(len(df), table='seats')
+        EXCEL_IMPORT_TIME.observe(time.perf_counter() - import_started, table='seats')
+        
+        # تسجيل العملية في سجل العمليات
+        log_activity(
+            operation_type='إضافة',
+            table_name='seats',
+            description=f'تم رفع ملف إكسل وإضافة {added} رقم جلوس جديد'
+        )
+        
+        flash(f'تمت إضافة {added} رقم جلوس جديد', 'success')
+    except Exception as e:
+        flash('حدث خطأ أثناء معالجة الملف: ' + str(e), 'danger')
+    return redirect(url_for('admin.admin_seats'))
+
+@bp.route('/admin/seats/template')
+def download_seats_template():
+    output = io.BytesIO()
+    import pandas as pd
+    df = pd.DataFrame(columns=['الرقم المدني', 'الاسم', 'رقم الجلوس', 'اللجنة الرئيسية', 'اللجنة الفرعية', 'موقع اللجنة'])
+    df.to_excel(output, index=False, engine='openpyxl')
+    output.seek(0)
+    return send_file(output, as_attachment=True, download_name='seats_template.xlsx', mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+
+@bp.route('/admin/seats/export')
+def export_seats():
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    seats = Seat.query.all()
+    import pandas as pd
+    df = pd.DataFrame([
+        {
+            'الرقم المدني': s.civil_id,
+            'الاسم': s.name,
+            'رقم الجلوس': s.seat_number,
+            'اللجنة الرئيسية': s.main_committee,
+            'اللجنة الفرعية': s.sub_committee,
+            'موقع اللجنة': s.location
+        } for s in seats
+    ])
+    output = io.BytesIO()
+    df.to_excel(output, index=False, engine='openpyxl')
+    output.seek(0)
+    return send_file(output, as_attachment=True, download_name='seats_export.xlsx', mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+
+@bp.route('/admin/seats/print_committees')
+def print_committees():
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    
+    # الحصول على الفلاتر من URL
+    name_filter = request.args.get('name_filter', '').strip()
+    main_filter = request.args.get('main_filter', '').strip()
+    sub_filter = request.args.get('sub_filter', '').strip()
+    
+    # بناء الاستعلام
+    query = Seat.query
+    
+    # تطبيق الفلاتر
+    if name_filter:
+        query = query.filter(Seat.name.contains(name_filter))
+    if main_filter:
+        query = query.filter(Seat.main_committee == main_filter)
+    if sub_filter:
+        query = query.filter(Seat.sub_committee == sub_filter)
+    
+    # الحصول على البيانات مرتبة حسب اللجنة الرئيسية ثم الفرعية ثم رقم الجلوس
+    seats = query.order_by(Seat.main_committee, Seat.sub_committee, Seat.seat_number).all()
+    
+    # تنظيم البيانات حسب اللجان
+    committees_data = {}
+    for seat in seats:
+        main_key = seat.main_committee
+        sub_key = seat.sub_committee
+        
+        if main_key not in committees_data:
+            committees_data[main_key] = {}
+        if sub_key not in committees_data[main_key]:
+            committees_data[main_key][sub_key] = []
+        
+        committees_data[main_key][sub_key].append(seat)
+    
+    # الحصول على إعدادات المدرسة
+    school_settings = get_school_settings()
+    
+    return render_template('print_committees.html', 
+                         committees_data=committees_data,
+                         school_settings=school_settings)
+
+@bp.route('/admin/seats/delete_all', methods=['POST'])
+def delete_all_seats():
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    deleted = Seat.query.delete()
+    db.session.commit()
+    
+    # تسجيل العملية في سجل العمليات
+    log_activity(
+        operation_type='حذف',
+        table_name='seats',
+        description=f'تم حذف جميع بيانات أرقام الجلوس ({deleted} سجل)'
+    )
+    
+    flash(f'تم حذف جميع بيانات أرقام الجلوس ({deleted} سجل)', 'success')
+    return redirect(url_for('admin.admin_seats'))
+
+@bp.route('/admin/seats/delete/<civil_id>', methods=['POST'])
+def delete_seat(civil_id):
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    seat = Seat.query.filter_by(civil_id=civil_id).first_or_404()
+    
+    # حفظ بيانات السجل قبل الحذف
+    seat_data = {
+        'civil_id': seat.civil_id,
+        'name': seat.name,
+        'seat_number': seat.seat_number,
+        'main_committee': seat.main_committee,
+        'sub_committee': seat.sub_committee,
+        'location': seat.location
+    }
+    
+    db.session.delete(seat)
+    db.session.commit()
+    
+    # تسجيل العملية في سجل العمليات
+    log_activity(
+        operation_type='حذف',
+        table_name='seats',
+        record_id=civil_id,
+        old_data=seat_data,
+        description=f'تم حذف رقم جلوس للطالب: {seat_data["name"]}'
+    )
+    
+    flash('تم حذف السجل بنجاح', 'success')
+    return redirect(url_for('admin.admin_seats'))
+
+@bp.route('/admin/seats/edit/<civil_id>', methods=['GET', 'POST'])
+def edit_seat(civil_id):
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    seat = Seat.query.filter_by(civil_id=civil_id).first_or_404()
+    main_committees = ['الأولى','الثانية','الثالثة','الرابعة','الخامسة','السادسة']
+    sub_committees = [str(i) for i in range(1, 11)]
+    if request.method == 'POST':
+        # حفظ البيانات القديمة قبل التعديل
+        old_data = {
+            'civil_id': seat.civil_id,
+            'name': seat.name,
+            'seat_number': seat.seat_number,
+            'main_committee': seat.main_committee,
+            'sub_committee': seat.sub_committee,
+            'location': seat.location
+        }
+        
+        seat.name = request.form.get('name')
+        seat.seat_number = request.form.get('seat_number')
+        seat.main_committee = request.form.get('main_committee')
+        seat.sub_committee = request.form.get('sub_committee')
+        seat.location = request.form.get('location')
+        db.session.commit()
+        
+        # تسجيل العملية في سجل العمليات
+        log_activity(
+            operation_type='تعديل',
+            table_name='seats',
+            record_id=civil_id,
+            old_data=old_data,
+            new_data={
+                'civil_id': seat.civil_id,
+                'name': seat.name,
+                'seat_number': seat.seat_number,
+                'main_committee': seat.main_committee,
+                'sub_committee': seat.sub_committee,
+                'location': seat.location
+            },
+            description=f'تم تعديل بيانات رقم الجلوس للطالب: {seat.name}'
+        )
+        
+        flash('تم تعديل بيانات السجل بنجاح', 'success')
+        return redirect(url_for('admin.admin_seats'))
+    school_settings = get_school_settings()
+    current_year = datetime.now().year
+    return render_template('edit_seat.html', seat=seat, main_committees=main_committees, sub_committees=sub_committees, school_settings=school_settings, current_year=current_year)
+
+@bp.route('/admin/news', methods=['GET', 'POST'])
+def admin_news():
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    if request.method == 'POST':
+        title = request.form.get('title')
+        details = request.form.get('details')
+        
+        # تنظيف محتوى HTML لمنع XSS
+        if details:
+            details = clean_html_content(details)
+        
+        date = datetime.now().strftime('%Y-%m-%d')
+        image_file = request.files.get('image')
+        image_filename = None
+        
+        if image_file and image_file.filename:
+            image_filename = save_uploaded_image(image_file, 'news')
+        
+        news = News(title=title, details=details, image=image_filename, date=date)
+        update_news_summary(news)
+        db.session.add(news)
+        db.session.commit()
+        
+        # تسجيل العملية في سجل العمليات
+        log_activity(
+            operation_type='إضافة',
+            table_name='news',
+            record_id=str(news.id),
+            new_data={
+                'id': news.id,
+                'title': title,
+                'details': details,
+                'image': image_filename,
+                'date': date
+            },
+            description=f'تم إضافة خبر جديد: {title}'
+        )
+        
+        flash('تم إضافة الخبر بنجاح', 'success')
+        return redirect(url_for('admin.admin_news'))
+    news_list = News.query.order_by(News.id.desc()).all()
+    current_date = datetime.now().strftime('%Y-%m-%d')
+    school_settings = get_school_settings()
+    current_year = datetime.now().year
+    return render_template('admin_news.html', news_list=news_list, current_date=current_date, school_settings=school_settings, current_year=current_year)
+
+@bp.route('/admin/news/delete/<int:news_id>', methods=['POST'])
+def delete_news(news_id):
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    news = News.query.get_or_404(news_id)
+    
+    # حفظ بيانات الخبر قبل الحذف
+    news_data = {
+        'id': news.id,
+        'title': news.title,
+        'details': news.details,
+        'image': news.image,
+        'date': news.date
+    }
+    
+    release_file('news_image', news.image)
+    db.session.delete(news)
+    db.session.commit()
+    
+    # تسجيل العملية في سجل العمليات
+    log_activity(
+        operation_type='حذف',
+        table_name='news',
+        record_id=str(news_id),
+        old_data=news_data,
+        description=f'تم حذف الخبر: {news_data["title"]}'
+    )
+    
+    flash('تم حذف الخبر بنجاح', 'success')
+    return redirect(url_for('admin.admin_news'))
+
+@bp.route('/admin/news/delete_all', methods=['POST'])
+def delete_all_news():
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    
+    try:
+        # إنقاص مراجع صور الأخبار ثم حذف جميع الأخبار من قاعدة البيانات
+        release_files('news_image', [image for (image,) in db.session.query(News.image)])
+        deleted = News.query.delete()
+        db.session.commit()
+        
+        # تسجيل العملية في سجل العمليات
+        log_activity(
+            operation_type='حذف',
+            table_name='news',
+            description=f'تم حذف جميع الأخبار ({deleted} خبر)'
+        )
+        
+        flash('تم حذف جميع الأخبار بنجاح', 'success')
+    except Exception as e:
+        db.session.rollback()
+        flash('حدث خطأ أثناء حذف الأخبار', 'danger')
+    
+    return redirect(url_for('admin.admin_news'))
+
+@bp.route('/admin/news/edit/<int:news_id>', methods=['GET', 'POST'])
+def edit_news(news_id):
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    news = News.query.options(db.undefer(News.details)).filter_by(id=news_id).first_or_404()
+    if request.method == 'POST':
+        # حفظ البيانات القديمة قبل التعديل
+        old_data = {
+            'id': news.id,
+            'title': news.title,
+            'details': news.details,
+            'image': news.image,
+            'date': news.date
+        }
+        
+        news.title = request.form.get('title')
+        details = request.form.get('details')
+        
+        # تنظيف محتوى HTML لمنع XSS
+        if details:
+            details = clean_html_content(details)
+        
+        news.details = details
+        news.date = request.form.get('date')
+        image_file = request.files.get('image')
+        if image_file and image_file.filename:
+            image_filename = save_uploaded_image(image_file, 'news')
+            if image_filename:
+                release_file('news_image', news.image)
+                news.image = image_filename
+        update_news_summary(news)
+        db.session.commit()
+        
+        # تسجيل العملية في سجل العمليات
+        log_activity(
+            operation_type='تعديل',
+            table_name='news',
+            record_id=str(news_id),
+            old_data=old_data,
+            new_data={
+                'id': news.id,
+                'title': news.title,
+                'details': news.details,
+                'image': news.image,
+                'date': news.date
+            },
+            description=f'تم تعديل الخبر: {news.title}'
+        )
+        
+        flash('تم تعديل الخبر بنجاح', 'success')
+        return redirect(url_for('admin.admin_news'))
+    school_settings = get_school_settings()
+    current_year = datetime.now().year
+    return render_template('edit_news.html', news=news, school_settings=school_settings, current_year=current_year)
+
+@bp.route('/admin/observers', methods=['GET', 'POST'])
+def admin_observers():
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    subjects = sorted(set(u.subject for u in User.query.all() if u.subject and u.subject.strip() != '-'))
+    if request.method == 'POST':
+        civil_id = request.form.get('civil_id')
+        name = request.form.get('name')
+        subject = request.form.get('subject')
+        assignment = request.form.get('assignment')
+        main_committee = request.form.get('main_committee')
+        main_committee_other = request.form.get('main_committee_other')
+        sub_committee = request.form.get('sub_committee')
+        location = request.form.get('location')
+        day = request.form.get('day')
+        date = request.form.get('date')
+        # معالجة اختيار أخرى في اللجنة الرئيسية فقط
+        if main_committee == '__other__':
+            if main_committee_other and main_committee_other.strip():
+                main_committee = main_committee_other.strip()
+            else:
+                flash('يجب إدخال اللجنة الرئيسية الجديدة عند اختيار "أخرى..."', 'danger')
+                return redirect(url_for('admin.admin_observers'))
+        if len(civil_id) != 12 or not civil_id.isdigit():
+            flash('الرقم المدني يجب أن يكون 12 رقمًا', 'danger')
+        elif Observer.query.filter_by(civil_id=civil_id).first():
+            flash('يوجد ملاحظ مسجل بهذا الرقم المدني بالفعل', 'danger')
+        elif not subject or not subject.strip():
+            flash('يجب إدخال المادة', 'danger')
+        elif not assignment or not assignment.strip():
+            flash('يجب إدخال التكليف', 'danger')
+        elif not main_committee or not main_committee.strip():
+            flash('يجب اختيار أو إدخال اللجنة الرئيسية', 'danger')
+        else:
+            observer = Observer(
+                civil_id=civil_id, name=name, subject=subject, assignment=assignment,
+                main_committee=main_committee, sub_committee=sub_committee,
+                location=location, day=day, date=date
+            )
+            db.session.add(observer)
+            db.session.commit()
+            
+            # تسجيل العملية في سجل العمليات
+            log_activity(
+                operation_type='إضافة',
+                table_name='observers',
+                record_id=str(observer.id),
+                new_data={
+                    'id': observer.id,
+                    'civil_id': civil_id,
+                    'name': name,
+                    'subject': subject,
+                    'assignment': assignment,
+                    'main_committee': main_committee,
+                    'sub_committee': sub_committee,
+                    'location': location,
+                    'day': day,
+                    'date': date
+                },
+                description=f'تم إضافة ملاحظ جديد: {name}'
+            )
+            
+            flash('تمت إضافة الملاحظ بنجاح', 'success')
+        return redirect(url_for('admin.admin_observers'))
+    observers = Observer.query.order_by(Observer.id.desc()).all()
+    school_settings = get_school_settings()
+    current_year = datetime.now().year
+    return render_template('admin_observers.html', observers=observers, subjects=subjects, school_settings=school_settings, current_year=current_year)
+
+@bp.route('/admin/observers/edit/<int:observer_id>', methods=['GET', 'POST'])
+def edit_observer(observer_id):
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    observer = Observer.query.get_or_404(observer_id)
+    subjects = sorted(set(u.subject for u in User.query.all() if u.subject and u.subject.strip() != '-'))
+    if request.method == 'POST':
+        # حفظ البيانات القديمة قبل التعديل
+        old_data = {
+            'id': observer.id,
+            'civil_id': observer.civil_id,
+            'name': observer.name,
+            'subject': observer.subject,
+            'assignment': observer.assignment,
+            'main_committee': observer.main_committee,
+            'sub_committee': observer.sub_committee,
+            'location': observer.location,
+            'day': observer.day,
+            'date': observer.date
+        }
+        
+        observer.civil_id = request.form.get('civil_id')
+        observer.name = request.form.get('name')
+        observer.subject = request.form.get('subject')
+        observer.assignment = request.form.get('assignment')
+        observer.main_committee = request.form.get('main_committee')
+        observer.sub_committee = request.form.get('sub_committee')
+        observer.location = request.form.get('location')
+        observer.day = request.form.get('day')
+        observer.date = request.form.get('date')
+        db.session.commit()
+        
+        # تسجيل العملية في سجل العمليات
+        log_activity(
+            operation_type='تعديل',
+            table_name='observers',
+            record_id=str(observer_id),
+            old_data=old_data,
+            new_data={
+                'id': observer.id,
+                'civil_id': observer.civil_id,
+                'name': observer.name,
+                'subject': observer.subject,
+                'assignment': observer.assignment,
+                'main_committee': observer.main_committee,
+                'sub_committee': observer.sub_committee,
+                'location': observer.location,
+                'day': observer.day,
+                'date': observer.date
+            },
+            description=f'تم تعديل بيانات الملاحظ: {observer.name}'
+        )
+        
+        flash('تم تعديل بيانات الملاحظ بنجاح', 'success')
+        return redirect(url_for('admin.admin_observers'))
+    school_settings = get_school_settings()
+    current_year = datetime.now().year
+    return render_template('edit_observer.html', observer=observer, subjects=subjects, school_settings=school_settings, current_year=current_year)
+
+@bp.route('/admin/observers/delete/<int:observer_id>', methods=['POST'])
+def delete_observer(observer_id):
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    observer = Observer.query.get_or_404(observer_id)
+    
+    # حفظ بيانات الملاحظ قبل الحذف
+    observer_data = {
+        'id': observer.id,
+        'civil_id': observer.civil_id,
+        'name': observer.name,
+        'subject': observer.subject,
+        'assignment': observer.assignment,
+        'main_committee': observer.main_committee,
+        'sub_committee': observer.sub_committee,
+        'location': observer.location,
+        'day': observer.day,
+        'date': observer.date
+    }
+    
+    db.session.delete(observer)
+    db.session.commit()
+    
+    # تسجيل العملية في سجل العمليات
+    log_activity(
+        operation_type='حذف',
+        table_name='observers',
+        record_id=str(observer_id),
+        old_data=observer_data,
+        description=f'تم حذف الملاحظ: {observer_data["name"]}'
+    )
+    
+    flash('تم حذف الملاحظ بنجاح', 'success')
+    return redirect(url_for('admin.admin_observers'))
+
+@bp.route('/admin/observers/delete_all', methods=['POST'])
+def delete_all_observers():
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    deleted = Observer.query.delete()
+    db.session.commit()
+    
+    # تسجيل العملية في سجل العمليات
+    log_activity(
+        operation_type='حذف',
+        table_name='observers',
+        description=f'تم حذف جميع بيانات الملاحظين ({deleted} سجل)'
+    )
+    
+    flash(f'تم حذف جميع بيانات الملاحظين ({deleted} سجل)', 'success')
+    return redirect(url_for('admin.admin_observers'))
+
+@bp.route('/admin/observers/upload', methods=['POST'])
+def upload_observers():
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    file = request.files.get('excel_file')
+    if not file:
+        flash('يرجى اختيار ملف إكسل', 'danger')
+        return redirect(url_for('admin.admin_observers'))
+    try:
+        import pandas as pd
+        import_started = time.perf_counter()
+        df = pd.read_excel(file, engine='openpyxl')
+        required_cols = ['الرقم المدني', 'الاسم', 'المادة', 'التكليف', 'اللجنة الرئيسية', 'اللجنة الفرعية', 'موقع اللجنة', 'اليوم', 'التاريخ']
+        if not all(col in df.columns for col in required_cols):
+            flash('ملف الإكسل يجب أن يحتوي على الأعمدة: ' + ', '.join(required_cols), 'danger')
+            return redirect(url_for('admin.admin_observers'))
+        added = 0
+        for _, row in df.iterrows():
+            civil_id = str(row['الرقم المدني']) if pd.notna(row['الرقم المدني']) and str(row['الرقم المدني']).strip() else '-'
+            name = str(row['الاسم']) if pd.notna(row['الاسم']) and str(row['الاسم']).strip() else '-'
+            subject = str(row['المادة']) if pd.notna(row['المادة']) and str(row['المادة']).strip() else '-'
+            assignment = str(row['التكليف']) if pd.notna(row['التكليف']) and str(row['التكليف']).strip() else '-'
+            main_committee = str(row['اللجنة الرئيسية']) if pd.notna(row['اللجنة الرئيسية']) and str(row['اللجنة الرئيسية']).strip() else '-'
+            sub_committee = str(row['اللجنة الفرعية']) if pd.notna(row['اللجنة الفرعية']) and str(row['اللجنة الفرعية']).strip() else '-'
+            location = str(row['موقع اللجنة']) if pd.notna(row['موقع اللجنة']) and str(row['موقع اللجنة']).strip() else '-'
+            day = str(row['اليوم']) if pd.notna(row['اليوم']) and str(row['اليوم']).strip() else '-'
+            date = str(row['التاريخ']) if pd.notna(row['التاريخ']) and str(row['التاريخ']).strip() else '-'
+            if len(civil_id) == 12 and civil_id.isdigit() and not Observer.query.filter_by(civil_id=civil_id).first():
+                observer = Observer(
+                    civil_id=civil_id, name=name, subject=subject, assignment=assignment,
+                    main_committee=main_committee, sub_committee=sub_committee,
+                    location=location, day=day, date=date
+                )
+                db.session.add(observer)
+                added += 1
+        db.session.commit()
+        EXCEL_ROWS.inc(len(df), table='observers')
+        EXCEL_IMPORT_TIME.observe(time.perf_counter() - import_started, table='observers')
+        
+        # تسجيل العملية في سجل العمليات
+        log_activity(
+            operation_type='إضافة',
+            table_name='observers',
+            description=f'تم رفع ملف إكسل وإضافة {added} ملاحظ جديد'
+        )
+        
+        flash(f'تمت إضافة {added} ملاحظ جديد', 'success')
+    except Exception as e:
+        flash('حدث خطأ أثناء معالجة الملف: ' + str(e), 'danger')
+    return redirect(url_for('admin.admin_observers'))
+
+@bp.route('/admin/observers/template')
+def observers_template():
+    import io
+    output = io.BytesIO()
+    import pandas as pd
+    df = pd.DataFrame(columns=['الرقم المدني', 'الاسم', 'المادة', 'التكليف', 'اللجنة الرئيسية', 'اللجنة الفرعية', 'موقع اللجنة', 'اليوم', 'التاريخ'])
+    df.to_excel(output, index=False, engine='openpyxl')
+    output.seek(0)
+    return send_file(output, as_attachment=True, download_name='observers_template.xlsx', mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+
+@bp.route('/admin/students', methods=['GET', 'POST'])
+def admin_students():
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    if request.method == 'POST':
+        civil_id = request.form.get('civil_id')
+        name = request.form.get('name')
+        grade = request.form.get('grade')
+        section = request.form.get('section')
+        password = request.form.get('password')
+        if len(civil_id) != 12 or not civil_id.isdigit():
+            flash('الرقم المدني يجب أن يكون 12 رقمًا', 'danger')
+        elif Student.query.filter_by(civil_id=civil_id).first():
+            flash('يوجد طالب مسجل بهذا الرقم المدني بالفعل', 'danger')
+        else:
+            student = Student(civil_id=civil_id, name=name, grade=grade, section=section, password=hash_student_password(password))
+            db.session.add(student)
+            db.session.commit()
+            
+            # تسجيل العملية في سجل العمليات
+            log_activity(
+                operation_type='إضافة',
+                table_name='students',
+                record_id=civil_id,
+                new_data={
+                    'civil_id': civil_id,
+                    'name': name,
+                    'grade': grade,
+                    'section': section
+                },
+                description=f'تم إضافة طالب جديد: {name}'
+            )
+            
+            flash('تمت إضافة الطالب بنجاح', 'success')
+        return redirect(url_for('admin.admin_students'))
+    students = Student.query.order_by(Student.name.asc()).all()
+    school_settings = get_school_settings()
+    current_year = datetime.now().year
+    return render_template('admin_students.html', students=students, school_settings=school_settings, current_year=current_year)
+
+@bp.route('/admin/students/edit/<civil_id>', methods=['GET', 'POST'])
+def edit_student(civil_id):
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    student = Student.query.get_or_404(civil_id)
+    if request.method == 'POST':
+        # حفظ البيانات القديمة قبل التعديل
+        old_data = {
+            'civil_id': student.civil_id,
+            'name': student.name,
+            'grade': student.grade,
+            'section': student.section
+        }
+        
+        student.name = request.form.get('name')
+        student.grade = request.form.get('grade')
+        student.section = request.form.get('section')
+        # كلمة المرور مشفرة ولا تعرض، والحقل الفارغ يبقي الكلمة الحالية
+        if request.form.get('password'):
+            student.password = hash_student_password(request.form.get('password'))
+        db.session.commit()
+        if request.form.get('password'):
+            revoke_sessions([civil_id])
+        
+        # تسجيل العملية في سجل العمليات
+        log_activity(
+            operation_type='تعديل',
+            table_name='students',
+            record_id=civil_id,
+            old_data=old_data,
+            new_data={
+                'civil_id': student.civil_id,
+                'name': student.name,
+                'grade': student.grade,
+                'section': student.section
+            },
+            description=f'تم تعديل بيانات الطالب: {student.name}'
+        )
+        
+        flash('تم تعديل بيانات الطالب بنجاح', 'success')
+        return redirect(url_for('admin.admin_students'))
+    students = Student.query.order_by(Student.name.asc()).all()
+    school_settings = get_school_settings()
+    current_year = datetime.now().year
+    return render_template('admin_students.html', students=students, edit_student=student, school_settings=school_settings, current_year=current_year)
+
+@bp.route('/admin/students/delete/<civil_id>', methods=['POST'])
+def delete_student(civil_id):
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    student = Student.query.get_or_404(civil_id)
+    
+    # حفظ بيانات الطالب قبل الحذف
+    student_data = {
+        'civil_id': student.civil_id,
+        'name': student.name,
+        'grade': student.grade,
+        'section': student.section
+    }
+    
+    db.session.delete(student)
+    db.session.commit()
+    revoke_sessions([civil_id])
+    
+    # تسجيل العملية في سجل العمليات
+    log_activity(
+        operation_type='حذف',
+        table_name='students',
+        record_id=civil_id,
+        old_data=student_data,
+        description=f'تم حذف الطالب: {student_data["name"]}'
+    )
+    
+    flash('تم حذف الطالب بنجاح', 'success')
+    return redirect(url_for('admin.admin_students'))
+
+@bp.route('/admin/students/delete_all', methods=['POST'])
+def delete_all_students():
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    revoked_ids = [civil_id for (civil_id,) in db.session.query(Student.civil_id)]
+    deleted = Student.query.delete()
+    db.session.commit()
+    revoke_sessions(revoked_ids)
+    
+    # تسجيل العملية في سجل العمليات
+    log_activity(
+        operation_type='حذف',
+        table_name='students',
+        description=f'تم حذف جميع بيانات الطلاب ({deleted} سجل)'
+    )
+    
+    flash(f'تم حذف جميع بيانات الطلاب ({deleted} سجل)', 'success')
+    return redirect(url_for('admin.admin_students'))
+
+@bp.route('/admin/students/upload', methods=['POST'])
+def upload_students():
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    file = request.files.get('excel_file')
+    if not file:
+        flash('يرجى اختيار ملف إكسل', 'danger')
+        return redirect(url_for('admin.admin_students'))
+    try:
+        import pandas as pd
+        import_started = time.perf_counter()
+        df = pd.read_excel(file, engine='openpyxl')
+        required_cols = ['الرقم المدني', 'اسم الطالب', 'الصف', 'الشعبة', 'كلمة المرور']
+        if not all(col in df.columns for col in required_cols):
+            flash('ملف الإكسل يجب أن يحتوي على الأعمدة: ' + ', '.join(required_cols), 'danger')
+            return redirect(url_for('admin.admin_students'))
+        new_students = []
+        seen_civil_ids = set()
+        invalid_students = []
+        for _, row in df.iterrows():
+            civil_id = str(row['الرقم المدني']) if pd.notna(row['الرقم المدني']) and str(row['الرقم المدني']).strip() else '-'
+            name = str(row['اسم الطالب']) if pd.notna(row['اسم الطالب']) and str(row['اسم الطالب']).strip() else '-'
+            grade = str(row['الصف']) if pd.notna(row['الصف']) and str(row['الصف']).strip() else '-'
+            section = str(row['الشعبة']) if pd.notna(row['الشعبة']) and str(row['الشعبة']).strip() else '-'
+            password = str(row['كلمة المرور']) if pd.notna(row['كلمة المرور']) and str(row['كلمة المرور']).strip() else '-'
+            if len(civil_id) == 12 and civil_id.isdigit() and civil_id not in seen_civil_ids and not Student.query.filter_by(civil_id=civil_id).first():
+                seen_civil_ids.add(civil_id)
+                new_students.append(Student(civil_id=civil_id, name=name, grade=grade, section=section, password=password))
+            else:
+                if civil_id != '-' and (len(civil_id) != 12 or not civil_id.isdigit()):
+                    invalid_students.append({'name': name, 'civil_id': civil_id, 'grade': grade, 'section': section})
+        # تشفير كلمات مرور الملف دفعة واحدة بالتوازي بدلاً من صف بصف
+        for student, hashed in zip(new_students, hash_student_passwords([s.password for s in new_students])):
+            student.password = hashed
+        db.session.add_all(new_students)
+        added = len(new_students)
+        db.session.commit()
+        EXCEL_ROWS.inc(len(df), table='students')
+        EXCEL_IMPORT_TIME.observe(time.perf_counter() - import_started, table='students')
+        
+        # تسجيل العملية في سجل العمليات
+        log_activity(
+            operation_type='إضافة',
+            table_name='students',
+            description=f'تم رفع ملف إكسل وإضافة {added} طالب جديد'
+        )
+        
+        flash(f'تمت إضافة {added} طالب جديد', 'success')
+        if invalid_students:
+            report = '''
+            <div dir="rtl" class="my-4">
+                <div class="font-bold text-red-700 mb-2">الطلاب الذين لم يتم إضافتهم بسبب الرقم المدني غير صحيح (يجب أن يكون 12 رقم):</div>
+                <div class="overflow-x-auto">
+                    <table class="min-w-[320px] max-w-full bg-white border border-red-300 rounded text-xs md:text-base my-2 text-right">
+                        <thead class="bg-red-100">
+                            <tr>
+                                <th class="px-4 py-2 border-b">اسم الطالب</th>
+                                <th class="px-4 py-2 border-b">الرقم المدني</th>
+                                <th class="px-4 py-2 border-b">الصف</th>
+                                <th class="px-4 py-2 border-b">الشعبة</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+            '''
+            for s in invalid_students:
+                report += f'<tr><td class="px-4 py-2 border-b">{s["name"]}</td><td class="px-4 py-2 border-b">{s["civil_id"]}</td><td class="px-4 py-2 border-b">{s.get("grade", "-")}</td><td class="px-4 py-2 border-b">{s.get("section", "-")}</td></tr>'
+            report += '''
+                        </tbody>
+                    </table>
+                </div>
+            </div>
+            '''
+            flash(report, 'danger')
+    except Exception as e:
+        flash('حدث خطأ أثناء معالجة الملف: ' + str(e), 'danger')
+    return redirect(url_for('admin.admin_students'))
+
+@bp.route('/admin/students/template')
+def students_template():
+    import io
+    output = io.BytesIO()
+    import pandas as pd
+    from openpyxl import Workbook
+    from openpyxl.utils.dataframe import dataframe_to_rows
+    
+    # إنشاء DataFrame فارغ
+    df = pd.DataFrame(columns=['الرقم المدني', 'اسم الطالب', 'الصف', 'الشعبة', 'كلمة المرور'])
+    
+    # إنشاء ملف Excel باستخدام openpyxl
+    wb = Workbook()
+    ws = wb.active
+    
+    # إضافة العناوين
+    for r in dataframe_to_rows(df, index=False, header=True):
+        ws.append(r)
+    
+    # إضافة المعادلة في أول خلية من عمود كلمة المرور (العمود E)
+    ws['E2'] = '=RANDBETWEEN(3001, 9999)'
+    
+    # حفظ الملف
+    wb.save(output)
+    output.seek(0)
+    
+    return send_file(output, as_attachment=True, download_name='students_template.xlsx', mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+
+@bp.route('/admin/subjects', methods=['GET', 'POST'])
+def admin_subjects():
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    if request.method == 'POST':
+        stage = request.form.get('stage')
+        subject_name = request.form.get('subject')
+        if not stage or not subject_name:
+            flash('يجب اختيار المرحلة وكتابة اسم المادة', 'danger')
+        elif Subject.query.filter_by(stage=stage, subject=subject_name).first():
+            flash('هذه المادة مسجلة بالفعل لهذه المرحلة', 'danger')
+        else:
+            s = Subject(stage=stage, subject=subject_name)
+            db.session.add(s)
+            db.session.commit()
+            
+            # تسجيل العملية
+            log_activity(
+                operation_type='إضافة',
+                table_name='subjects',
+                record_id=str(s.id),
+                new_data={
+                    'id': s.id,
+                    'stage': s.stage,
+                    'subject': s.subject
+                },
+                description=f'إضافة مادة جديدة: {s.subject} للمرحلة {s.stage}'
+            )
+            
+            flash('تمت إضافة المادة بنجاح', 'success')
+        return redirect(url_for('admin.admin_subjects'))
+    subjects = Subject.query.order_by(Subject.stage, Subject.subject).all()
+    school_settings = get_school_settings()
+    current_year = datetime.now().year
+    return render_template('admin_subjects.html', subjects=subjects, school_settings=school_settings, current_year=current_year)
+
+@bp.route('/admin/subjects/edit/<int:subject_id>', methods=['GET', 'POST'])
+def edit_subject(subject_id):
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    subject = Subject.query.get_or_404(subject_id)
+    if request.method == 'POST':
+        stage = request.form.get('stage')
+        subject_name = request.form.get('subject')
+        if not stage or not subject_name:
+            flash('يجب اختيار المرحلة وكتابة اسم المادة', 'danger')
+        elif Subject.query.filter(Subject.stage==stage, Subject.subject==subject_name, Subject.id!=subject_id).first():
+            flash('هذه المادة مسجلة بالفعل لهذه المرحلة', 'danger')
+        else:
+            # تسجيل البيانات القديمة قبل التعديل
+            old_data = {
+                'id': subject.id,
+                'stage': subject.stage,
+                'subject': subject.subject
+            }
+            
+            subject.stage = stage
+            subject.subject = subject_name
+            db.session.commit()
+            
+            # تسجيل العملية
+            log_activity(
+                operation_type='تعديل',
+                table_name='subjects',
+                record_id=str(subject_id),
+                old_data=old_data,
+                new_data={
+                    'id': subject.id,
+                    'stage': subject.stage,
+                    'subject': subject.subject
+                },
+                description=f'تعديل مادة: {old_data["subject"]} إلى {subject.subject}'
+            )
+            
+            flash('تم تعديل المادة بنجاح', 'success')
+            return redirect(url_for('admin.admin_subjects'))
+    school_settings = get_school_settings()
+    current_year = datetime.now().year
+    return render_template('edit_subject.html', subject=subject, school_settings=school_settings, current_year=current_year)
+
+@bp.route('/admin/subjects/delete/<int:subject_id>', methods=['POST'])
+def delete_subject(subject_id):
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    subject = Subject.query.get_or_404(subject_id)
+    
+    # تسجيل البيانات القديمة قبل الحذف
+    old_data = {
+        'id': subject.id,
+        'stage': subject.stage,
+        'subject': subject.subject
+    }
+    
+    db.session.delete(subject)
+    db.session.commit()
+    
+    # تسجيل العملية
+    log_activity(
+        operation_type='حذف',
+        table_name='subjects',
+        record_id=str(subject_id),
+        old_data=old_data,
+        description=f'حذف مادة: {old_data["subject"]}'
+    )
+    
+    flash('تم حذف المادة بنجاح', 'success')
+    return redirect(url_for('admin.admin_subjects'))
+
+@bp.route('/admin/upload_materials', methods=['GET', 'POST'])
+def admin_upload_materials():
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    
+    if request.method == 'POST':
+        stage = request.form.get('stage')
+        subject = request.form.get('subject')
+        title = request.form.get('title')
+        description = request.form.get('description')
+        material_type = request.form.get('material_type')
+        
+        if not all([stage, subject, title, material_type]):
+            flash('يجب ملء جميع الحقول المطلوبة', 'danger')
+            return redirect(url_for('admin.admin_upload_materials'))
+        
+        # التحقق من نوع المادة
+        if material_type == 'PDF':
+            # الملف مرفوع مسبقاً على أجزاء (upload_id) أو داخل النموذج
+            upload_id = request.form.get('upload_id')
+            if upload_id:
+                try:
+                    upload = get_upload(upload_id, session['civil_id'], complete=True)
+                except UploadError as e:
+                    flash(e.message, 'danger')
+                    return redirect(url_for('admin.admin_upload_materials'))
+                file, original_name = None, upload['filename']
+            elif 'file' not in request.files or request.files['file'].filename == '':
+                flash('يجب رفع ملف PDF', 'danger')
+                return redirect(url_for('admin.admin_upload_materials'))
+            else:
+                file = request.files['file']
+                original_name = file.filename
+            
+            if original_name.endswith('.pdf'):
+                # حفظ الملف في مخزن الوسائط باسم بصمته (نفس الملف مرتين يخزن مرة واحدة)
+                if upload_id:
+                    temp_file = temp_path('material_file', '.pdf')
+                    claim_upload(upload_id, session['civil_id'], temp_file)
+                    filename = store_file('material_file', temp_file, original_name, sha256=upload['sha256'])
+                else:
+                    filename = store_upload('material_file', file)
+                
+                material = EducationalMaterial(
+                    stage=stage,
+                    subject=subject,
+                    title=title,
+                    description=description,
+                    material_type='PDF',
+                    file_path=filename  # حفظ اسم الملف فقط
+                )
+                db.session.add(material)
+                db.session.commit()
+                invalidate_materials_feed()
+                
+                # تسجيل العملية في سجل العمليات
+                log_activity(
+                    operation_type='إضافة',
+                    table_name='educational_materials',
+                    record_id=str(material.id),
+                    new_data={
+                        'id': material.id,
+                        'stage': stage,
+                        'subject': subject,
+                        'title': title,
+                        'description': description,
+                        'material_type': 'PDF',
+                        'file_path': filename
+                    },
+                    description=f'تم رفع مادة تعليمية جديدة: {title}'
+                )
+                
+                flash('تم رفع المادة التعليمية بنجاح', 'success')
+            else:
+                flash('يجب رفع ملف PDF صحيح', 'danger')
+        
+        elif material_type == 'فيديو':
+            video_url = request.form.get('video_url')
+            if not video_url:
+                flash('يجب إدخال رابط الفيديو', 'danger')
+                return redirect(url_for('admin.admin_upload_materials'))
+            
+            material = EducationalMaterial(
+                stage=stage,
+                subject=subject,
+                title=title,
+                description=description,
+                material_type='فيديو',
+                video_url=video_url
+            )
+            db.session.add(material)
+            db.session.commit()
+            invalidate_materials_feed()
+            
+            # تسجيل العملية في سجل العمليات
+            log_activity(
+                operation_type='إضافة',
+                table_name='educational_materials',
+                record_id=str(material.id),
+                new_data={
+                    'id': material.id,
+                    'stage': stage,
+                    'subject': subject,
+                    'title': title,
+                    'description': description,
+                    'material_type': 'فيديو',
+                    'video_url': video_url
+                },
+                description=f'تم رفع مادة تعليمية جديدة: {title}'
+            )
+            
+            flash('تم رفع المادة التعليمية بنجاح', 'success')
+        
+        return redirect(url_for('admin.admin_upload_materials'))
+    
+    # تجميع البيانات للمواد حسب المرحلة
+    subjects_data = {}
+    subjects = Subject.query.all()
+    for subject in subjects:
+        if subject.stage not in subjects_data:
+            subjects_data[subject.stage] = []
+        subjects_data[subject.stage].append(subject.subject)
+    
+    # جلب المواد المرفوعة مع مقتطف الوصف فقط بدلاً من الوصف الكامل
+    materials = EducationalMaterial.query.options(
+        db.with_expression(EducationalMaterial.description_preview, db.func.substr(EducationalMaterial.description, 1, 51))
+    ).order_by(EducationalMaterial.upload_date.desc()).all()
+    
+    school_settings = get_school_settings()
+    current_year = datetime.now().year
+    return render_template('admin_upload_materials.html', subjects_data=subjects_data, materials=materials, school_settings=school_settings, current_year=current_year)
+
+@bp.route('/admin/upload_materials/delete/<int:material_id>', methods=['POST'])
+def delete_material(material_id):
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    
+    material = EducationalMaterial.query.get_or_404(material_id)
+    
+    # تسجيل البيانات القديمة قبل الحذف
+    old_data = {
+        'id': material.id,
+        'stage': material.stage,
+        'subject': material.subject,
+        'title': material.title,
+        'description': material.description,
+        'material_type': material.material_type,
+        'file_path': material.file_path,
+        'video_url': material.video_url,
+        'upload_date': material.upload_date.isoformat() if material.upload_date else None
+    }
+    
+    # إنقاص مراجع الملف؛ يحذف من القرص بعد الحفظ إذا لم تعد مادة أخرى تستخدمه
+    if material.material_type == 'PDF' and material.file_path:
+        release_file('material_file', material.file_path.removeprefix(LEGACY_MATERIAL_PREFIX))
+    
+    db.session.delete(material)
+    db.session.commit()
+    invalidate_materials_feed()
+    
+    # تسجيل العملية
+    log_activity(
+        operation_type='حذف',
+        table_name='educational_materials',
+        record_id=material_id,
+        old_data=old_data,
+        description=f'حذف مادة تعليمية: {old_data["title"]}'
+    )
+    
+    flash('تم حذف المادة التعليمية بنجاح', 'success')
+    return redirect(url_for('admin.admin_upload_materials'))
+
+@bp.route('/admin/upload_materials/delete_all', methods=['POST'])
+def delete_all_materials():
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    
+    try:
+        # الحصول على عدد المواد قبل الحذف
+        materials_count = EducationalMaterial.query.count()
+        
+        # إنقاص مراجع جميع الملفات المرفوعة أولاً
+        release_files('material_file', [file_path.removeprefix(LEGACY_MATERIAL_PREFIX) for (file_path,) in db.session.query(EducationalMaterial.file_path).filter(EducationalMaterial.file_path.isnot(None))])
+        
+        # حذف جميع المواد من قاعدة البيانات
+        EducationalMaterial.query.delete()
+        db.session.commit()
+        invalidate_materials_feed()
+        
+        # تسجيل العملية
+        log_activity(
+            operation_type='حذف',
+            table_name='educational_materials',
+            old_data={'count': materials_count},
+            description=f'حذف جميع المواد التعليمية ({materials_count} مادة)'
+        )
+        
+        flash('تم حذف جميع المواد التعليمية بنجاح', 'success')
+    except Exception as e:
+        db.session.rollback()
+        flash('حدث خطأ أثناء حذف المواد التعليمية', 'danger')
+    
+    return redirect(url_for('admin.admin_upload_materials'))
+
+@bp.route('/admin/fix_material_paths')
+def fix_material_paths():
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    
+    materials = EducationalMaterial.query.filter_by(material_type='PDF').all()
+    fixed_count = 0
+    
+    for material in materials:
+        if material.file_path and material.file_path.startswith(LEGACY_MATERIAL_PREFIX):
+            # إزالة المجلد فقط مع الإبقاء على المجلدات المجزأة
+            material.file_path = material.file_path.removeprefix(LEGACY_MATERIAL_PREFIX)
+            fixed_count += 1
+    
+    if fixed_count > 0:
+        db.session.commit()
+        invalidate_materials_feed()
+        flash(f'تم تصحيح {fixed_count} مسار ملف', 'success')
+    else:
+        flash('لا توجد مسارات تحتاج تصحيح', 'info')
+    
+    return redirect(url_for('admin.admin_upload_materials'))
+
+@bp.route('/admin/test_database')
+def test_database():
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    
+    try:
+        from sqlalchemy import text
+        
+        # اختبار الاتصال بقاعدة البيانات
+        db.session.execute(text("SELECT 1"))
+        
+        # التحقق من وجود جدول inquiry
+        result = db.session.execute(text("SELECT name FROM sqlite_master WHERE type='table' AND name='inquiry'"))
+        if not result.fetchone():
+            flash('جدول inquiry غير موجود في قاعدة البيانات', 'warning')
+            return redirect(url_for('admin.admin_dashboard'))
+        
+        # التحقق من وجود الأعمدة المطلوبة
+        result = db.session.execute(text("PRAGMA table_info(inquiry)"))
+        columns = [row[1] for row in result.fetchall()]
+        
+        missing_columns = []
+        required_columns = ['student_section', 'student_civil_id', 'student_name', 'student_grade']
+        
+        for col in required_columns:
+            if col not in columns:
+                missing_columns.append(col)
+        
+        if missing_columns:
+            flash(f'الأعمدة التالية مفقودة في جدول inquiry: {", ".join(missing_columns)}', 'warning')
+        else:
+            flash('قاعدة البيانات تعمل بشكل صحيح', 'success')
+            
+    except Exception as e:
+        flash(f'خطأ في الاتصال بقاعدة البيانات: {str(e)}', 'danger')
+    
+    return redirect(url_for('admin.admin_dashboard'))
+
+@bp.route('/admin/activity_log')
+def admin_activity_log():
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    
+    try:
+        page = request.args.get('page', 1, type=int)
+        operation_filter = request.args.get('operation', '')
+        table_filter = request.args.get('table', '')
+        user_filter = request.args.get('user', '')
+        date_filter = request.args.get('date', '')
+        
+        # بناء الاستعلام
+        query = ActivityLog.query
+        
+        if operation_filter:
+            query = query.filter(ActivityLog.operation_type == operation_filter)
+        if table_filter:
+            query = query.filter(ActivityLog.table_name == table_filter)
+        if user_filter:
+            query = query.filter(
+                db.or_(
+                    ActivityLog.user_name.contains(user_filter),
+                    ActivityLog.user_civil_id.contains(user_filter)
+                )
+            )
+        if date_filter:
+            # تحويل التاريخ إلى datetime للبحث
+            try:
+                filter_date = datetime.strptime(date_filter, '%Y-%m-%d')
+                next_date = filter_date.replace(hour=23, minute=59, second=59)
+                query = query.filter(
+                    db.and_(
+                        ActivityLog.created_at >= filter_date,
+                        ActivityLog.created_at <= next_date
+                    )
+                )
+            except ValueError:
+                pass  # تجاهل التاريخ إذا كان غير صحيح
+        
+        # ترتيب حسب التاريخ (الأحدث أولاً)
+        query = query.order_by(ActivityLog.created_at.desc())
+        
+        # ترقيم الصفحات
+        logs = query.paginate(page=page, per_page=50, error_out=False)
+        
+        # قوائم الفلترة
+        operations = db.session.query(ActivityLog.operation_type).distinct().all()
+        operations = [op[0] for op in operations]
+        
+        tables = db.session.query(ActivityLog.table_name).distinct().all()
+        tables = [table[0] for table in tables]
+        
+        users = db.session.query(ActivityLog.user_name).distinct().all()
+        users = [user[0] for user in users if user[0]]
+        
+        school_settings = get_school_settings()
+        return render_template('admin_activity_log.html', 
+                             logs=logs, 
+                             operations=operations, 
+                             tables=tables, 
+                             users=users,
+                             school_settings=school_settings)
+                             
+    except Exception as e:
+        flash(f'حدث خطأ أثناء تحميل سجل العمليات: {str(e)}', 'danger')
+        return redirect(url_for('admin.admin_dashboard'))
+
+@bp.route('/admin/performance')
+def admin_performance():
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    stats = endpoint_stats()
+    school_settings = get_school_settings()
+    current_year = datetime.now().year
+    return render_template('admin_performance.html', stats=stats,
+                           query_budget=current_app.config.get('PROFILE_QUERY_BUDGET'),
+                           profiling_enabled=current_app.config.get('PROFILING_ENABLED'),
+                           school_settings=school_settings, current_year=current_year)
+
+@bp.route('/admin/performance/reset', methods=['POST'])
+def reset_performance():
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    reset_stats()
+    flash('تم تصفير إحصاءات الأداء', 'success')
+    return redirect(url_for('admin.admin_performance'))
+
+@bp.route('/admin/activity_log/<int:log_id>/details')
+def get_activity_log_details(log_id):
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return jsonify({'error': 'غير مصرح'}), 403
+    
+    try:
+        log = ActivityLog.query.options(db.undefer_group('details')).filter_by(id=log_id).first_or_404()
+        
+        # تحويل البيانات من JSON إلى dict
+        old_data = json.loads(log.old_data) if log.old_data else None
+        new_data = json.loads(log.new_data) if log.new_data else None
+        
+        # تنسيق البيانات للعرض
+        details = {
+            'id': log.id,
+            'operation_type': log.operation_type,
+            'table_name': log.table_name,
+            'record_id': log.record_id,
+            'user_info': {
+                'civil_id': log.user_civil_id,
+                'name': log.user_name,
+                'subject': log.user_subject,
+                'job_title': log.user_job_title
+            },
+            'description': log.description,
+            'ip_address': log.ip_address,
+            'user_agent': log.user_agent,
+            'created_at': log.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'old_data': old_data,
+            'new_data': new_data
+        }
+        
+        return jsonify(details)
+        
+    except Exception as e:
+        return jsonify({'error': f'حدث خطأ: {str(e)}'}), 500
+
+@bp.route('/admin/activity_log/clear_all', methods=['POST'])
+def clear_all_activity_logs():
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return jsonify({'success': False, 'message': 'غير مصرح'}), 403
+    
+    try:
+        # حذف جميع السجلات من جدول activity_log
+        deleted_count = ActivityLog.query.delete()
+        db.session.commit()
+        
+        return jsonify({
+            'success': True, 
+            'message': f'تم مسح {deleted_count} سجل بنجاح'
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False, 
+            'message': f'حدث خطأ أثناء مسح السجلات: {str(e)}'
+        }), 500
+
+@bp.route('/admin/inquiries')
+def admin_inquiries():
+    if 'role' in session and (session['role'] == 'مشرف' or session['role'] == 'مشرف محتوى'):
+        try:
+            page = request.args.get('page', 1, type=int)
+            status_filter = request.args.get('status', '')
+            type_filter = request.args.get('type', '')
+            user_type_filter = request.args.get('user_type', '')
+            grade_filter = request.args.get('grade', '')
+            section_filter = request.args.get('section', '')
+            search_filter = request.args.get('search', '')
+            
+            # بناء الاستعلام مع مقتطف الرسالة فقط بدلاً من الرسالة والرد كاملين
+            query = Inquiry.query.options(
+                db.with_expression(Inquiry.message_preview, db.func.substr(Inquiry.message, 1, 100))
+            )
+            
+            if status_filter:
+                query = query.filter(Inquiry.status == status_filter)
+            if type_filter:
+                query = query.filter(Inquiry.message_type == type_filter)
+            if user_type_filter:
+                query = query.filter(Inquiry.user_type == user_type_filter)
+            if grade_filter:
+                query = query.filter(Inquiry.student_grade == grade_filter)
+            if section_filter:
+                query = query.filter(Inquiry.student_section == section_filter)
+            if search_filter:
+                query = query.filter(
+                    db.or_(
+                        Inquiry.title.contains(search_filter),
+                        Inquiry.message.contains(search_filter),
+                        Inquiry.student_name.contains(search_filter)
+                    )
+                )
+            
+            # ترتيب حسب التاريخ (الأحدث أولاً)
+            query = query.order_by(Inquiry.submission_date.desc())
+            
+            # ترقيم الصفحات
+            inquiries = query.paginate(page=page, per_page=20, error_out=False)
+            
+            # إحصائيات
+            total_inquiries = Inquiry.query.count()
+            pending_inquiries = Inquiry.query.filter_by(status='قيد المراجعة').count()
+            responded_inquiries = Inquiry.query.filter_by(status='تم الرد').count()
+            unique_students = db.session.query(db.func.count(db.distinct(Inquiry.student_civil_id))).scalar()
+            
+            # قائمة الصفوف والشعب وأنواع المستخدمين للفلتر
+            grades = db.session.query(Inquiry.student_grade).distinct().all()
+            grades = [grade[0] for grade in grades]
+            
+            sections = db.session.query(Inquiry.student_section).distinct().all()
+            sections = [section[0] for section in sections]
+            
+            user_types = db.session.query(Inquiry.user_type).distinct().all()
+            user_types = [user_type[0] for user_type in user_types]
+            
+            # الحصول على حالة تفعيل الاستفسارات
+            student_inquiries_enabled = get_system_setting('student_inquiries_enabled', '1')
+            teacher_inquiries_enabled = get_system_setting('teacher_inquiries_enabled', '1')
+            
+            school_settings = get_school_settings()
+            current_year = datetime.now().year
+            return render_template('admin_inquiries.html', 
+                                 inquiries=inquiries,
+                                 total_inquiries=total_inquiries,
+                                 pending_inquiries=pending_inquiries,
+                                 responded_inquiries=responded_inquiries,
+                                 unique_students=unique_students,
+                                 grades=grades,
+                                 sections=sections,
+                                 user_types=user_types,
+                                 student_inquiries_enabled=student_inquiries_enabled,
+                                 teacher_inquiries_enabled=teacher_inquiries_enabled,
+                                 school_settings=school_settings,
+                                 current_year=current_year)
+        except Exception as e:
+            # إذا كان هناك خطأ في قاعدة البيانات، عرض رسالة للمشرف
+            flash('يوجد مشكلة في قاعدة البيانات. يرجى الضغط على زر "إصلاح قاعدة البيانات" في لوحة التحكم لحل المشكلة.', 'warning')
+            return redirect(url_for('admin.admin_dashboard'))
+    else:
+        flash('ليس لديك صلاحية للوصول لهذه الصفحة', 'danger')
+        return redirect(url_for('teacher.login'))
+
+@bp.route('/admin/inquiries/<int:inquiry_id>')
+def get_inquiry(inquiry_id):
+    if 'role' in session and (session['role'] == 'مشرف' or session['role'] == 'مشرف محتوى'):
+        try:
+            inquiry = Inquiry.query.options(db.undefer_group('body')).filter_by(id=inquiry_id).first_or_404()
+            return jsonify({
+                'id': inquiry.id,
+                'student_name': inquiry.student_name,
+                'student_grade': inquiry.student_grade,
+                'student_section': inquiry.student_section,
+                'message_type': inquiry.message_type,
+                'title': inquiry.title,
+                'message': inquiry.message,
+                'phone': inquiry.phone,
+                'status': inquiry.status,
+                'response': inquiry.response,
+                'submission_date': inquiry.submission_date.strftime('%Y-%m-%d %H:%M'),
+                'last_updated': inquiry.last_updated.strftime('%Y-%m-%d %H:%M') if inquiry.response else None
+            })
+        except Exception as e:
+            return jsonify({'error': 'خطأ في قاعدة البيانات'}), 500
+    else:
+        return jsonify({'error': 'غير مصرح'}), 403
+
+@bp.route('/admin/inquiries/<int:inquiry_id>/respond', methods=['POST'])
+def respond_to_inquiry(inquiry_id):
+    if 'role' in session and (session['role'] == 'مشرف' or session['role'] == 'مشرف محتوى'):
+        try:
+            inquiry = Inquiry.query.get_or_404(inquiry_id)
+            response_text = request.form.get('response', '').strip()
+            
+            if response_text:
+                inquiry.response = response_text
+                inquiry.status = 'تم الرد'
+                inquiry.is_read = False  # تعيين كغير مقروء عند الرد
+                inquiry.last_updated = datetime.utcnow()
+                
+                db.session.commit()
+                flash('تم إرسال الرد بنجاح', 'success')
+            else:
+                flash('يرجى كتابة رد', 'danger')
+        except Exception as e:
+            flash('حدث خطأ أثناء حفظ الرد. يرجى التأكد من إصلاح قاعدة البيانات.', 'danger')
+    else:
+        flash('ليس لديك صلاحية للوصول لهذه الصفحة', 'danger')
+    
+    return redirect(url_for('admin.admin_inquiries'))
+
+@bp.route('/admin/inquiries/delete_all', methods=['POST'])
+def delete_all_inquiries():
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    
+    try:
+        # الحصول على عدد الاستفسارات قبل الحذف
+        inquiries_count = Inquiry.query.count()
+        
+        # حذف جميع الاستفسارات من قاعدة البيانات
+        Inquiry.query.delete()
+        db.session.commit()
+        
+        # تسجيل العملية
+        log_activity(
+            operation_type='حذف',
+            table_name='inquiries',
+            old_data={'count': inquiries_count},
+            description=f'حذف جميع الاستفسارات والشكاوى ({inquiries_count} استفسار)'
+        )
+        
+        flash('تم حذف جميع الاستفسارات والشكاوى بنجاح', 'success')
+    except Exception as e:
+        db.session.rollback()
+        flash('حدث خطأ أثناء حذف الاستفسارات', 'danger')
+    
+    return redirect(url_for('admin.admin_inquiries'))
+
+@bp.route('/admin/inquiries/toggle_student_feature', methods=['POST'])
+def toggle_student_inquiries_feature():
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    
+    try:
+        action = request.form.get('action')
+        if action == 'enable':
+            set_system_setting('student_inquiries_enabled', '1', 'تفعيل استفسارات الطلاب')
+            flash('تم تفعيل استفسارات الطلاب بنجاح! 🎉', 'success')
+        elif action == 'disable':
+            set_system_setting('student_inquiries_enabled', '0', 'إلغاء تفعيل استفسارات الطلاب')
+            flash('تم إلغاء تفعيل استفسارات الطلاب بنجاح! 🔒', 'success')
+        else:
+            flash('إجراء غير صحيح', 'danger')
+    except Exception as e:
+        flash('حدث خطأ أثناء تحديث الإعدادات', 'danger')
+    
+    return redirect(url_for('admin.admin_inquiries'))
+
+@bp.route('/admin/inquiries/toggle_teacher_feature', methods=['POST'])
+def toggle_teacher_inquiries_feature():
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    
+    try:
+        action = request.form.get('action')
+        if action == 'enable':
+            set_system_setting('teacher_inquiries_enabled', '1', 'تفعيل استفسارات المعلمين')
+            flash('تم تفعيل استفسارات المعلمين بنجاح! 🎉', 'success')
+        elif action == 'disable':
+            set_system_setting('teacher_inquiries_enabled', '0', 'إلغاء تفعيل استفسارات المعلمين')
+            flash('تم إلغاء تفعيل استفسارات المعلمين بنجاح! 🔒', 'success')
+        else:
+            flash('إجراء غير صحيح', 'danger')
+    except Exception as e:
+        flash('حدث خطأ أثناء تحديث الإعدادات', 'danger')
+    
+    return redirect(url_for('admin.admin_inquiries'))
+
+@bp.route('/admin/settings', methods=['GET', 'POST'])
+def admin_settings():
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    
+    try:
+        # الحصول على إعدادات المدرسة الحالية
+        try:
+            school_settings = SchoolSettings.query.first()
+        except Exception as e:
+            print(f"خطأ في قراءة إعدادات المدرسة: {e}")
+            # إذا كان هناك خطأ، توجيه المستخدم لإصلاح قاعدة البيانات
+            flash('يبدو أن هناك مشكلة في قاعدة البيانات. يرجى الضغط على زر "إصلاح جدول الإعدادات" أدناه.', 'danger')
+            return render_template('admin_settings.html', school_settings=None)
+        
+        if request.method == 'POST':
+            # معالجة رفع الشعار
+            logo_file = request.files.get('school_logo')
+            logo_filename = None
+            
+            if logo_file and logo_file.filename:
+                try:
+                    # التأكد من وجود مجلد الصور
+                    images_dir = os.path.join('assets', 'images')
+                    if not os.path.exists(images_dir):
+                        os.makedirs(images_dir)
+                    
+                    # حفظ الشعار الجديد
+                    logo_filename = secure_filename(logo_file.filename)
+                    logo_path = os.path.join(images_dir, logo_filename)
+                    logo_file.save(logo_path)
+                    
+                    # حذف الشعار القديم إذا كان موجود
+                    if school_settings and school_settings.school_logo:
+                        old_logo_path = os.path.join(images_dir, school_settings.school_logo)
+                        if os.path.exists(old_logo_path) and old_logo_path != logo_path:
+                            os.remove(old_logo_path)
+                except Exception as file_error:
+                    print(f"خطأ في معالجة الملف: {file_error}")
+                    flash(f'خطأ في معالجة الصورة: {str(file_error)}', 'danger')
+                    return render_template('admin_settings.html', school_settings=school_settings)
+            elif school_settings:
+                logo_filename = school_settings.school_logo
+            
+            try:
+                # تحديث أو إنشاء إعدادات المدرسة
+                if school_settings:
+                    school_settings.school_logo = logo_filename
+                    school_settings.school_name = request.form.get('school_name', '')
+                    school_settings.school_address = request.form.get('school_address', '')
+                    school_settings.school_phone = request.form.get('school_phone', '')
+                    school_settings.school_email = request.form.get('school_email', '')
+                    school_settings.school_vision = request.form.get('school_vision', '')
+                    school_settings.school_mission = request.form.get('school_mission', '')
+                    school_settings.school_values = request.form.get('school_values', '')
+                    school_settings.google_maps_url = request.form.get('google_maps_url', '')
+                    school_settings.youtube_url = request.form.get('youtube_url', '')
+                    school_settings.instagram_url = request.form.get('instagram_url', '')
+                    school_settings.telegram_url = request.form.get('telegram_url', '')
+                    school_settings.snapchat_url = request.form.get('snapchat_url', '')
+                    school_settings.whatsapp_url = request.form.get('whatsapp_url', '')
+                    school_settings.academic_year = request.form.get('academic_year', '')
+                    school_settings.academic_semester = request.form.get('academic_semester', '')
+                else:
+                    school_settings = SchoolSettings(
+                        school_logo=logo_filename,
+                        school_name=request.form.get('school_name', ''),
+                        school_address=request.form.get('school_address', ''),
+                        school_phone=request.form.get('school_phone', ''),
+                        school_email=request.form.get('school_email', ''),
+                        school_vision=request.form.get('school_vision', ''),
+                        school_mission=request.form.get('school_mission', ''),
+                        school_values=request.form.get('school_values', ''),
+                        google_maps_url=request.form.get('google_maps_url', ''),
+                        youtube_url=request.form.get('youtube_url', ''),
+                        instagram_url=request.form.get('instagram_url', ''),
+                        telegram_url=request.form.get('telegram_url', ''),
+                        snapchat_url=request.form.get('snapchat_url', ''),
+                        whatsapp_url=request.form.get('whatsapp_url', ''),
+                        academic_year=request.form.get('academic_year', ''),
+                        academic_semester=request.form.get('academic_semester', '')
+                    )
+                    db.session.add(school_settings)
+                
+                db.session.commit()
+                flash('تم حفظ إعدادات المدرسة بنجاح! ✅', 'success')
+                return redirect(url_for('admin.admin_settings'))
+                
+            except Exception as db_error:
+                db.session.rollback()
+                print(f"خطأ في قاعدة البيانات: {db_error}")
+                flash(f'خطأ في حفظ البيانات: {str(db_error)}', 'danger')
+                return render_template('admin_settings.html', school_settings=school_settings)
+        
+        return render_template('admin_settings.html', school_settings=school_settings)
+        
+    except Exception as e:
+        print(f"خطأ عام: {e}")
+        flash(f'حدث خطأ أثناء حفظ الإعدادات: {str(e)}', 'danger')
+        return render_template('admin_settings.html', school_settings=school_settings)
+
+@bp.route('/admin/activities', methods=['GET', 'POST'])
+def admin_activities():
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    
+    if request.method == 'POST':
+        try:
+            name = request.form.get('name')
+            description = request.form.get('description')
+            activity_date = request.form.get('activity_date')
+            media_type = request.form.get('media_type')
+            
+            if not all([name, description, activity_date, media_type]):
+                flash('يرجى ملء جميع الحقول المطلوبة', 'danger')
+                return redirect(url_for('admin.admin_activities'))
+            
+            # التحقق من الملف
+            if 'file' not in request.files or request.files['file'].filename == '':
+                flash('يرجى اختيار ملف', 'danger')
+                return redirect(url_for('admin.admin_activities'))
+            
+            file = request.files['file']
+            
+            # التحقق من نوع الملف
+            allowed_image_extensions = {'jpg', 'jpeg', 'png'}
+            allowed_video_extensions = {'mp4'}
+            
+            if media_type == 'صورة':
+                if not file.filename.lower().endswith(tuple('.' + ext for ext in allowed_image_extensions)):
+                    flash('يرجى رفع ملف صورة بصيغة JPEG أو PNG', 'danger')
+                    return redirect(url_for('admin.admin_activities'))
+            elif media_type == 'فيديو':
+                if not file.filename.lower().endswith('.mp4'):
+                    flash('يرجى رفع ملف فيديو بصيغة MP4', 'danger')
+                    return redirect(url_for('admin.admin_activities'))
+            
+            # إنشاء مجلد الأنشطة إذا لم يكن موجود
+            activities_dir = os.path.join('assets', 'activities')
+            os.makedirs(activities_dir, exist_ok=True)
+            
+            # حفظ الملف في مخزن الوسائط باسم بصمته
+            filename = store_upload('activity_file', file)
+            if media_type == 'صورة':
+                describe_image('activity_file', filename)
+            
+            # إنشاء نشاط جديد
+            activity = SchoolActivity(
+                name=name,
+                description=description,
+                activity_date=datetime.strptime(activity_date, '%Y-%m-%d').date(),
+                upload_date=datetime.utcnow()
+            )
+            
+            db.session.add(activity)
+            db.session.flush()  # للحصول على ID النشاط
+            
+            # إنشاء سجل الوسائط
+            activity_media = ActivityMedia(
+                activity_id=activity.id,
+                media_type=media_type,
+                file_path=filename,
+                file_name=file.filename,
+                is_primary=True,
+                display_order=0,
+                # الصورة المصغرة والمدة والدقة تحسب في الخلفية
+                processing_status=STATUS_PENDING if media_type == 'فيديو' else None
+            )
+            
+            db.session.add(activity_media)
+            db.session.commit()
+            schedule_processing()
+            
+            # تسجيل العملية
+            log_activity(
+                operation_type='إضافة',
+                table_name='school_activities',
+                record_id=str(activity.id),
+                new_data={
+                    'id': activity.id,
+                    'name': activity.name,
+                    'description': activity.description,
+                    'activity_date': activity.activity_date.isoformat(),
+                    'media_type': media_type,
+                    'file_path': filename,
+                    'upload_date': activity.upload_date.isoformat() if activity.upload_date else None
+                },
+                description=f'إضافة نشاط جديد: {activity.name}'
+            )
+            
+            flash('تم رفع النشاط بنجاح', 'success')
+            return redirect(url_for('admin.admin_activities'))
+            
+        except Exception as e:
+            flash(f'حدث خطأ أثناء رفع النشاط: {str(e)}', 'danger')
+            return redirect(url_for('admin.admin_activities'))
+    
+    # جلب الأنشطة مع الوسائط المرتبطة
+    try:
+        query = SchoolActivity.query
+        activities = query.order_by(SchoolActivity.activity_date.desc()).all()
+        
+        # جلب الوسائط لكل نشاط
+        for activity in activities:
+            activity.media = ActivityMedia.query.filter_by(activity_id=activity.id).order_by(ActivityMedia.display_order).all()
+        
+        school_settings = get_school_settings()
+        current_year = datetime.now().year
+        return render_template('admin_activities.html', activities=activities, school_settings=school_settings, current_year=current_year)
+        
+    except Exception as e:
+        flash(f'حدث خطأ في عرض الأنشطة: {str(e)}', 'danger')
+        school_settings = get_school_settings()
+        current_year = datetime.now().year
+        return render_template('admin_activities.html', activities=[], school_settings=school_settings, current_year=current_year)
+
+@bp.route('/admin/activities/delete/<int:activity_id>', methods=['POST'])
+def delete_activity(activity_id):
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    
+    try:
+        activity = SchoolActivity.query.get_or_404(activity_id)
+        
+        # تسجيل البيانات القديمة قبل الحذف
+        old_data = {
+            'id': activity.id,
+            'name': activity.name,
+            'description': activity.description,
+            'activity_date': activity.activity_date.isoformat(),
+            'upload_date': activity.upload_date.isoformat() if activity.upload_date else None
+        }
+        
+        # حذف جميع الوسائط المرتبطة
+        media_list = ActivityMedia.query.filter_by(activity_id=activity_id).all()
+        for media in media_list:
+            # إنقاص مراجع الملف والصورة المصغرة ونسخ المتصفح
+            release_file('activity_file', media.file_path)
+            release_file('activity_file', media.thumbnail_path)
+            release_file('activity_file', media.web_path)
+            release_file('activity_file', media.web_low_path)
+        
+        # حذف النشاط (سيحذف الوسائط تلقائياً بسبب cascade)
+        db.session.delete(activity)
+        db.session.commit()
+        
+        # تسجيل العملية
+        log_activity(
+            operation_type='حذف',
+            table_name='school_activities',
+            record_id=str(activity_id),
+            old_data=old_data,
+            description=f'حذف نشاط: {old_data["name"]} مع {len(media_list)} ملفات'
+        )
+        
+        flash('تم حذف النشاط بنجاح', 'success')
+        
+    except Exception as e:
+        flash(f'حدث خطأ أثناء حذف النشاط: {str(e)}', 'danger')
+    
+    return redirect(url_for('admin.admin_activities'))
+
+@bp.route('/admin/activities/delete_all', methods=['POST'])
+def delete_all_activities():
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return redirect(url_for('teacher.login'))
+    
+    try:
+        activities_count = SchoolActivity.query.count()
+        media_paths = db.session.query(ActivityMedia.file_path, ActivityMedia.thumbnail_path, ActivityMedia.web_path, ActivityMedia.web_low_path).all()
+        total_media_count = len(media_paths)
+        
+        # إنقاص مراجع جميع الملفات والصور المصغرة
+        release_files('activity_file', [path for paths in media_paths for path in paths])
+        
+        # حذف جميع الأنشطة ووسائطها (الحذف الجماعي لا يطبق cascade)
+        ActivityMedia.query.delete()
+        SchoolActivity.query.delete()
+        db.session.commit()
+        
+        # تسجيل العملية
+        log_activity(
+            operation_type='حذف',
+            table_name='school_activities',
+            old_data={'count': activities_count, 'media_count': total_media_count},
+            description=f'حذف جميع الأنشطة ({activities_count} نشاط) مع {total_media_count} ملف'
+        )
+        
+        flash('تم حذف جميع الأنشطة بنجاح', 'success')
+        
+    except Exception as e:
+        flash(f'حدث خطأ أثناء حذف الأنشطة: {str(e)}', 'danger')
+    
+    return redirect(url_for('admin.admin_activities'))
+
+@bp.route('/admin/activities/upload_multiple', methods=['POST'])
+def upload_multiple_activity_files():
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return jsonify({'success': False, 'message': 'غير مصرح لك بهذه العملية'})
+    
+    try:
+        # التحقق من البيانات المطلوبة
+        name = request.form.get('name')
+        description = request.form.get('description')
+        activity_date = request.form.get('activity_date')
+        
+        if not all([name, description, activity_date]):
+            return jsonify({'success': False, 'message': 'يرجى ملء جميع الحقول المطلوبة'})
+        
+        # التحقق من الملفات: مرفوعة مسبقاً على أجزاء (upload_ids[]) أو داخل النموذج (files[])
+        upload_ids = request.form.getlist('upload_ids[]')
+        if 'files[]' not in request.files and not upload_ids:
+            return jsonify({'success': False, 'message': 'يرجى اختيار ملفات'})
+        
+        files = request.files.getlist('files[]')
+        if not upload_ids and (not files or all(file.filename == '' for file in files)):
+            return jsonify({'success': False, 'message': 'يرجى اختيار ملفات صحيحة'})
+        
+        try:
+            pending_uploads = [get_upload(upload_id, session['civil_id'], complete=True) for upload_id in upload_ids]
+        except UploadError as e:
+            return jsonify({'success': False, 'message': e.message})
+        
+        # التحقق من أنواع الملفات
+        allowed_image_extensions = {'jpg', 'jpeg', 'png'}
+        allowed_video_extensions = {'mp4', 'avi', 'mov'}
+        
+        uploaded_files = []
+        sources = [(file, None, file.filename) for file in files] + [(None, upload['upload_id'], upload['filename']) for upload in pending_uploads]
+        for file, upload_id, original_name in sources:
+            if original_name == '':
+                continue
+                
+            file_extension = original_name.rsplit('.', 1)[1].lower()
+            
+            # تحديد نوع الوسائط
+            if file_extension in allowed_image_extensions:
+                media_type = 'صورة'
+            elif file_extension in allowed_video_extensions:
+                media_type = 'فيديو'
+            else:
+                return jsonify({'success': False, 'message': f'نوع الملف {original_name} غير مدعوم'})
+            
+            uploaded_files.append({
+                'file': file,
+                'upload_id': upload_id,
+                'media_type': media_type,
+                'original_name': original_name
+            })
+        
+        # إنشاء النشاط
+        activity = SchoolActivity(
+            name=name,
+            description=description,
+            activity_date=datetime.strptime(activity_date, '%Y-%m-%d').date()
+        )
+        
+        db.session.add(activity)
+        db.session.flush()  # للحصول على ID النشاط
+        
+        # إنشاء مجلد الأنشطة إذا لم يكن موجود
+        activities_dir = os.path.join('assets', 'activities')
+        os.makedirs(activities_dir, exist_ok=True)
+        
+        # حفظ الملفات
+        for index, file_data in enumerate(uploaded_files):
+            file = file_data['file']
+            media_type = file_data['media_type']
+            original_name = file_data['original_name']
+            
+            # حفظ الملف في مخزن الوسائط باسم بصمته مع ضغط الصور الجديدة
+            process = compress_image if media_type == 'صورة' else None
+            if file_data['upload_id']:
+                # الملف مرفوع مسبقاً على أجزاء: نقل دون نسخ
+                temp_file = temp_path('activity_file', os.path.splitext(original_name)[1].lower())
+                upload = claim_upload(file_data['upload_id'], session['civil_id'], temp_file)
+                filename = store_file('activity_file', temp_file, original_name, sha256=upload['sha256'], process=process)
+            else:
+                filename = store_upload('activity_file', file, process=process)
+            if media_type == 'صورة':
+                describe_image('activity_file', filename)
+            
+            # إنشاء سجل الوسائط
+            activity_media = ActivityMedia(
+                activity_id=activity.id,
+                media_type=media_type,
+                file_path=filename,
+                file_name=original_name,
+                is_primary=(index == 0),  # أول ملف يكون رئيسي
+                display_order=index,
+                processing_status=STATUS_PENDING if media_type == 'فيديو' else None
+            )
+            
+            db.session.add(activity_media)
+        
+        db.session.commit()
+        schedule_processing()
+        
+        # تسجيل العملية
+        log_activity(
+            operation_type='إضافة',
+            table_name='school_activities',
+            record_id=str(activity.id),
+            new_data={
+                'id': activity.id,
+                'name': activity.name,
+                'description': activity.description,
+                'activity_date': activity.activity_date.isoformat(),
+                'media_count': len(uploaded_files),
+                'upload_date': activity.upload_date.isoformat() if activity.upload_date else None
+            },
+            description=f'إضافة نشاط جديد: {activity.name} مع {len(uploaded_files)} ملفات'
+        )
+        
+        return jsonify({
+            'success': True, 
+            'message': f'تم رفع النشاط بنجاح مع {len(uploaded_files)} ملفات',
+            'activity_id': activity.id
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': f'حدث خطأ أثناء رفع النشاط: {str(e)}'})
+
+def _upload_response(meta):
+    return jsonify(dict(progress(meta), success=True,
+                        chunk_size=min(current_app.config['UPLOAD_CHUNK_SIZE'], current_app.config['MAX_CONTENT_LENGTH'] or current_app.config['UPLOAD_CHUNK_SIZE'])))
+
+def _upload_error(error):
+    body = {'success': False, 'message': error.message}
+    if error.offset is not None:
+        body['offset'] = error.offset
+    return jsonify(body), error.status
+
+@bp.route('/admin/uploads', methods=['POST'])
+def start_upload():
+    """بدء رفع ملف كبير على أجزاء (انظر school/uploads.py)"""
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return jsonify({'success': False, 'message': 'غير مصرح لك بهذه العملية'}), 403
+    data = request.get_json(silent=True) or {}
+    try:
+        size = int(data.get('size'))
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'message': 'اسم الملف وحجمه مطلوبان'}), 400
+    try:
+        meta = create_upload(data.get('filename'), size, session['civil_id'])
+    except UploadError as e:
+        return _upload_error(e)
+    return _upload_response(meta), 201
+
+@bp.route('/admin/uploads/<upload_id>', methods=['GET', 'PATCH', 'DELETE'])
+def resumable_upload(upload_id):
+    """تقدم الرفع (GET)، أو إضافة الجزء التالي (PATCH مع Upload-Offset)، أو إلغاؤه (DELETE)"""
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return jsonify({'success': False, 'message': 'غير مصرح لك بهذه العملية'}), 403
+    try:
+        if request.method == 'PATCH':
+            offset = request.headers.get('Upload-Offset', type=int)
+            if offset is None:
+                return jsonify({'success': False, 'message': 'رأس Upload-Offset مطلوب'}), 400
+            meta = append_chunk(upload_id, session['civil_id'], offset, request.stream, request.content_length)
+        elif request.method == 'DELETE':
+            cancel_upload(upload_id, session['civil_id'])
+            return jsonify({'success': True})
+        else:
+            meta = get_upload(upload_id, session['civil_id'])
+    except UploadError as e:
+        return _upload_error(e)
+    return _upload_response(meta)
+
+@bp.route('/admin/activities/reorder_media', methods=['POST'])
+def reorder_activity_media():
+    print("=== بداية reorder_activity_media ===")
+    
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        print("خطأ في الصلاحيات")
+        return jsonify({'success': False, 'message': 'غير مصرح لك بهذه العملية'})
+    
+    try:
+        data = request.get_json()
+        print("البيانات المستلمة:", data)
+        
+        activity_id = int(data.get('activity_id')) if data.get('activity_id') else None
+        media_order = data.get('media_order', [])  # قائمة بترتيب معرفات الوسائط
+        primary_media_id = int(data.get('primary_media_id')) if data.get('primary_media_id') else None
+        
+        print("activity_id:", activity_id)
+        print("media_order:", media_order)
+        print("primary_media_id:", primary_media_id)
+        
+        if not activity_id:
+            print("معرف النشاط مفقود")
+            return jsonify({'success': False, 'message': 'معرف النشاط مطلوب'})
+        
+        # التحقق من وجود النشاط
+        activity = SchoolActivity.query.get(activity_id)
+        if not activity:
+            print("النشاط غير موجود")
+            return jsonify({'success': False, 'message': 'النشاط غير موجود'})
+        
+        print("النشاط موجود:", activity.name)
+        
+        # إعادة ترتيب الوسائط
+        updated_count = 0
+        for index, media_id in enumerate(media_order):
+            media_id = int(media_id) if media_id else None
+            if not media_id:
+                continue
+                
+            media = ActivityMedia.query.get(media_id)
+            if media and media.activity_id == activity_id:
+                print(f"تحديث الوسائط {media_id}: display_order={index}, is_primary={media_id == primary_media_id}")
+                media.display_order = index
+                # تعيين الوسائط كرئيسية أو غير رئيسية
+                if media_id == primary_media_id:
+                    media.is_primary = True
+                else:
+                    media.is_primary = False
+                updated_count += 1
+        
+        print(f"تم تحديث {updated_count} وسائط")
+        
+        db.session.commit()
+        print("تم حفظ التغييرات في قاعدة البيانات")
+        
+        return jsonify({'success': True, 'message': 'تم تحديث ترتيب الوسائط بنجاح'})
+        
+    except Exception as e:
+        print("خطأ في reorder_activity_media:", str(e))
+        db.session.rollback()
+        return jsonify({'success': False, 'message': f'حدث خطأ: {str(e)}'})
+
+@bp.route('/admin/activities/delete_media/<int:media_id>', methods=['POST'])
+def delete_activity_media(media_id):
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return jsonify({'success': False, 'message': 'غير مصرح لك بهذه العملية'})
+    
+    try:
+        media = ActivityMedia.query.get_or_404(media_id)
+        activity_id = media.activity_id
+        
+        # إنقاص مراجع الملف والصورة المصغرة
+        release_file('activity_file', media.file_path)
+        release_file('activity_file', media.thumbnail_path)
+        release_file('activity_file', media.web_path)
+        release_file('activity_file', media.web_low_path)
+        
+        db.session.delete(media)
+        db.session.commit()
+        
+        # إذا كان هذا آخر ملف، احذف النشاط أيضاً
+        remaining_media = ActivityMedia.query.filter_by(activity_id=activity_id).count()
+        if remaining_media == 0:
+            activity = SchoolActivity.query.get(activity_id)
+            if activity:
+                db.session.delete(activity)
+                db.session.commit()
+                return jsonify({'success': True, 'message': 'تم حذف الوسائط والنشاط بنجاح', 'activity_deleted': True})
+        
+        return jsonify({'success': True, 'message': 'تم حذف الوسائط بنجاح'})
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': f'حدث خطأ أثناء حذف الوسائط: {str(e)}'})
+
+@bp.route('/admin/activities/<int:activity_id>/media')
+def get_activity_media(activity_id):
+    print(f"=== بداية get_activity_media للنشاط {activity_id} ===")
+    
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        print("خطأ في الصلاحيات")
+        return jsonify({'success': False, 'message': 'غير مصرح لك بهذه العملية'})
+    
+    try:
+        activity = SchoolActivity.query.get_or_404(activity_id)
+        print(f"النشاط موجود: {activity.name}")
+        
+        media_list = ActivityMedia.query.filter_by(activity_id=activity_id).order_by(ActivityMedia.display_order).all()
+        print(f"عدد الوسائط: {len(media_list)}")
+        
+        media_data = []
+        for media in media_list:
+            media_item = {
+                'id': media.id,
+                'media_type': media.media_type,
+                'file_path': media.file_path,
+                'file_name': media.file_name,
+                'thumbnail_path': media.thumbnail_path,
+                'file_url': media_url('activity_file', media.file_path),
+                'thumbnail_url': media_url('activity_file', media.thumbnail_path),
+                # نسخة MP4 للمتصفح إن وجدت، وإلا الأصل
+                'video_url': media_url('activity_file', media.web_path or media.file_path),
+                'video_low_url': media_url('activity_file', media.web_low_path),
+                'is_primary': media.is_primary,
+                'display_order': media.display_order,
+                'upload_date': media.upload_date.isoformat() if media.upload_date else None
+            }
+            media_data.append(media_item)
+            print(f"وسائط {media.id}: {media.file_name}, رئيسية: {media.is_primary}")
+        
+        print("البيانات المرسلة:", media_data)
+        
+        return jsonify({
+            'success': True,
+            'media': media_data
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'حدث خطأ: {str(e)}'})
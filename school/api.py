@@ -0,0 +1,320 @@
+"""واجهات JSON: المواد والتقويم ورفع صور المحرر"""
+import hashlib
+import json
+from flask import Blueprint, Response, request, session, jsonify
+from datetime import datetime
+from .models import db, CalendarEvent, Inquiry, Student
+from .helpers import get_school_settings, log_activity, save_uploaded_image
+from .media import media_url
+from .uploads import file_size
+from .feeds import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, materials_feed, materials_page, stage_subjects
+
+bp = Blueprint('api', __name__)
+
+@bp.route('/api/upload_editor_image', methods=['POST'])
+def upload_editor_image():
+    """رفع صورة من محرر النصوص الغني"""
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return jsonify({'error': 'غير مصرح'}), 403
+    
+    try:
+        if 'image' not in request.files:
+            return jsonify({'error': 'لم يتم اختيار ملف'}), 400
+        
+        file = request.files['image']
+        if file.filename == '':
+            return jsonify({'error': 'لم يتم اختيار ملف'}), 400
+        
+        # التحقق من نوع الملف
+        allowed_extensions = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+        if not file.filename.lower().endswith(tuple('.' + ext for ext in allowed_extensions)):
+            return jsonify({'error': 'نوع الملف غير مسموح'}), 400
+        
+        # التحقق من حجم الملف (5MB كحد أقصى) من موضع نهاية الملف دون قراءته
+        if file_size(file) > 5 * 1024 * 1024:
+            return jsonify({'error': 'حجم الملف كبير جداً (الحد الأقصى 5MB)'}), 400
+        
+        # حفظ الصورة (مرجع دائم في مخزن الوسائط لأنها داخل نص الخبر)
+        filename = save_uploaded_image(file, 'news')
+        if filename:
+            db.session.commit()
+            image_url = media_url('news_image', filename)
+            return jsonify({
+                'success': True,
+                'url': image_url,
+                'filename': filename
+            })
+        else:
+            return jsonify({'error': 'فشل في حفظ الصورة'}), 500
+            
+    except Exception as e:
+        return jsonify({'error': f'خطأ في الخادم: {str(e)}'}), 500
+
+# معاملات الصفحة؛ وجود أي منها يرجع {items, next_cursor, sync_cursor} بدل القائمة الكاملة
+PAGE_PARAMS = ('subject', 'material_type', 'limit', 'cursor', 'since')
+
+@bp.route('/api/student_materials')
+def api_student_materials():
+    """مواد مرحلة الطالب: كاملة، أو صفحة مرشحة بالمادة والنوع مع مؤشر للصفحة التالية وللجديد منذ آخر زيارة"""
+    if 'student_civil_id' not in session:
+        return {'error': 'غير مصرح'}, 401
+    
+    student = Student.query.filter_by(civil_id=session['student_civil_id']).first()
+    if not student:
+        return {'error': 'غير مصرح'}, 401
+    
+    # بدون معاملات: قائمة مواد المرحلة كاملة من الذاكرة (الصيغة القديمة)
+    if not any(request.args.get(param) for param in PAGE_PARAMS):
+        body, etag = materials_feed(student.grade)
+    else:
+        try:
+            limit = min(max(int(request.args.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+            page = materials_page(student.grade, subject=request.args.get('subject'),
+                                  material_type=request.args.get('material_type'), limit=limit,
+                                  cursor=request.args.get('cursor'), since=request.args.get('since'))
+        except ValueError:
+            return {'error': 'معاملات غير صالحة'}, 400
+        body = json.dumps(page, ensure_ascii=False).encode('utf-8')
+        etag = hashlib.sha256(body).hexdigest()[:32]
+
+    # 304 إذا كانت نسخة المتصفح (If-None-Match) ما زالت صالحة
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+@bp.route('/api/student_materials/subjects')
+def api_student_material_subjects():
+    """المواد الدراسية لمرحلة الطالب مع عدد المواد التعليمية وتاريخ آخر رفع (لاختيار المادة الأولى ومعرفة المحذوف)"""
+    if 'student_civil_id' not in session:
+        return {'error': 'غير مصرح'}, 401
+    student = Student.query.filter_by(civil_id=session['student_civil_id']).first()
+    if not student:
+        return {'error': 'غير مصرح'}, 401
+    return jsonify(stage_subjects(student.grade))
+
+@bp.route('/mark_inquiry_read/<int:inquiry_id>', methods=['POST'])
+def mark_inquiry_read(inquiry_id):
+    """تحديث حالة القراءة للاستفسار"""
+    try:
+        inquiry = Inquiry.query.get_or_404(inquiry_id)
+        
+        # التحقق من أن المستخدم يملك هذا الاستفسار
+        if 'civil_id' in session:
+            if inquiry.student_civil_id == session['civil_id']:
+                inquiry.is_read = True
+                db.session.commit()
+                return jsonify({'success': True})
+        elif 'student_civil_id' in session:
+            if inquiry.student_civil_id == session['student_civil_id']:
+                inquiry.is_read = True
+                db.session.commit()
+                return jsonify({'success': True})
+        
+        return jsonify({'error': 'غير مصرح'}), 403
+    except Exception as e:
+        return jsonify({'error': 'خطأ في قاعدة البيانات'}), 500
+
+@bp.route('/api/calendar/events')
+def get_calendar_events():
+    """الحصول على جميع أحداث التقويم"""
+    events = CalendarEvent.query.all()
+    events_data = []
+    
+    for event in events:
+        events_data.append({
+            'id': event.id,
+            'title': event.title,
+            'start': event.start_date.strftime('%Y-%m-%d'),
+            'end': event.end_date.strftime('%Y-%m-%d'),
+            'type': event.event_type,
+            'time': event.event_time,
+            'location': event.location,
+            'description': event.description
+        })
+    
+    return jsonify(events_data)
+
+@bp.route('/api/calendar/events', methods=['POST'])
+def create_calendar_event():
+    """إنشاء حدث جديد في التقويم"""
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return jsonify({'error': 'غير مصرح، يجب أن تكون مشرفاً لإضافة أحداث'}), 403
+    
+    data = request.get_json()
+    
+    try:
+        new_event = CalendarEvent(
+            title=data['title'],
+            event_type=data['type'],
+            start_date=datetime.strptime(data['start'], '%Y-%m-%d').date(),
+            end_date=datetime.strptime(data['end'], '%Y-%m-%d').date(),
+            event_time=data.get('time'),
+            location=data.get('location'),
+            description=data.get('description')
+        )
+        
+        db.session.add(new_event)
+        db.session.commit()
+        
+        # تسجيل العملية
+        log_activity(
+            operation_type='إضافة',
+            table_name='calendar_events',
+            record_id=str(new_event.id),
+            new_data={
+                'id': new_event.id,
+                'title': new_event.title,
+                'event_type': new_event.event_type,
+                'start_date': new_event.start_date.isoformat(),
+                'end_date': new_event.end_date.isoformat(),
+                'event_time': new_event.event_time,
+                'location': new_event.location,
+                'description': new_event.description,
+                'created_at': new_event.created_at.isoformat() if new_event.created_at else None,
+                'updated_at': new_event.updated_at.isoformat() if new_event.updated_at else None
+            },
+            description=f'إضافة حدث جديد في التقويم: {new_event.title}'
+        )
+        
+        return jsonify({
+            'success': True,
+            'message': 'تم إضافة الحدث بنجاح',
+            'event': {
+                'id': new_event.id,
+                'title': new_event.title,
+                'start': new_event.start_date.strftime('%Y-%m-%d'),
+                'end': new_event.end_date.strftime('%Y-%m-%d'),
+                'type': new_event.event_type,
+                'time': new_event.event_time,
+                'location': new_event.location,
+                'description': new_event.description
+            }
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+
+@bp.route('/api/calendar/events/<int:event_id>', methods=['PUT'])
+def update_calendar_event(event_id):
+    """تحديث حدث في التقويم"""
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return jsonify({'error': 'غير مصرح، يجب أن تكون مشرفاً لتعديل الأحداث'}), 403
+    
+    event = CalendarEvent.query.get_or_404(event_id)
+    data = request.get_json()
+    
+    try:
+        # تسجيل البيانات القديمة قبل التعديل
+        old_data = {
+            'id': event.id,
+            'title': event.title,
+            'event_type': event.event_type,
+            'start_date': event.start_date.isoformat(),
+            'end_date': event.end_date.isoformat(),
+            'event_time': event.event_time,
+            'location': event.location,
+            'description': event.description,
+            'created_at': event.created_at.isoformat() if event.created_at else None,
+            'updated_at': event.updated_at.isoformat() if event.updated_at else None
+        }
+        
+        event.title = data['title']
+        event.event_type = data['type']
+        event.start_date = datetime.strptime(data['start'], '%Y-%m-%d').date()
+        event.end_date = datetime.strptime(data['end'], '%Y-%m-%d').date()
+        event.event_time = data.get('time')
+        event.location = data.get('location')
+        event.description = data.get('description')
+        event.updated_at = datetime.utcnow()
+        
+        db.session.commit()
+        
+        # تسجيل العملية
+        log_activity(
+            operation_type='تعديل',
+            table_name='calendar_events',
+            record_id=str(event_id),
+            old_data=old_data,
+            new_data={
+                'id': event.id,
+                'title': event.title,
+                'event_type': event.event_type,
+                'start_date': event.start_date.isoformat(),
+                'end_date': event.end_date.isoformat(),
+                'event_time': event.event_time,
+                'location': event.location,
+                'description': event.description,
+                'created_at': event.created_at.isoformat() if event.created_at else None,
+                'updated_at': event.updated_at.isoformat() if event.updated_at else None
+            },
+            description=f'تعديل حدث في التقويم: {old_data["title"]} إلى {event.title}'
+        )
+        
+        return jsonify({
+            'success': True,
+            'message': 'تم تحديث الحدث بنجاح'
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+
+@bp.route('/api/school/settings')
+def get_school_settings_api():
+    """الحصول على إعدادات المدرسة كـ JSON"""
+    school_settings = get_school_settings()
+    return jsonify({
+        'school_name': school_settings.school_name,
+        'school_address': school_settings.school_address,
+        'school_phone': school_settings.school_phone,
+        'school_email': school_settings.school_email,
+        'academic_year': school_settings.academic_year,
+        'academic_semester': school_settings.academic_semester
+    })
+
+@bp.route('/api/calendar/events/<int:event_id>', methods=['DELETE'])
+def delete_calendar_event(event_id):
+    """حذف حدث من التقويم"""
+    if 'role' not in session or (session['role'] != 'مشرف' and session['role'] != 'مشرف محتوى'):
+        return jsonify({'error': 'غير مصرح، يجب أن تكون مشرفاً لحذف الأحداث'}), 403
+    
+    event = CalendarEvent.query.get_or_404(event_id)
+    
+    try:
+        # تسجيل البيانات القديمة قبل الحذف
+        old_data = {
+            'id': event.id,
+            'title': event.title,
+            'event_type': event.event_type,
+            'start_date': event.start_date.isoformat(),
+            'end_date': event.end_date.isoformat(),
+            'event_time': event.event_time,
+            'location': event.location,
+            'description': event.description,
+            'created_at': event.created_at.isoformat() if event.created_at else None,
+            'updated_at': event.updated_at.isoformat() if event.updated_at else None
+        }
+        
+        db.session.delete(event)
+        db.session.commit()
+        
+        # تسجيل العملية
+        log_activity(
+            operation_type='حذف',
+            table_name='calendar_events',
+            record_id=str(event_id),
+            old_data=old_data,
+            description=f'حذف حدث من التقويم: {old_data["title"]}'
+        )
+        
+        return jsonify({
+            'success': True,
+            'message': 'تم حذف الحدث بنجاح'
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
@@ -0,0 +1,113 @@
+"""قائمة المواد التعليمية لكل مرحلة كـ JSON جاهز مع ETag، تعاد بناؤها فقط بعد تعديل المواد
+
+كل عامل يحتفظ بنسخته في الذاكرة، ورقم الإصدار في SystemSettings (materials_feed_version)
+يتغير عند رفع المواد أو حذفها فتعيد كل العمال بناء القائمة عند الطلب التالي.
+"""
+import base64
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime
+from .models import db, EducationalMaterial
+from .helpers import get_system_setting, set_system_setting
+from .media import media_url
+from .metrics import CACHE_REQUESTS
+
+FEED_VERSION_KEY = 'materials_feed_version'
+
+# stage -> (الإصدار، JSON بالبايت، ETag)
+_feeds = {}
+_feeds_lock = threading.Lock()
+
+def material_to_dict(material):
+    return {
+        'id': material.id,
+        'stage': material.stage,
+        'subject': material.subject,
+        'title': material.title,
+        'description': material.description,
+        'material_type': material.material_type,
+        'file_path': material.file_path,
+        'file_url': media_url('material_file', material.file_path) if material.file_path else None,
+        'video_url': material.video_url,
+        'upload_date': material.upload_date.isoformat() if material.upload_date else None
+    }
+
+def materials_feed(stage):
+    """(JSON بالبايت، ETag) لمواد المرحلة، من الذاكرة إذا لم تتغير المواد منذ آخر بناء"""
+    version = get_system_setting(FEED_VERSION_KEY, '0')
+    cached = _feeds.get(stage)
+    if cached and cached[0] == version:
+        CACHE_REQUESTS.inc(cache='materials_feed', result='hit')
+        return cached[1], cached[2]
+    CACHE_REQUESTS.inc(cache='materials_feed', result='miss')
+
+    materials = EducationalMaterial.query.options(db.undefer(EducationalMaterial.description)).filter_by(stage=stage).order_by(EducationalMaterial.upload_date.desc()).all()
+    body = json.dumps([material_to_dict(material) for material in materials], ensure_ascii=False).encode('utf-8')
+    # ETag من المحتوى نفسه فيتطابق بين العمال
+    etag = hashlib.sha256(body).hexdigest()[:32]
+    with _feeds_lock:
+        _feeds[stage] = (version, body, etag)
+    return body, etag
+
+def invalidate_materials_feed():
+    """تسجيل تغير المواد التعليمية (بعد الرفع أو الحذف) لكل العمال"""
+    with _feeds_lock:
+        _feeds.clear()
+    set_system_setting(FEED_VERSION_KEY, str(time.time_ns()), 'إصدار قائمة المواد التعليمية (يتغير مع كل رفع أو حذف)')
+
+# حجم الصفحة الافتراضي والأقصى في الواجهة المرقمة
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def encode_cursor(material):
+    """مؤشر موضع المادة في الترتيب (الأحدث أولاً): تاريخ الرفع ثم المعرف"""
+    raw = f'{material.upload_date.isoformat()}|{material.id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """(تاريخ الرفع، المعرف) من المؤشر، أو ValueError إذا كان غير صالح"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        upload_date, material_id = raw.split('|')
+        return datetime.fromisoformat(upload_date), int(material_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f'مؤشر غير صالح: {cursor}') from e
+
+def materials_page(stage, subject=None, material_type=None, limit=DEFAULT_PAGE_SIZE, cursor=None, since=None):
+    """صفحة من مواد المرحلة بترقيم keyset (بدون OFFSET)
+
+    cursor: المواد الأقدم من هذا الموضع (الصفحة التالية)
+    since: المواد الأحدث من هذا الموضع فقط (المزامنة عند العودة للصفحة)
+    """
+    position = db.tuple_(EducationalMaterial.upload_date, EducationalMaterial.id)
+    query = EducationalMaterial.query.options(db.undefer(EducationalMaterial.description)).filter_by(stage=stage)
+    if subject:
+        query = query.filter_by(subject=subject)
+    if material_type:
+        query = query.filter_by(material_type=material_type)
+    if cursor:
+        query = query.filter(position < db.tuple_(*decode_cursor(cursor)))
+    if since:
+        query = query.filter(position > db.tuple_(*decode_cursor(since)))
+    materials = query.order_by(EducationalMaterial.upload_date.desc(), EducationalMaterial.id.desc()).limit(limit + 1).all()
+
+    has_more = len(materials) > limit
+    materials = materials[:limit]
+    return {
+        'items': [material_to_dict(material) for material in materials],
+        'next_cursor': encode_cursor(materials[-1]) if has_more else None,
+        # يمرر كـ since في الزيارة التالية لجلب الجديد فقط
+        'sync_cursor': encode_cursor(materials[0]) if materials and not cursor else since,
+    }
+
+def stage_subjects(stage):
+    """مواد المرحلة الدراسية مع عدد المواد التعليمية وتاريخ آخر رفع لكل مادة"""
+    rows = db.session.query(
+        EducationalMaterial.subject,
+        db.func.count(EducationalMaterial.id),
+        db.func.max(EducationalMaterial.upload_date),
+    ).filter_by(stage=stage).group_by(EducationalMaterial.subject).order_by(EducationalMaterial.subject).all()
+    return [{'subject': subject, 'count': count, 'latest_upload': latest.isoformat() if latest else None}
+            for subject, count, latest in rows]
@@ -0,0 +1,244 @@
+"""دوال مساعدة مشتركة بين الأقسام: الإعدادات وسجل العمليات والأخبار والصور"""
+from flask import request, session
+import os
+import re
+import json
+import bleach
+from .models import db, ActivityLog, SchoolSettings, SystemSettings
+from .metrics import MEDIA_PROCESSING, timed
+from .images import describe_image
+from .storage import store_upload
+
+def get_system_setting(key, default_value="0"):
+    """الحصول على إعداد النظام مع القيمة الافتراضية"""
+    try:
+        setting = SystemSettings.query.filter_by(setting_key=key).first()
+        return setting.setting_value if setting else default_value
+    except:
+        return default_value
+
+def set_system_setting(key, value, description=None):
+    """تعيين إعداد النظام"""
+    try:
+        setting = SystemSettings.query.filter_by(setting_key=key).first()
+        if setting:
+            setting.setting_value = value
+            if description:
+                setting.description = description
+        else:
+            setting = SystemSettings(setting_key=key, setting_value=value, description=description)
+            db.session.add(setting)
+        db.session.commit()
+        return True
+    except:
+        db.session.rollback()
+        return False
+
+def get_school_settings():
+    """الحصول على إعدادات المدرسة"""
+    try:
+        settings = SchoolSettings.query.first()
+        if not settings:
+            # إنشاء إعدادات افتراضية إذا لم تكن موجودة
+            settings = SchoolSettings(
+                school_name="اسم المدرسة",
+                school_address="عنوان المدرسة",
+                school_phone="",
+                school_email="",
+                school_vision="رؤية المدرسة",
+                school_mission="رسالة المدرسة",
+                school_values="",
+                google_maps_url="",
+                youtube_url="",
+                instagram_url="",
+                telegram_url="",
+                snapchat_url="",
+                whatsapp_url="",
+                academic_year="2024-2025",
+                academic_semester="الفصل الدراسي الأول"
+            )
+            db.session.add(settings)
+            db.session.commit()
+        return settings
+    except Exception as e:
+        print(f"خطأ في get_school_settings: {e}")
+        # إرجاع إعدادات افتراضية في حالة الخطأ
+        return SchoolSettings(
+            school_name="اسم المدرسة",
+            school_address="عنوان المدرسة",
+            school_phone="",
+            school_email="",
+            school_vision="رؤية المدرسة",
+            school_mission="رسالة المدرسة",
+            school_values="",
+            google_maps_url="",
+            youtube_url="",
+            instagram_url="",
+            telegram_url="",
+            snapchat_url="",
+            whatsapp_url="",
+            academic_year="2024-2025",
+            academic_semester="الفصل الدراسي الأول"
+        )
+
+def log_activity(operation_type, table_name, record_id=None, old_data=None, new_data=None, description=None):
+    """
+    تسجيل نشاط في جدول سجل العمليات
+    
+    Args:
+        operation_type (str): نوع العملية (إضافة، تعديل، حذف)
+        table_name (str): اسم الجدول
+        record_id (str): معرف السجل
+        old_data (dict): البيانات القديمة (للعمليات من نوع تعديل)
+        new_data (dict): البيانات الجديدة
+        description (str): وصف العملية
+    """
+    try:
+        # الحصول على بيانات المستخدم من الجلسة
+        user_civil_id = session.get('civil_id')
+        user_name = session.get('name')
+        user_subject = session.get('subject')
+        user_job_title = session.get('job_title')
+        
+        # الحصول على معلومات الطلب
+        ip_address = request.remote_addr if request else None
+        user_agent = request.headers.get('User-Agent') if request else None
+        
+        # تحويل البيانات إلى JSON
+        old_data_json = json.dumps(old_data, ensure_ascii=False) if old_data else None
+        new_data_json = json.dumps(new_data, ensure_ascii=False) if new_data else None
+        
+        # إنشاء سجل النشاط
+        activity_log = ActivityLog(
+            operation_type=operation_type,
+            table_name=table_name,
+            record_id=str(record_id) if record_id else None,
+            user_civil_id=user_civil_id,
+            user_name=user_name,
+            user_subject=user_subject,
+            user_job_title=user_job_title,
+            old_data=old_data_json,
+            new_data=new_data_json,
+            description=description,
+            ip_address=ip_address,
+            user_agent=user_agent
+        )
+        
+        db.session.add(activity_log)
+        db.session.commit()
+        
+    except Exception as e:
+        # في حالة حدوث خطأ، لا نريد أن يؤثر على العملية الرئيسية
+        print(f"Error logging activity: {e}")
+        db.session.rollback()
+
+def get_user_data_from_session():
+    """الحصول على بيانات المستخدم من الجلسة"""
+    return {
+        'civil_id': session.get('civil_id'),
+        'name': session.get('name'),
+        'subject': session.get('subject'),
+        'job_title': session.get('job_title'),
+        'role': session.get('role')
+    }
+
+def clean_html_content(html_content):
+    """تنظيف محتوى HTML لمنع XSS"""
+    allowed_tags = [
+        'p', 'br', 'strong', 'b', 'em', 'i', 'u', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+        'ul', 'ol', 'li', 'blockquote', 'pre', 'code', 'a', 'img', 'div', 'span',
+        'table', 'thead', 'tbody', 'tr', 'td', 'th', 'hr'
+    ]
+    allowed_attributes = {
+        'a': ['href', 'title', 'target'],
+        'img': ['src', 'alt', 'title', 'width', 'height', 'style'],
+        'div': ['class', 'style'],
+        'span': ['class', 'style'],
+        'p': ['class', 'style'],
+        'table': ['class', 'style'],
+        'tr': ['class', 'style'],
+        'td': ['class', 'style'],
+        'th': ['class', 'style']
+    }
+    return bleach.clean(html_content, tags=allowed_tags, attributes=allowed_attributes, strip=True)
+
+NEWS_EXCERPT_LENGTH = 200
+
+NEWS_PER_PAGE = 12
+
+def make_news_excerpt(html_content, length=NEWS_EXCERPT_LENGTH):
+    """استخراج مقتطف نصي قصير من محتوى الخبر لعرضه في صفحات القوائم"""
+    if not html_content:
+        return ''
+    text_content = bleach.clean(html_content, tags=[], strip=True)
+    text_content = ' '.join(text_content.split())
+    if len(text_content) <= length:
+        return text_content
+    return text_content[:length].rsplit(' ', 1)[0] + '...'
+
+def find_news_cover_image(image_filename, html_content):
+    """تحديد صورة غلاف الخبر: الصورة المرفوعة أولاً ثم أول صورة داخل المحرر"""
+    if image_filename:
+        return image_filename
+    if html_content:
+        match = re.search(r'<img[^>]+src="/assets/images/news/([^"?]+)', html_content)
+        if match:
+            return match.group(1)
+    return None
+
+def update_news_summary(news):
+    """حساب المقتطف وصورة الغلاف مرة واحدة عند حفظ الخبر"""
+    news.excerpt = make_news_excerpt(news.details)
+    news.cover_image = find_news_cover_image(news.image, news.details)
+
+# فك JPEG بدقة مخفضة إلى ضعف المقاس المطلوب على الأقل، ثم التصغير بـ LANCZOS (مثل reducing_gap في thumbnail)
+DRAFT_REDUCING_GAP = 2
+# قيم EXIF Orientation التي تدور الصورة 90 درجة (العرض والارتفاع متبادلان قبل التدوير)
+_ROTATED_ORIENTATIONS = (5, 6, 7, 8)
+
+@timed(MEDIA_PROCESSING, operation='compress_image')
+def compress_image(source, destination, max_size=(800, 600), quality=85):
+    """ضغط الصورة إلى JPEG داخل max_size في destination؛ يرجع False إذا تعذر فيخزن الملف كما رفع
+
+    source مسار أو ملف مفتوح (الرفع نفسه دون نسخه إلى القرص أولاً). صور الجوال (12-48 ميغابكسل) لا تفك
+    بدقتها الكاملة بل بمقياس 1/2 أو 1/4 أو 1/8 (draft)، وتدور حسب EXIF بعد التصغير، ولا ينقل منها إلا
+    ملف ألوانها (ICC) إذا لم يتغير وضعها: بيانات EXIF (ومنها الموقع) و XMP والتعليقات تحذف.
+    """
+    from PIL import Image, ImageOps
+    try:
+        with Image.open(source) as img:
+            box = max_size
+            if img.getexif().get(0x0112) in _ROTATED_ORIENTATIONS:
+                box = max_size[::-1]
+            if img.format == 'JPEG':
+                # draft يختار أصغر مقياس لا يقل فيه أي ضلع عن المطلوب، فيطلب بنسبة الصورة نفسها
+                ratio = min(box[0] / img.width, box[1] / img.height) * DRAFT_REDUCING_GAP
+                img.draft(None, (round(img.width * ratio), round(img.height * ratio)))
+            # تحويل إلى RGB إذا كانت الصورة في وضع آخر (شفافية، لوحة ألوان، CMYK...)؛ ملف الألوان
+            # يصف الوضع الأصلي (ملف CMYK مع بكسلات RGB يفسد الألوان) فلا ينقل بعد التحويل
+            icc_profile = img.info.get('icc_profile')
+            if img.mode not in ('RGB', 'L'):
+                img = img.convert('RGB')
+                icc_profile = None
+            img.thumbnail(box, Image.Resampling.LANCZOS)
+            # التدوير على الصورة المصغرة أرخص بكثير منه على الأصل
+            img = ImageOps.exif_transpose(img)
+            img.info = {}
+            img.save(destination, 'JPEG', quality=quality, optimize=True, icc_profile=icc_profile)
+            return True
+    except Exception as e:
+        print(f"خطأ في ضغط الصورة: {e}")
+        if os.path.exists(destination):
+            os.remove(destination)
+        return False
+
+def save_uploaded_image(file, folder='news'):
+    """حفظ الصورة المرفوعة مع الضغط ومقاساتها الأصغر في مخزن الوسائط (نفس الصورة مرتين تخزن مرة واحدة)"""
+    try:
+        if file and file.filename:
+            filename = store_upload(f'{folder}_image', file, process=compress_image)
+            describe_image(f'{folder}_image', filename)
+            return filename
+    except Exception as e:
+        print(f"خطأ في حفظ الصورة: {e}")
+        return None
@@ -0,0 +1,151 @@
+"""صور متجاوبة: مقاسات أصغر لكل صورة مرفوعة وصورة تمهيدية ضبابية صغيرة، تحسب مرة واحدة عند الرفع
+
+تحفظ في سجل MediaFile للصورة (العرض والارتفاع والمقاسات والصورة التمهيدية)، والمقاسات ملفات بجانب
+الأصل: c/29/<بصمة>-320w.jpg. القوالب تعرضها بالماكرو lazy_image في templates/macros.html:
+srcset حتى يختار المتصفح أصغر مقاس يكفي، و width/height حتى لا تتحرك الصفحة عند التحميل، و
+loading="lazy" فلا تحمل إلا الصور القريبة من الشاشة، والصورة التمهيدية خلفية حتى يصل الأصل.
+
+الصور المرفوعة قبل هذه الميزة تعالج بالأمر:
+
+    flask --app app describe-images
+"""
+import base64
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+import click
+from flask.cli import with_appcontext
+from .media import media_file_path, media_url, variant_path
+from .models import db, MediaFile
+from .storage import temp_path
+
+# عروض المقاسات الأصغر (الأصل بعد الضغط حتى 800 بكسل هو المقاس الأكبر)
+RESPONSIVE_WIDTHS = (320, 480)
+RESPONSIVE_QUALITY = 80
+# الصورة التمهيدية: 16 بكسل عرضاً بصيغة WebP (أصغر بكثير من JPEG بهذا المقاس) داخل SVG يطمسها
+PLACEHOLDER_WIDTH = 16
+PLACEHOLDER_QUALITY = 40
+PLACEHOLDER_BLUR = 1.5
+
+# الفئات التي تعرض صورها في الصفحات العامة، وامتدادات الصور فيها (ملفات الأنشطة فيها فيديو أيضاً)
+IMAGE_CATEGORIES = ('news_image', 'activity_file')
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
+
+# الصورة التي ليست لها بيانات (لم تعالج بعد) يعاد البحث عنها بعد هذه المدة (ثوانٍ)
+MISSING_INFO_TTL = 300
+# أقصى عدد صور تحفظ بياناتها في ذاكرة العامل؛ الأقدم استخداماً يحذف
+IMAGE_INFO_CACHE_SIZE = 5000
+
+_image_info = OrderedDict()
+_image_info_lock = threading.Lock()
+
+def blur_placeholder(img):
+    """data URI لصورة SVG تطمس نسخة مصغرة جداً من الصورة (مثل blurhash دون مكتبة في المتصفح)"""
+    from PIL import Image
+    width = min(PLACEHOLDER_WIDTH, img.width)
+    height = max(1, round(img.height * width / img.width))
+    tiny = io.BytesIO()
+    img.resize((width, height), Image.Resampling.BOX).save(tiny, 'WEBP', quality=PLACEHOLDER_QUALITY)
+    svg = (f"<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 {width} {height}'>"
+           f"<filter id='b' color-interpolation-filters='sRGB'><feGaussianBlur stdDeviation='{PLACEHOLDER_BLUR}'/>"
+           "<feComponentTransfer><feFuncA type='discrete' tableValues='1 1'/></feComponentTransfer></filter>"
+           f"<image width='100%' height='100%' preserveAspectRatio='none' filter='url(#b)' "
+           f"href='data:image/webp;base64,{base64.b64encode(tiny.getvalue()).decode()}'/></svg>")
+    return 'data:image/svg+xml;base64,' + base64.b64encode(svg.encode()).decode()
+
+def describe_image(category, filename, force=False):
+    """إنشاء المقاسات الأصغر والصورة التمهيدية لصورة مخزنة وحفظها في سجلها؛ يرجع False إذا تعذر
+
+    الصورة المحسوبة من قبل (نفس المحتوى مرفوع مرة أخرى) لا تعاد إلا مع force.
+    """
+    from PIL import Image, ImageOps
+    row = MediaFile.query.filter_by(category=category, file_path=filename).first()
+    if row is None:
+        return False
+    if row.width and not force:
+        return True
+    output = None
+    try:
+        with Image.open(media_file_path(category, filename)) as img:
+            img = ImageOps.exif_transpose(img)
+            if img.mode not in ('RGB', 'L'):
+                img = img.convert('RGB')
+            widths = [width for width in RESPONSIVE_WIDTHS if width < img.width]
+            for width in widths:
+                output = temp_path(category, '.jpg')
+                img.resize((width, max(1, round(img.height * width / img.width))), Image.Resampling.LANCZOS).save(
+                    output, 'JPEG', quality=RESPONSIVE_QUALITY, optimize=True)
+                os.replace(output, media_file_path(category, variant_path(filename, width)))
+            row.width, row.height = img.size
+            row.placeholder = blur_placeholder(img)
+            row.variants = ','.join(map(str, widths)) or None
+        forget_image_info(category, filename)
+        return True
+    except Exception as e:
+        print(f"خطأ في إنشاء مقاسات الصورة {filename}: {e}")
+        # المقاسات التي نقلت قبل الخطأ دون سجل يعرضها فحص سلامة الوسائط كملفات يتيمة
+        if output and os.path.exists(output):
+            os.remove(output)
+        return False
+
+def _load_image_info(endpoint, filename):
+    row = db.session.query(MediaFile.width, MediaFile.height, MediaFile.placeholder, MediaFile.variants).filter_by(
+        category=endpoint, file_path=filename).first()
+    if row is None or not row.width:
+        return None
+    widths = [int(width) for width in (row.variants or '').split(',') if width]
+    sources = [f'{media_url(endpoint, variant_path(filename, width))} {width}w' for width in widths]
+    if sources:
+        sources.append(f'{media_url(endpoint, filename)} {row.width}w')
+    return {'width': row.width, 'height': row.height, 'placeholder': row.placeholder, 'srcset': ', '.join(sources)}
+
+def image_info(endpoint, filename):
+    """{'width', 'height', 'placeholder', 'srcset'} لصورة مخزنة، أو None إذا لم تعالج
+
+    أسماء الصور مبنية على بصمة محتواها فلا تتغير بياناتها: تخزن في ذاكرة العامل بعد أول استعلام،
+    وتحذف منها عند إعادة إنشاء المقاسات أو حذف الصورة في نفس العامل (forget_image_info).
+    """
+    if endpoint not in IMAGE_CATEGORIES or not filename:
+        return None
+    key = (endpoint, filename)
+    with _image_info_lock:
+        cached = _image_info.get(key)
+        if cached and (cached[1] is not None or time.monotonic() - cached[0] < MISSING_INFO_TTL):
+            _image_info.move_to_end(key)
+            return cached[1]
+    info = _load_image_info(endpoint, filename)
+    with _image_info_lock:
+        _image_info[key] = (time.monotonic(), info)
+        _image_info.move_to_end(key)
+        if len(_image_info) > IMAGE_INFO_CACHE_SIZE:
+            _image_info.popitem(last=False)
+    return info
+
+def forget_image_info(category, filename):
+    """حذف بيانات الصورة من ذاكرة العامل بعد تغيير مقاساتها أو حذف ملفاتها"""
+    with _image_info_lock:
+        _image_info.pop((category, filename), None)
+
+@click.command('describe-images')
+@click.option('--force', is_flag=True, help='إعادة إنشاء المقاسات لكل الصور')
+@with_appcontext
+def describe_images_command(force):
+    """إنشاء المقاسات الأصغر والصور التمهيدية لصور الأخبار والأنشطة"""
+    query = db.session.query(MediaFile.category, MediaFile.file_path).filter(MediaFile.category.in_(IMAGE_CATEGORIES))
+    if not force:
+        query = query.filter(MediaFile.width.is_(None))
+    rows = [(category, path) for category, path in query if os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS]
+    described = 0
+    for index, (category, path) in enumerate(rows, 1):
+        described += describe_image(category, path, force=force)
+        if index % 100 == 0:
+            db.session.commit()
+    db.session.commit()
+    print(f"تمت معالجة {described} صورة من {len(rows)}")
+
+def init_app(app):
+    """الدالة image_info في القوالب والأمر describe-images"""
+    app.add_template_global(image_info)
+    app.cli.add_command(describe_images_command)
@@ -0,0 +1,290 @@
+"""تقديم ملفات الوسائط والأصول الثابتة مع البصمات والتخزين المؤقت"""
+from flask import Blueprint, current_app, request, url_for, send_file, abort, make_response
+from werkzeug.utils import safe_join
+from markupsafe import Markup
+import os
+import re
+import hashlib
+import mimetypes
+import shutil
+import subprocess
+import threading
+import urllib.request
+from collections import OrderedDict
+from urllib.parse import quote
+from .metrics import CACHE_REQUESTS
+
+bp = Blueprint('media', __name__, cli_group=None)
+
+# مجلدات الوسائط لكل مسار تقديم
+MEDIA_DIRECTORIES = {
+    'news_image': os.path.join('assets', 'images', 'news'),
+    'school_image': os.path.join('assets', 'images'),
+    'material_file': os.path.join('assets', 'materials'),
+    'activity_file': os.path.join('assets', 'activities'),
+    'css_file': os.path.join('assets', 'css'),
+    'js_file': os.path.join('assets', 'js'),
+    'vendor_file': os.path.join('assets', 'vendor'),
+}
+
+# مجلدات الوسائط المرفوعة مقسمة إلى مجلدات فرعية حسب بصمة الاسم: c/29/c29f...jpg
+# (16 × 256 مجلداً، فيبقى كل مجلد صغيراً حتى مع مئات الآلاف من الملفات)
+SHARDED_DIRECTORIES = ('news_image', 'activity_file', 'material_file')
+MEDIA_SHARD_LEVELS = (1, 2)
+
+_HASH_NAME_PATTERN = re.compile(r'^[0-9a-f]{64}(\.|$)')
+
+def shard_path(filename):
+    """المسار المجزأ للملف داخل مجلد فئته؛ الأسماء المبنية على البصمة تقسم بأول أحرفها وغيرها ببصمة الاسم"""
+    name = os.path.basename(filename)
+    digest = name if _HASH_NAME_PATTERN.match(name) else hashlib.sha256(name.encode('utf-8')).hexdigest()
+    parts, start = [], 0
+    for width in MEDIA_SHARD_LEVELS:
+        parts.append(digest[start:start + width])
+        start += width
+    return '/'.join(parts + [name])
+
+def media_file_path(endpoint, filename):
+    """مسار ملف الوسائط على القرص من القيمة المخزنة في قاعدة البيانات، أو None إذا كان المسار غير آمن
+
+    الأسماء القديمة بدون مجلد فرعي تبحث في مجلدها المجزأ إذا نقلها أمر shard-media،
+    فتبقى الروابط القديمة (داخل نصوص الأخبار مثلاً) صالحة.
+    """
+    file_path = safe_join(MEDIA_DIRECTORIES[endpoint], filename)
+    if file_path and endpoint in SHARDED_DIRECTORIES and '/' not in filename and not os.path.isfile(file_path):
+        sharded = safe_join(MEDIA_DIRECTORIES[endpoint], shard_path(filename))
+        if sharded and os.path.isfile(sharded):
+            return sharded
+    return file_path
+
+def variant_path(filename, width):
+    """اسم ملف مقاس أصغر لصورة بجانبها: c/29/<بصمة>-320w.jpg (انظر school/images.py)"""
+    return f'{os.path.splitext(filename)[0]}-{width}w.jpg'
+
+def variant_paths(filename, variants):
+    """مسارات ملفات المقاسات من قيمة MediaFile.variants ('320,480')"""
+    return [variant_path(filename, int(width)) for width in (variants or '').split(',') if width]
+
+# ملف Tailwind المبني من القوالب عبر الأمر: flask --app app build-css
+TAILWIND_CSS_FILE = 'tailwind.css'
+
+# مكتبات الواجهة المحلية (تنزل مرة واحدة بالأمر: flask --app app fetch-vendor)
+# كل مكتبة في مجلد يحمل رقم الإصدار، والملفات الفرعية (الخطوط والصور) تُحمّل بمسارات نسبية
+VENDOR_ASSETS = {
+    'fontawesome': {
+        'source': 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/',
+        'directory': 'fontawesome-6.0.0',
+        'css': ['css/all.min.css'],
+        'js': [],
+        'extra_files': [
+            'webfonts/fa-brands-400.woff2', 'webfonts/fa-brands-400.ttf',
+            'webfonts/fa-regular-400.woff2', 'webfonts/fa-regular-400.ttf',
+            'webfonts/fa-solid-900.woff2', 'webfonts/fa-solid-900.ttf',
+            'webfonts/fa-v4compatibility.woff2', 'webfonts/fa-v4compatibility.ttf',
+        ],
+    },
+    'lightbox': {
+        'source': 'https://cdnjs.cloudflare.com/ajax/libs/lightbox2/2.11.3/',
+        'directory': 'lightbox2-2.11.3',
+        'css': ['css/lightbox.min.css'],
+        'js': ['js/lightbox.min.js'],
+        'extra_files': ['images/close.png', 'images/loading.gif', 'images/next.png', 'images/prev.png'],
+    },
+    'videojs': {
+        'source': 'https://vjs.zencdn.net/7.20.3/',
+        'directory': 'videojs-7.20.3',
+        'css': ['video-js.css'],
+        'js': ['video.min.js'],
+        'extra_files': [],
+    },
+    'quill': {
+        'source': 'https://cdn.quilljs.com/1.3.6/',
+        'directory': 'quill-1.3.6',
+        'css': ['quill.snow.css'],
+        'js': ['quill.min.js'],
+        'extra_files': [],
+    },
+}
+
+# الملفات الأكبر من هذا الحجم تُبصم بأول وآخر ميجابايت مع الحجم ووقت التعديل بدلاً من قراءتها كاملة؛
+# هذه البصمة لا تثبت المحتوى (تعديل في الوسط لا يغيرها) فترسل ETag ضعيفاً ولا تستخدم في الروابط الدائمة
+MEDIA_FULL_HASH_LIMIT = 16 * 1024 * 1024
+# أقصى عدد مسارات تحفظ بصماتها في ذاكرة العامل (الأقدم استخداماً يحذف أولاً)
+MEDIA_FINGERPRINT_CACHE_SIZE = 10000
+
+_media_fingerprints = OrderedDict()
+_media_fingerprints_lock = threading.Lock()
+
+def _fingerprint(file_path):
+    """(البصمة، كاملة؟) لمحتوى الملف مع تخزينها مؤقتاً حسب وقت التعديل والحجم، أو (None، False)"""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None, False
+    key = (stat.st_mtime_ns, stat.st_size)
+    with _media_fingerprints_lock:
+        cached = _media_fingerprints.get(file_path)
+        if cached and cached[0] == key:
+            _media_fingerprints.move_to_end(file_path)
+            CACHE_REQUESTS.inc(cache='media_fingerprint', result='hit')
+            return cached[1], cached[2]
+    CACHE_REQUESTS.inc(cache='media_fingerprint', result='miss')
+
+    digest = hashlib.sha256()
+    full = stat.st_size <= MEDIA_FULL_HASH_LIMIT
+    with open(file_path, 'rb') as f:
+        if full:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        else:
+            digest.update(f'{stat.st_size}:{stat.st_mtime_ns}'.encode())
+            digest.update(f.read(1024 * 1024))
+            f.seek(-1024 * 1024, os.SEEK_END)
+            digest.update(f.read(1024 * 1024))
+    fingerprint = digest.hexdigest()[:16]
+    with _media_fingerprints_lock:
+        _media_fingerprints[file_path] = (key, fingerprint, full)
+        _media_fingerprints.move_to_end(file_path)
+        if len(_media_fingerprints) > MEDIA_FINGERPRINT_CACHE_SIZE:
+            _media_fingerprints.popitem(last=False)
+    return fingerprint, full
+
+def media_fingerprint(file_path):
+    """بصمة محتوى الملف (SHA-256)، أو None إذا لم يوجد"""
+    return _fingerprint(file_path)[0]
+
+@bp.app_template_global()
+def media_url(endpoint, filename):
+    """رابط ملف وسائط مع بصمة المحتوى حتى يمكن تخزينه في المتصفح لمدة طويلة
+
+    الملفات الكبيرة (بصمة جزئية) بدون بصمة في الرابط: يتحقق منها المتصفح بـ ETag في كل مرة.
+    """
+    if not filename:
+        return ''
+    file_path = media_file_path(endpoint, filename)
+    fingerprint, full = _fingerprint(file_path) if file_path else (None, False)
+    if fingerprint and full:
+        return url_for('media.' + endpoint, filename=filename, v=fingerprint)
+    return url_for('media.' + endpoint, filename=filename)
+
+def _sendfile_path(path):
+    """مسار الملف في رأسي X-Accel-Redirect و X-Sendfile: الرؤوس latin-1 فقط، فالأسماء العربية والمسافات ترمّز (%XX)
+
+    nginx يفك ترميز المسار الداخلي، و mod_xsendfile يفكه أيضاً (XSendFileUnescape مفعل افتراضياً).
+    """
+    return quote(path.replace(os.sep, '/'), safe='/')
+
+def send_media_file(endpoint, filename, immutable=False):
+    """تقديم ملف وسائط مع ETag (ضعيف للبصمة الجزئية) وتخزين طويل المدى للروابط ذات البصمة ودعم Range"""
+    file_path = media_file_path(endpoint, filename)
+    if file_path is None or not os.path.isfile(file_path):
+        abort(404)
+    fingerprint, full = _fingerprint(file_path)
+
+    if current_app.config['MEDIA_SENDFILE_MODE'] == 'x-accel':
+        # nginx يقرأ الملف ويتعامل مع Range بنفسه دون إشغال عمال بايثون
+        # If-None-Match يقارن مقارنة ضعيفة (RFC 9110) فيطابق W/"..." أيضاً
+        if request.if_none_match.contains_weak(fingerprint):
+            response = make_response('', 304)
+            CACHE_REQUESTS.inc(cache='http_etag', result='hit')
+        else:
+            response = make_response('')
+            CACHE_REQUESTS.inc(cache='http_etag', result='miss')
+            response.headers['X-Accel-Redirect'] = current_app.config['MEDIA_X_ACCEL_PREFIX'].rstrip('/') + '/' + _sendfile_path(file_path)
+            response.mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response.set_etag(fingerprint, weak=not full)
+    else:
+        # send_file يدعم Range (206) و If-None-Match، ويستخدم X-Sendfile عند تفعيل USE_X_SENDFILE
+        response = send_file(os.path.abspath(file_path), etag=fingerprint, conditional=True)
+        if 'X-Sendfile' in response.headers:
+            response.headers['X-Sendfile'] = _sendfile_path(response.headers['X-Sendfile'])
+        if not full:
+            response.set_etag(fingerprint, weak=True)
+        CACHE_REQUESTS.inc(cache='http_etag', result='hit' if response.status_code == 304 else 'miss')
+
+    if immutable or (full and request.args.get('v') == fingerprint):
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = current_app.config['MEDIA_CACHE_MAX_AGE']
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response
+
+@bp.app_template_global()
+def tailwind_stylesheet():
+    """رابط ملف Tailwind المبني محلياً، أو مترجم CDN إذا لم يُبنَ الملف بعد"""
+    if os.path.isfile(os.path.join(MEDIA_DIRECTORIES['css_file'], TAILWIND_CSS_FILE)):
+        return Markup('<link rel="stylesheet" href="%s">') % media_url('css_file', TAILWIND_CSS_FILE)
+    return Markup('<script src="https://cdn.tailwindcss.com"></script>')
+
+def _vendor_urls(library, kind):
+    """روابط ملفات المكتبة المحلية إن كانت منزلة، وإلا روابط CDN الأصلية"""
+    asset = VENDOR_ASSETS[library]
+    local_paths = [asset['directory'] + '/' + name for name in asset[kind]]
+    if all(os.path.isfile(os.path.join(MEDIA_DIRECTORIES['vendor_file'], path)) for path in local_paths):
+        return [media_url('vendor_file', path) for path in local_paths]
+    return [asset['source'] + name for name in asset[kind]]
+
+@bp.app_template_global()
+def vendor_css(library):
+    """وسوم CSS لمكتبة واجهة محلية"""
+    return Markup('\n').join(Markup('<link href="%s" rel="stylesheet">') % url for url in _vendor_urls(library, 'css'))
+
+@bp.app_template_global()
+def vendor_js(library):
+    """وسوم JavaScript لمكتبة واجهة محلية"""
+    return Markup('\n').join(Markup('<script src="%s"></script>') % url for url in _vendor_urls(library, 'js'))
+
+@bp.cli.command('fetch-vendor')
+def fetch_vendor():
+    """تنزيل مكتبات الواجهة إلى assets/vendor لتقديمها محلياً دون الاعتماد على CDN"""
+    for library, asset in VENDOR_ASSETS.items():
+        for name in asset['css'] + asset['js'] + asset['extra_files']:
+            target = os.path.join(MEDIA_DIRECTORIES['vendor_file'], asset['directory'], *name.split('/'))
+            if os.path.isfile(target):
+                continue
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with urllib.request.urlopen(asset['source'] + name, timeout=30) as response, open(target, 'wb') as f:
+                shutil.copyfileobj(response, f)
+            print(f"{library}: {name}")
+    print('تم تنزيل مكتبات الواجهة في assets/vendor')
+
+@bp.cli.command('build-css')
+def build_css():
+    """بناء ملف Tailwind مضغوط يحتوي فقط على الأصناف المستخدمة في القوالب"""
+    tailwind = shutil.which('tailwindcss')
+    command = [tailwind] if tailwind else ['npx', 'tailwindcss']
+    output_path = os.path.join(MEDIA_DIRECTORIES['css_file'], TAILWIND_CSS_FILE)
+    os.makedirs(MEDIA_DIRECTORIES['css_file'], exist_ok=True)
+    subprocess.run(command + ['-c', 'tailwind.config.js', '-i', os.path.join('src', 'input.css'), '-o', output_path, '--minify'], check=True)
+    print(f"تم بناء {output_path} ({os.path.getsize(output_path)} بايت، البصمة {media_fingerprint(output_path)})")
+
+@bp.route('/assets/images/news/<path:filename>')
+def news_image(filename):
+    return send_media_file('news_image', filename)
+
+@bp.route('/assets/images/<filename>')
+def school_image(filename):
+    return send_media_file('school_image', filename)
+
+@bp.route('/assets/css/<filename>')
+def css_file(filename):
+    return send_media_file('css_file', filename)
+
+@bp.route('/assets/js/<filename>')
+def js_file(filename):
+    return send_media_file('js_file', filename)
+
+@bp.route('/assets/vendor/<path:filename>')
+def vendor_file(filename):
+    # مجلدات المكتبات تحمل رقم الإصدار، لذا يمكن تخزين كل ملفاتها لمدة طويلة
+    return send_media_file('vendor_file', filename, immutable=True)
+
+@bp.route('/assets/materials/<path:filename>')
+def material_file(filename):
+    return send_media_file('material_file', filename)
+
+@bp.route('/assets/activities/<path:filename>')
+def activity_file(filename):
+    return send_media_file('activity_file', filename)
@@ -0,0 +1,180 @@
+"""فحص سلامة الوسائط: الملفات التي لا يشير إليها أي سجل، والسجلات التي تشير إلى ملفات غير موجودة
+
+يمر على مجلدات الوسائط مرة واحدة (os.scandir دون قراءة المحتوى) ويقارن مجموعة الملفات بمجموعة
+المسارات في كل الأعمدة التي تشير إليها، فالتكلفة قراءة المجلدات واستعلام واحد لكل عمود. الحذف
+يقتصر على الملفات الأقدم من MEDIA_GC_MIN_AGE_HOURS (حتى لا يحذف ملف رفع لم تحفظ معاملته بعد)،
+وبعدد محدود في كل تشغيل مع توقف بين الدفعات حتى لا يشغل القرص عند تشغيله من cron.
+
+    flask --app app check-media                 # تقرير فقط
+    flask --app app check-media --delete        # حذف الملفات اليتيمة وتصحيح عدد المراجع
+"""
+import json
+import os
+import re
+import time
+from collections import Counter, defaultdict
+from urllib.parse import unquote
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from .media import MEDIA_DIRECTORIES, SHARDED_DIRECTORIES, shard_path, variant_paths
+from .models import db, ActivityMedia, EducationalMaterial, MediaFile, News
+from .storage import LEGACY_MATERIAL_PREFIX
+
+# حذف الملفات اليتيمة على دفعات مع توقف قصير بينها (ثوانٍ)
+DELETE_BATCH_SIZE = 100
+DELETE_BATCH_PAUSE = 0.5
+
+_EDITOR_IMAGE_PATTERN = re.compile(r'/assets/images/news/([^"?]+)')
+
+def scan_files(category):
+    """المسارات النسبية (بـ /) لكل ملفات مجلد الفئة ومجلداته الفرعية"""
+    root = MEDIA_DIRECTORIES[category]
+    files = set()
+    pending = ['']
+    while pending:
+        relative = pending.pop()
+        try:
+            with os.scandir(os.path.join(root, *relative.split('/'))) as entries:
+                for entry in entries:
+                    path = f'{relative}/{entry.name}' if relative else entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(path)
+                    elif entry.is_file(follow_symlinks=False):
+                        files.add(path)
+        except FileNotFoundError:
+            continue
+    return files
+
+def iter_references():
+    """(الفئة، المسار المخزن، المصدر) من كل عمود يشير إلى ملف وسائط
+
+    cover_image لا يحسب لأنه نسخة من image أو من أول صورة في نص الخبر.
+    """
+    for news_id, image in db.session.query(News.id, News.image).filter(News.image.isnot(None)):
+        yield 'news_image', image, f'news.image#{news_id}'
+    for news_id, details in db.session.query(News.id, News.details).filter(News.details.like('%/assets/images/news/%')):
+        for image in _EDITOR_IMAGE_PATTERN.findall(details):
+            yield 'news_image', unquote(image), f'news.details#{news_id}'
+    columns = (ActivityMedia.file_path, ActivityMedia.thumbnail_path, ActivityMedia.web_path, ActivityMedia.web_low_path)
+    for media_id, *paths in db.session.query(ActivityMedia.id, *columns):
+        for column, path in zip(columns, paths):
+            if path:
+                yield 'activity_file', path, f'activity_media.{column.key}#{media_id}'
+    # مقاسات الصور الأصغر (school/images.py) ملفات بجانب الأصل يشير إليها سجله
+    for media_id, category, file_path, variants in db.session.query(
+            MediaFile.id, MediaFile.category, MediaFile.file_path, MediaFile.variants).filter(MediaFile.variants.isnot(None)):
+        for path in variant_paths(file_path, variants):
+            yield category, path, f'media_file.variants#{media_id}'
+    for material_id, file_path in db.session.query(EducationalMaterial.id, EducationalMaterial.file_path).filter(EducationalMaterial.file_path.isnot(None)):
+        yield 'material_file', file_path.removeprefix(LEGACY_MATERIAL_PREFIX), f'educational_material.file_path#{material_id}'
+
+def _resolve(path, files):
+    """اسم قديم بدون مجلد فرعي نقله shard-media يطابق مكانه الجديد"""
+    if path not in files and '/' not in path and shard_path(path) in files:
+        return shard_path(path)
+    return path
+
+def check_media(categories=SHARDED_DIRECTORIES):
+    """تقرير لكل فئة: عدد الملفات، والملفات اليتيمة، والمراجع المعلقة، وفروق عدد المراجع في MediaFile"""
+    files = {category: scan_files(category) for category in categories}
+    references = {category: Counter() for category in categories}
+    sources = defaultdict(list)
+    for category, path, source in iter_references():
+        if category not in files:
+            continue
+        path = _resolve(path, files[category])
+        references[category][path] += 1
+        sources[category, path].append(source)
+
+    report = {}
+    for category in categories:
+        stored = {path: (media_id, ref_count) for media_id, path, ref_count in
+                  db.session.query(MediaFile.id, MediaFile.file_path, MediaFile.ref_count).filter_by(category=category)}
+        referenced = set(references[category])
+        report[category] = {
+            'files': len(files[category]),
+            'orphans': sorted(files[category] - referenced),
+            'dangling': [{'path': path, 'sources': sources[category, path]} for path in sorted(referenced - files[category])],
+            'missing_rows': sorted(path for path in set(stored) - files[category]),
+            'count_drift': [{'id': media_id, 'path': path, 'stored': ref_count, 'actual': references[category][path]}
+                            for path, (media_id, ref_count) in sorted(stored.items())
+                            if ref_count != references[category][path]],
+        }
+    return report
+
+def remove_orphans(report, min_age, limit, pause=DELETE_BATCH_PAUSE):
+    """حذف الملفات اليتيمة الأقدم من min_age ثانية (limit ملف على الأكثر) وتصحيح سجلات MediaFile
+
+    يرجع (عدد المحذوف، البايتات المحررة، عدد الملفات الحديثة المتروكة).
+    """
+    now = time.time()
+    removed = freed = recent = 0
+    for category, result in report.items():
+        root = MEDIA_DIRECTORIES[category]
+        removed_paths = set()
+        for path in result['orphans']:
+            if removed >= limit:
+                break
+            full_path = os.path.join(root, *path.split('/'))
+            try:
+                stat = os.lstat(full_path)
+                if now - stat.st_mtime < min_age:
+                    recent += 1
+                    continue
+                os.remove(full_path)
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                print(f"خطأ في حذف ملف الوسائط {path}: {e}")
+                continue
+            removed_paths.add(path)
+            removed += 1
+            freed += stat.st_size
+            if removed % DELETE_BATCH_SIZE == 0:
+                time.sleep(pause)
+
+        # عدد المراجع الصحيح من الأعمدة؛ سجل بلا مراجع يحذف فقط إذا حذف ملفه أو لم يكن موجوداً
+        # (صورة المحرر ترفع قبل حفظ الخبر فيبقى سجلها الحديث حتى يحذف ملفها بعد المهلة)
+        drop = [row['id'] for row in result['count_drift']
+                if row['actual'] == 0 and (row['path'] in removed_paths or row['path'] in result['missing_rows'])]
+        repair = [{'id': row['id'], 'ref_count': row['actual']} for row in result['count_drift'] if row['actual'] > 0]
+        if drop:
+            db.session.execute(db.delete(MediaFile).where(MediaFile.id.in_(drop)))
+        if repair:
+            db.session.execute(db.update(MediaFile), repair)
+    db.session.commit()
+    return removed, freed, recent
+
+@click.command('check-media')
+@click.option('--delete', is_flag=True, help='حذف الملفات اليتيمة وتصحيح عدد المراجع')
+@click.option('--min-age', type=float, default=None, help='عدم حذف الملفات الأحدث من هذا العدد من الساعات')
+@click.option('--limit', type=int, default=None, help='أقصى عدد ملفات يحذف في هذا التشغيل')
+@click.option('--json', 'as_json', is_flag=True, help='التقرير بصيغة JSON')
+@with_appcontext
+def check_media_command(delete, min_age, limit, as_json):
+    """فحص سلامة ملفات الأخبار والأنشطة والمواد التعليمية"""
+    report = check_media()
+    deleted = None
+    if delete:
+        min_age = current_app.config['MEDIA_GC_MIN_AGE_HOURS'] if min_age is None else min_age
+        limit = current_app.config['MEDIA_GC_DELETE_LIMIT'] if limit is None else limit
+        removed, freed, recent = remove_orphans(report, min_age * 3600, limit)
+        deleted = {'removed': removed, 'freed_bytes': freed, 'recent': recent}
+
+    if as_json:
+        print(json.dumps({'categories': report, 'deleted': deleted}, ensure_ascii=False, indent=2))
+        return
+    for category, result in report.items():
+        print(f"{category}: {result['files']} ملف، {len(result['orphans'])} يتيم، "
+              f"{len(result['dangling'])} مرجع لملف غير موجود، {len(result['count_drift'])} فرق في عدد المراجع")
+        for row in result['dangling']:
+            print(f"  غير موجود: {row['path']} ({', '.join(row['sources'])})")
+    if deleted:
+        print(f"تم حذف {removed} ملف يتيم ({freed // 1024} KB)، وترك {recent} ملف أحدث من {min_age:g} ساعة")
+
+def init_app(app):
+    """إعدادات الفحص: MEDIA_GC_MIN_AGE_HOURS و MEDIA_GC_DELETE_LIMIT"""
+    app.config.setdefault('MEDIA_GC_MIN_AGE_HOURS', 24)
+    app.config.setdefault('MEDIA_GC_DELETE_LIMIT', 1000)
+    app.cli.add_command(check_media_command)
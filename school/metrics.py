@@ -0,0 +1,266 @@
+"""مقاييس التشغيل بصيغة Prometheus من سجل محلي داخل التطبيق دون أي خدمة خارجية
+
+كل عامل gunicorn يحتفظ بسجله في الذاكرة. عند ضبط METRICS_DIR يكتب خيط خلفي في كل
+عامل لقطة من سجله في ذلك المجلد كل ثانية إذا تغير، ومسار /metrics يجمع لقطات كل العمال.
+لقطة العامل الذي ينتهي (إعادة التشغيل بعد max_requests) تضم إلى archived.json وتحذف من
+الخطاف child_exit في gunicorn.conf.py، فلا تتراكم الملفات ولا تنقص العدادات إذا تكرر رقم العملية.
+"""
+import fcntl
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from flask import Response, abort, current_app, g, has_request_context, request
+from .profiling import on_query
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SIZE_BUCKETS = (10_000, 100_000, 1_000_000, 5_000_000, 20_000_000, 100_000_000, 500_000_000)
+
+# المدة بين لقطتين يكتبهما العامل في METRICS_DIR
+SNAPSHOT_INTERVAL = 1.0
+# مجموع لقطات العمال المنتهين في METRICS_DIR
+ARCHIVE_NAME = 'archived.json'
+
+_lock = threading.Lock()
+_registry = {}
+_changes = 0          # يزيد مع كل تحديث حتى لا يكتب الخيط الخلفي لقطة لم تتغير
+_flusher_pid = None
+
+class Counter:
+    """عداد تراكمي لكل مجموعة قيم للتسميات"""
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        _registry[name] = self
+
+    def inc(self, amount=1, **labels):
+        global _changes
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+            _changes += 1
+
+class Histogram:
+    """توزيع القيم على حدود ثابتة مع المجموع والعدد"""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.values = {}
+        _registry[name] = self
+
+    def observe(self, value, **labels):
+        global _changes
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with _lock:
+            _changes += 1
+            counts, total, count = self.values.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            counts = [c + 1 if value <= bound else c for c, bound in zip(counts, self.buckets)]
+            self.values[key] = (counts, total + value, count + 1)
+
+# الطلبات وقاعدة البيانات
+REQUEST_LATENCY = Histogram('school_request_duration_seconds', 'زمن معالجة الطلب لكل مسار', ['endpoint', 'method', 'status'])
+DB_QUERIES = Counter('school_db_queries_total', 'عدد استعلامات SQL لكل مسار', ['endpoint'])
+DB_QUERY_TIME = Histogram('school_db_query_duration_seconds', 'زمن استعلام SQL الواحد لكل مسار', ['endpoint'])
+# الرفع ومعالجة الوسائط
+UPLOAD_SIZE = Histogram('school_upload_size_bytes', 'حجم طلبات الرفع (multipart) لكل مسار', ['endpoint'], buckets=SIZE_BUCKETS)
+MEDIA_PROCESSING = Histogram('school_media_processing_seconds', 'زمن معالجة الصور والفيديو', ['operation'])
+# استيراد الإكسل: معدل الصفوف = rate(school_excel_rows_total) أو rows_total / import_seconds_sum
+EXCEL_ROWS = Counter('school_excel_rows_total', 'صفوف ملفات الإكسل المعالجة', ['table'])
+EXCEL_IMPORT_TIME = Histogram('school_excel_import_seconds', 'زمن استيراد ملف الإكسل', ['table'])
+# التخزين المؤقت وتسجيل الدخول
+CACHE_REQUESTS = Counter('school_cache_requests_total', 'طلبات التخزين المؤقت حسب النتيجة (hit/miss)', ['cache', 'result'])
+LOGIN_ATTEMPTS = Counter('school_login_attempts_total', 'محاولات تسجيل الدخول', ['kind', 'result'])
+RATE_LIMITED = Counter('school_rate_limited_total', 'الطلبات المرفوضة بتحديد المعدل (429) لكل حد', ['limit'])
+PASSWORD_VERIFY_TIME = Histogram('school_password_verify_seconds', 'زمن التحقق من كلمة المرور (KDF)', ['kind', 'scheme'])
+
+@contextmanager
+def observe_duration(histogram, **labels):
+    """قياس زمن كتلة كود في Histogram"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start, **labels)
+
+def timed(histogram, **labels):
+    """مزخرف لقياس زمن الدالة في Histogram"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with observe_duration(histogram, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def _current_endpoint():
+    if has_request_context():
+        return request.endpoint or 'غير معروف'
+    return 'خارج الطلبات'
+
+@on_query
+def _record_query(seconds):
+    endpoint = _current_endpoint()
+    DB_QUERIES.inc(endpoint=endpoint)
+    DB_QUERY_TIME.observe(seconds, endpoint=endpoint)
+
+def _snapshot():
+    with _lock:
+        return {
+            metric.name: {
+                'kind': metric.kind,
+                'documentation': metric.documentation,
+                'labelnames': list(metric.labelnames),
+                'buckets': list(getattr(metric, 'buckets', ())),
+                'values': [[list(key), value] for key, value in metric.values.items()],
+            }
+            for metric in _registry.values()
+        }
+
+def _write_json(path, data):
+    """كتابة ذرية حتى لا يقرأ /metrics ملفاً ناقصاً"""
+    with open(path + '.tmp', 'w') as f:
+        json.dump(data, f)
+    os.replace(path + '.tmp', path)
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+@contextmanager
+def _snapshots_lock(metrics_dir, operation):
+    """قفل بين العمليات: /metrics لا يقرأ لقطة عامل منتهٍ والأرشيف الذي ضمت إليه معاً فيعدها مرتين"""
+    os.makedirs(metrics_dir, exist_ok=True)
+    with open(os.path.join(metrics_dir, '.lock'), 'a') as f:
+        fcntl.flock(f, operation)
+        yield
+
+def write_snapshot(metrics_dir):
+    """كتابة لقطة هذا العامل (تستدعى أيضاً من الخطاف worker_exit حتى لا يضيع آخر ثانية)"""
+    os.makedirs(metrics_dir, exist_ok=True)
+    _write_json(os.path.join(metrics_dir, f'{os.getpid()}.json'), _snapshot())
+
+def archive_snapshot(metrics_dir, pid):
+    """ضم لقطة العامل المنتهي pid إلى الأرشيف وحذفها (من الخطاف child_exit في gunicorn)"""
+    path = os.path.join(metrics_dir, f'{pid}.json')
+    with _snapshots_lock(metrics_dir, fcntl.LOCK_EX):
+        # ملف مؤقت باقٍ إذا قتل العامل أثناء الكتابة
+        if os.path.exists(path + '.tmp'):
+            os.remove(path + '.tmp')
+        snapshot = _read_json(path)
+        if snapshot is None:
+            return
+        archive_path = os.path.join(metrics_dir, ARCHIVE_NAME)
+        merged = _merge([_read_json(archive_path) or {}, snapshot])
+        _write_json(archive_path, {
+            name: dict(metric, values=[[list(key), value] for key, value in metric['values'].items()])
+            for name, metric in merged.items()
+        })
+        os.remove(path)
+
+def _flush_loop(metrics_dir):
+    written = -1
+    while True:
+        time.sleep(SNAPSHOT_INTERVAL)
+        if _changes != written:
+            written = _changes
+            try:
+                write_snapshot(metrics_dir)
+            except OSError as e:
+                print(f"خطأ في حفظ لقطة المقاييس: {e}")
+
+def _ensure_flusher(metrics_dir):
+    """تشغيل خيط الكتابة مرة واحدة في كل عملية (بعد تفرع عمال gunicorn)"""
+    global _flusher_pid
+    if _flusher_pid != os.getpid():
+        _flusher_pid = os.getpid()
+        threading.Thread(target=_flush_loop, args=(metrics_dir,), daemon=True, name='metrics-flusher').start()
+
+def _merge(snapshots):
+    merged = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.setdefault(name, dict(metric, values={}))
+            for key, value in metric['values']:
+                key = tuple(key)
+                if metric['kind'] == 'counter':
+                    target['values'][key] = target['values'].get(key, 0) + value
+                else:
+                    counts, total, count = target['values'].get(key) or ([0] * len(metric['buckets']), 0.0, 0)
+                    target['values'][key] = ([a + b for a, b in zip(counts, value[0])], total + value[1], count + value[2])
+    return merged
+
+def _format_labels(labelnames, key, extra=None):
+    pairs = list(zip(labelnames, key)) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+def render_metrics(merged):
+    """تحويل المقاييس إلى صيغة Prometheus النصية 0.0.4"""
+    lines = []
+    for name in sorted(merged):
+        metric = merged[name]
+        labelnames = metric['labelnames']
+        lines.append(f"# HELP {name} {metric['documentation']}")
+        lines.append(f"# TYPE {name} {metric['kind']}")
+        for key, value in sorted(metric['values'].items()):
+            if metric['kind'] == 'counter':
+                lines.append(f"{name}{_format_labels(labelnames, key)} {value}")
+                continue
+            counts, total, count = value
+            for bound, bucket_count in zip(metric['buckets'], counts):
+                lines.append(f"{name}_bucket{_format_labels(labelnames, key, ('le', repr(float(bound))))} {bucket_count}")
+            lines.append(f"{name}_bucket{_format_labels(labelnames, key, ('le', '+Inf'))} {count}")
+            lines.append(f"{name}_sum{_format_labels(labelnames, key)} {total}")
+            lines.append(f"{name}_count{_format_labels(labelnames, key)} {count}")
+    return '\n'.join(lines) + '\n'
+
+def _start_timer():
+    g.metrics_start = time.perf_counter()
+    if request.content_length and request.mimetype == 'multipart/form-data':
+        UPLOAD_SIZE.observe(request.content_length, endpoint=_current_endpoint())
+
+def _record_request(response):
+    if 'metrics_start' in g:
+        REQUEST_LATENCY.observe(time.perf_counter() - g.metrics_start, endpoint=_current_endpoint(),
+                                method=request.method, status=f'{response.status_code // 100}xx')
+    if current_app.config.get('METRICS_DIR'):
+        _ensure_flusher(current_app.config['METRICS_DIR'])
+    return response
+
+def metrics_view():
+    allowed = current_app.config['METRICS_ALLOWED_IPS']
+    if allowed and request.remote_addr not in allowed:
+        abort(404)
+    metrics_dir = current_app.config.get('METRICS_DIR')
+    if metrics_dir:
+        write_snapshot(metrics_dir)
+        with _snapshots_lock(metrics_dir, fcntl.LOCK_SH):
+            snapshots = [_read_json(path) for path in glob.glob(os.path.join(metrics_dir, '*.json'))]
+        snapshots = [snapshot for snapshot in snapshots if snapshot]
+    else:
+        snapshots = [_snapshot()]
+    return Response(render_metrics(_merge(snapshots)), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+def init_app(app):
+    """تسجيل مسار /metrics وقياس الطلبات"""
+    app.config.setdefault('METRICS_DIR', '')
+    app.config.setdefault('METRICS_ALLOWED_IPS', ['127.0.0.1', '::1'])
+    app.before_request(_start_timer)
+    app.after_request(_record_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
@@ -0,0 +1,213 @@
+"""ترحيلات قاعدة البيانات: تطبق مرة واحدة بالأمر flask --app app migrate"""
+from collections import Counter
+import os
+import re
+from flask.cli import with_appcontext
+import click
+from sqlalchemy import text
+from .models import db, ActivityMedia, EducationalMaterial, MediaFile, News, SchemaVersion, Student, SystemSettings
+from .media import MEDIA_DIRECTORIES
+from .helpers import update_news_summary
+from .passwords import hash_student_passwords, is_hashed
+from .storage import file_sha256
+
+# كل ترحيل يتحقق من حالة الجدول قبل التعديل حتى يعمل على قواعد البيانات القديمة التي عدلتها صفحات الإصلاح سابقاً
+def _table_columns(table):
+    """أسماء أعمدة الجدول، أو None إذا لم يكن الجدول موجوداً"""
+    inspector = db.inspect(db.engine)
+    if table not in inspector.get_table_names():
+        return None
+    return [col['name'] for col in inspector.get_columns(table)]
+
+def _add_missing_columns(table, columns):
+    existing = _table_columns(table) or []
+    for col_name, col_type in columns.items():
+        if col_name not in existing:
+            db.session.execute(text(f"ALTER TABLE {table} ADD COLUMN {col_name} {col_type}"))
+
+def migration_create_tables():
+    """إنشاء الجداول غير الموجودة"""
+    db.create_all()
+
+def migration_inquiry_columns():
+    """أعمدة بيانات الطالب ونوع الرسالة في جدول الاستفسارات"""
+    _add_missing_columns('inquiry', {
+        'student_civil_id': 'VARCHAR(20)',
+        'student_name': 'VARCHAR(100)',
+        'student_grade': 'VARCHAR(20)',
+        'student_section': 'VARCHAR(10)',
+        'user_type': 'VARCHAR(20)',
+        'message_type': 'VARCHAR(20)',
+        'title': 'VARCHAR(200)',
+        'message': 'TEXT',
+        'phone': 'VARCHAR(20)',
+        'status': 'VARCHAR(20)',
+        'response': 'TEXT',
+        'is_read': 'BOOLEAN',
+        'submission_date': 'DATETIME',
+        'last_updated': 'DATETIME'
+    })
+
+def migration_school_settings_year():
+    """عمودا العام والفصل الدراسي في إعدادات المدرسة"""
+    _add_missing_columns('school_settings', {
+        'academic_year': 'VARCHAR(50)',
+        'academic_semester': 'VARCHAR(50)'
+    })
+    db.session.execute(text("UPDATE school_settings SET academic_year = '2024-2025' WHERE academic_year IS NULL OR academic_year = ''"))
+    db.session.execute(text("UPDATE school_settings SET academic_semester = 'الفصل الدراسي الأول' WHERE academic_semester IS NULL OR academic_semester = ''"))
+
+def migration_drop_activity_media_columns():
+    """حذف أعمدة الوسائط القديمة من جدول الأنشطة بعد نقلها إلى activity_media"""
+    columns = _table_columns('school_activity') or []
+    for col_name in ('media_type', 'file_path', 'file_name', 'thumbnail_path'):
+        if col_name in columns:
+            db.session.execute(text(f"ALTER TABLE school_activity DROP COLUMN {col_name}"))
+
+def migration_news_summary():
+    """مقتطف الخبر وصورة الغلاف وتعبئتها للأخبار القديمة"""
+    _add_missing_columns('news', {
+        'excerpt': 'VARCHAR(300)',
+        'cover_image': 'VARCHAR(200)'
+    })
+    for news in News.query.filter(News.excerpt.is_(None)).all():
+        update_news_summary(news)
+
+def migration_default_settings():
+    """إعدادات الاستفسارات الافتراضية"""
+    for setting_key, default_value, description in [
+        ('student_inquiries_enabled', '1', 'تفعيل استفسارات الطلاب'),
+        ('teacher_inquiries_enabled', '1', 'تفعيل استفسارات المعلمين')
+    ]:
+        if not SystemSettings.query.filter_by(setting_key=setting_key).first():
+            db.session.add(SystemSettings(setting_key=setting_key, setting_value=default_value, description=description))
+
+def migration_hash_student_passwords():
+    """تشفير كلمات مرور الطلاب المخزنة بنص صريح، على دفعات وبكل الأنوية"""
+    rows = [(civil_id, password) for civil_id, password in db.session.execute(db.select(Student.civil_id, Student.password))
+            if not is_hashed(password)]
+    for start in range(0, len(rows), 1000):
+        batch = rows[start:start + 1000]
+        hashes = hash_student_passwords([password or '' for _, password in batch])
+        db.session.execute(db.update(Student), [{'civil_id': civil_id, 'password': hashed}
+                                                for (civil_id, _), hashed in zip(batch, hashes)])
+        print(f"تم تشفير {start + len(batch)} من {len(rows)} كلمة مرور")
+
+def migration_material_indexes():
+    """فهارس صفحات المواد التعليمية (المرحلة والمادة الدراسية وتاريخ الرفع)"""
+    for index in EducationalMaterial.__table__.indexes:
+        index.create(db.session.connection(), checkfirst=True)
+
+def migration_media_store():
+    """جدول مخزن الوسائط وعدد مراجع الملفات الموجودة (تبقى بأسمائها القديمة)"""
+    MediaFile.__table__.create(db.session.connection(), checkfirst=True)
+    references = Counter()
+    for (image,) in db.session.query(News.image).filter(News.image.isnot(None)):
+        references['news_image', image] += 1
+    # صور المحرر داخل نص الخبر
+    for (details,) in db.session.query(News.details).filter(News.details.isnot(None)):
+        for image in re.findall(r'/assets/images/news/([^"/?]+)', details):
+            references['news_image', image] += 1
+    for file_path, thumbnail_path in db.session.query(ActivityMedia.file_path, ActivityMedia.thumbnail_path):
+        references['activity_file', file_path] += 1
+        if thumbnail_path:
+            references['activity_file', thumbnail_path] += 1
+    for (file_path,) in db.session.query(EducationalMaterial.file_path).filter(EducationalMaterial.file_path.isnot(None)):
+        references['material_file', file_path.split('/')[-1]] += 1
+
+    rows = []
+    for (category, filename), count in references.items():
+        path = os.path.join(MEDIA_DIRECTORIES[category], filename)
+        if os.path.isfile(path):
+            rows.append({'category': category, 'file_path': filename, 'sha256': file_sha256(path),
+                         'size': os.path.getsize(path), 'ref_count': count})
+    if rows:
+        db.session.execute(db.insert(MediaFile), rows)
+    print(f"تم تسجيل {len(rows)} ملف وسائط ({len(references) - len(rows)} مرجع لملف غير موجود)")
+
+def migration_video_metadata():
+    """مدة الفيديو ودقته وحالة معالجته، مع إعادة إنشاء الصور المصغرة للفيديوهات الموجودة"""
+    _add_missing_columns('activity_media', {
+        'duration': 'FLOAT',
+        'width': 'INTEGER',
+        'height': 'INTEGER',
+        'processing_status': 'VARCHAR(20)',
+    })
+    # تعالج بالأمر: flask --app app process-media
+    db.session.execute(text("UPDATE activity_media SET processing_status = 'pending' WHERE media_type = 'فيديو'"))
+
+def migration_video_variants():
+    """مسارا نسخ MP4 للمتصفح، مع تحويل الفيديوهات الموجودة"""
+    _add_missing_columns('activity_media', {
+        'web_path': 'VARCHAR(500)',
+        'web_low_path': 'VARCHAR(500)',
+    })
+    db.session.execute(text("UPDATE activity_media SET processing_status = 'pending' WHERE media_type = 'فيديو'"))
+
+def migration_responsive_images():
+    """أبعاد الصور ومقاساتها الأصغر وصورها التمهيدية"""
+    # تنشأ للصور الموجودة بالأمر: flask --app app describe-images
+    _add_missing_columns('media_file', {
+        'width': 'INTEGER',
+        'height': 'INTEGER',
+        'variants': 'VARCHAR(50)',
+        'placeholder': 'TEXT',
+    })
+
+# (رقم الإصدار، الوصف، الدالة) — لا تعدل ترحيلاً طبق من قبل، أضف ترحيلاً جديداً برقم أكبر
+MIGRATIONS = [
+    (1, 'إنشاء الجداول', migration_create_tables),
+    (2, 'أعمدة الاستفسارات', migration_inquiry_columns),
+    (3, 'العام والفصل الدراسي في إعدادات المدرسة', migration_school_settings_year),
+    (4, 'حذف أعمدة الوسائط القديمة من الأنشطة', migration_drop_activity_media_columns),
+    (5, 'مقتطف الخبر وصورة الغلاف', migration_news_summary),
+    (6, 'إعدادات الاستفسارات الافتراضية', migration_default_settings),
+    (7, 'تشفير كلمات مرور الطلاب', migration_hash_student_passwords),
+    (8, 'فهارس صفحات المواد التعليمية', migration_material_indexes),
+    (9, 'مخزن الوسائط وعدد مراجع الملفات', migration_media_store),
+    (10, 'مدة الفيديو ودقته وحالة معالجته', migration_video_metadata),
+    (11, 'نسخ الفيديو للمتصفح', migration_video_variants),
+    (12, 'مقاسات الصور المتجاوبة', migration_responsive_images),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+def get_schema_version():
+    """رقم آخر ترحيل مطبق، أو 0 إذا لم يكن جدول schema_version موجوداً"""
+    try:
+        return db.session.execute(text("SELECT MAX(version) FROM schema_version")).scalar() or 0
+    except Exception:
+        db.session.rollback()
+        return 0
+
+def run_migrations():
+    """تطبيق الترحيلات المعلقة بالترتيب، كل ترحيل مع تسجيل إصداره في معاملة واحدة"""
+    SchemaVersion.__table__.create(db.engine, checkfirst=True)
+    current_version = get_schema_version()
+    applied = []
+    for version, description, migrate in MIGRATIONS:
+        if version <= current_version:
+            continue
+        try:
+            migrate()
+            db.session.add(SchemaVersion(version=version, description=description))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        applied.append((version, description))
+    return applied
+
+@click.command('migrate')
+@click.option('--status', is_flag=True, help='عرض إصدار قاعدة البيانات دون تطبيق الترحيلات')
+@with_appcontext
+def migrate_command(status):
+    """تطبيق ترحيلات قاعدة البيانات المعلقة"""
+    if status:
+        print(f"إصدار قاعدة البيانات: {get_schema_version()} من {SCHEMA_VERSION}")
+        return
+    applied = run_migrations()
+    for version, description in applied:
+        print(f"تم تطبيق الترحيل {version}: {description}")
+    if not applied:
+        print('قاعدة البيانات محدثة بالفعل')
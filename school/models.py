@@ -0,0 +1,224 @@
+"""نماذج قاعدة البيانات"""
+from flask_sqlalchemy import SQLAlchemy
+from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import sqlite3
+
+db = SQLAlchemy()
+
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """وضع WAL يسمح للقراءة أثناء الكتابة بين العمال"""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.close()
+
+class User(db.Model):
+    civil_id = db.Column(db.String(20), primary_key=True)  # الرقم المدني
+    name = db.Column(db.String(100), nullable=False)      # الاسم
+    subject = db.Column(db.String(100), nullable=True)    # المادة
+    password = db.Column(db.String(200), nullable=False)  # كلمة المرور (مشفر)
+    role = db.Column(db.String(20), nullable=False)       # الصلاحية (مشرف/عادي)
+    job_title = db.Column(db.String(50), nullable=True)   # المسمى الوظيفي الجديد
+
+class Seat(db.Model):
+    civil_id = db.Column(db.String(20), primary_key=True)  # الرقم المدني
+    name = db.Column(db.String(100), nullable=False)      # الاسم
+    seat_number = db.Column(db.String(20), nullable=False) # رقم الجلوس
+    main_committee = db.Column(db.String(20), nullable=False) # اللجنة الرئيسية
+    sub_committee = db.Column(db.String(20), nullable=False)  # اللجنة الفرعية
+    location = db.Column(db.String(100), nullable=True)   # موقع اللجنة
+
+class News(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(200), nullable=False)
+    details = db.deferred(db.Column(db.Text, nullable=False))  # لا يحمل في صفحات القوائم
+    image = db.Column(db.String(200), nullable=True)
+    date = db.Column(db.String(20), nullable=False)
+    excerpt = db.Column(db.String(300), nullable=True)        # مقتطف نصي للقوائم
+    cover_image = db.Column(db.String(200), nullable=True)    # صورة الغلاف للقوائم
+
+class Observer(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    civil_id = db.Column(db.String(20), nullable=False)
+    name = db.Column(db.String(100), nullable=False)
+    subject = db.Column(db.String(100), nullable=False)
+    assignment = db.Column(db.String(50), nullable=False)
+    main_committee = db.Column(db.String(20), nullable=False)
+    sub_committee = db.Column(db.String(20), nullable=False)
+    location = db.Column(db.String(100), nullable=False)
+    day = db.Column(db.String(20), nullable=False)
+    date = db.Column(db.String(20), nullable=False)
+
+class Student(db.Model):
+    civil_id = db.Column(db.String(20), primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    grade = db.Column(db.String(20), nullable=False)
+    section = db.Column(db.String(10), nullable=False)
+    password = db.Column(db.String(200), nullable=False)  # كلمة المرور (مشفرة، school/passwords.py)
+
+class Subject(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    stage = db.Column(db.String(20), nullable=False)
+    subject = db.Column(db.String(100), nullable=False)
+
+class EducationalMaterial(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    stage = db.Column(db.String(20), nullable=False)
+    subject = db.Column(db.String(100), nullable=False)
+    title = db.Column(db.String(200), nullable=False)
+    description = db.deferred(db.Column(db.Text, nullable=False))  # لا يحمل في صفحات القوائم
+    material_type = db.Column(db.String(20), nullable=False)  # PDF أو فيديو
+    file_path = db.Column(db.String(500), nullable=True)      # مسار الملف (للـ PDF)
+    video_url = db.Column(db.String(500), nullable=True)      # رابط الفيديو
+    upload_date = db.Column(db.DateTime, default=datetime.utcnow)
+    description_preview = db.query_expression()               # مقتطف الوصف لصفحات القوائم
+
+    # ترقيم keyset لمواد المرحلة (الكل أو مادة دراسية واحدة) مرتبة من الأحدث
+    __table_args__ = (
+        db.Index('ix_educational_material_stage_date', 'stage', 'upload_date', 'id'),
+        db.Index('ix_educational_material_stage_subject_date', 'stage', 'subject', 'upload_date', 'id'),
+    )
+
+class SchoolActivity(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(200), nullable=False)          # اسم النشاط
+    description = db.Column(db.Text, nullable=False)          # وصف مختصر
+    activity_date = db.Column(db.Date, nullable=False)        # تاريخ النشاط
+    upload_date = db.Column(db.DateTime, default=datetime.utcnow)
+    # إزالة الحقول القديمة للوسائط الفردية
+    # media_type = db.Column(db.String(20), nullable=False)     # صورة أو فيديو
+    # file_path = db.Column(db.String(500), nullable=False)     # مسار الملف
+    # file_name = db.Column(db.String(200), nullable=False)     # اسم الملف الأصلي
+    # thumbnail_path = db.Column(db.String(500), nullable=True) # مسار الصورة المصغرة للفيديو
+    
+    # العلاقة مع الوسائط المتعددة
+    media = db.relationship('ActivityMedia', backref='activity', lazy=True, cascade='all, delete-orphan')
+
+class ActivityMedia(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    activity_id = db.Column(db.Integer, db.ForeignKey('school_activity.id'), nullable=False)
+    media_type = db.Column(db.String(20), nullable=False)     # صورة أو فيديو
+    file_path = db.Column(db.String(500), nullable=False)     # مسار الملف
+    file_name = db.Column(db.String(200), nullable=False)     # اسم الملف الأصلي
+    thumbnail_path = db.Column(db.String(500), nullable=True) # مسار الصورة المصغرة للفيديو
+    is_primary = db.Column(db.Boolean, default=False)         # هل هي الصورة الرئيسية
+    display_order = db.Column(db.Integer, default=0)          # ترتيب العرض
+    upload_date = db.Column(db.DateTime, default=datetime.utcnow)
+    duration = db.Column(db.Float, nullable=True)              # مدة الفيديو بالثواني
+    width = db.Column(db.Integer, nullable=True)
+    height = db.Column(db.Integer, nullable=True)
+    processing_status = db.Column(db.String(20), nullable=True) # معالجة الفيديو: pending أو processing أو done أو failed
+    web_path = db.Column(db.String(500), nullable=True)         # نسخة MP4 (H.264) للمتصفح إن احتاج الأصل تحويلاً
+    web_low_path = db.Column(db.String(500), nullable=True)     # نسخة بدقة منخفضة للجوال
+
+class MediaFile(db.Model):
+    """ملف وسائط مخزن باسم بصمة محتواه مع عدد السجلات التي تشير إليه (انظر school/storage.py)"""
+    id = db.Column(db.Integer, primary_key=True)
+    category = db.Column(db.String(30), nullable=False)       # news_image أو activity_file أو material_file
+    file_path = db.Column(db.String(500), nullable=False)     # اسم الملف داخل مجلد الفئة
+    sha256 = db.Column(db.String(64), nullable=False)         # بصمة المحتوى المرفوع
+    size = db.Column(db.Integer, nullable=False, default=0)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # الصور فقط (انظر school/images.py): الأبعاد وعروض المقاسات الأصغر ('320,480') والصورة التمهيدية (data URI)
+    width = db.Column(db.Integer)
+    height = db.Column(db.Integer)
+    variants = db.Column(db.String(50))
+    placeholder = db.Column(db.Text)
+
+    __table_args__ = (
+        db.UniqueConstraint('category', 'file_path', name='uq_media_file_path'),
+        db.Index('ix_media_file_sha256', 'category', 'sha256'),
+    )
+
+class CalendarEvent(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(200), nullable=False)         # عنوان الحدث
+    event_type = db.Column(db.String(20), nullable=False)     # نوع الحدث (exam, activity, holiday, meeting)
+    start_date = db.Column(db.Date, nullable=False)           # تاريخ البداية
+    end_date = db.Column(db.Date, nullable=False)             # تاريخ النهاية
+    event_time = db.Column(db.String(10), nullable=True)      # وقت الحدث
+    location = db.Column(db.String(200), nullable=True)       # موقع الحدث
+    description = db.Column(db.Text, nullable=True)           # وصف الحدث
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class Inquiry(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    student_civil_id = db.Column(db.String(20), db.ForeignKey('student.civil_id'), nullable=False)
+    student_name = db.Column(db.String(100), nullable=False)
+    student_grade = db.Column(db.String(20), nullable=False)
+    student_section = db.Column(db.String(10), nullable=False)  # شعبة الطالب
+    user_type = db.Column(db.String(20), nullable=False)
+    message_type = db.Column(db.String(20), nullable=False)  # استفسار، شكوى، مقترح
+    title = db.Column(db.String(200), nullable=False)
+    message = db.deferred(db.Column(db.Text, nullable=False), group='body')
+    phone = db.Column(db.String(20), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='قيد المراجعة')
+    response = db.deferred(db.Column(db.Text, nullable=True), group='body')
+    is_read = db.Column(db.Boolean, default=False)  # هل تم قراءة الرد
+    submission_date = db.Column(db.DateTime, default=datetime.utcnow)
+    last_updated = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    message_preview = db.query_expression()                   # مقتطف الرسالة لصفحة الإدارة
+
+class SystemSettings(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    setting_key = db.Column(db.String(100), unique=True, nullable=False)
+    setting_value = db.Column(db.String(500), nullable=False)
+    description = db.Column(db.Text, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class SchoolSettings(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    school_logo = db.Column(db.String(255), nullable=True)
+    school_name = db.Column(db.String(200), nullable=False)
+    school_address = db.Column(db.Text, nullable=True)
+    school_phone = db.Column(db.String(50), nullable=True)
+    school_email = db.Column(db.String(100), nullable=True)
+    school_vision = db.Column(db.Text, nullable=True)
+    school_mission = db.Column(db.Text, nullable=True)
+    school_values = db.Column(db.Text, nullable=True)
+    google_maps_url = db.Column(db.String(500), nullable=True)
+    youtube_url = db.Column(db.String(500), nullable=True)
+    instagram_url = db.Column(db.String(500), nullable=True)
+    telegram_url = db.Column(db.String(500), nullable=True)
+    snapchat_url = db.Column(db.String(500), nullable=True)
+    whatsapp_url = db.Column(db.String(500), nullable=True)
+    academic_year = db.Column(db.String(50), nullable=True)
+    academic_semester = db.Column(db.String(50), nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class ActivityLog(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    operation_type = db.Column(db.String(20), nullable=False)  # إضافة، تعديل، حذف
+    table_name = db.Column(db.String(50), nullable=False)      # اسم الجدول (users, seats, observers, etc.)
+    record_id = db.Column(db.String(50), nullable=True)        # معرف السجل (civil_id أو id)
+    
+    # بيانات المستخدم الذي قام بالعملية
+    user_civil_id = db.Column(db.String(20), nullable=True)    # الرقم المدني للمستخدم
+    user_name = db.Column(db.String(100), nullable=True)       # اسم المستخدم
+    user_subject = db.Column(db.String(100), nullable=True)    # مادة المستخدم
+    user_job_title = db.Column(db.String(50), nullable=True)   # المسمى الوظيفي
+    
+    # البيانات قبل التعديل (للعمليات من نوع تعديل)
+    old_data = db.deferred(db.Column(db.Text, nullable=True), group='details')  # البيانات القديمة (JSON)
+    
+    # البيانات بعد التعديل أو البيانات الجديدة
+    new_data = db.deferred(db.Column(db.Text, nullable=True), group='details')  # البيانات الجديدة (JSON)
+    
+    # تفاصيل إضافية (تحمل فقط في صفحة التفاصيل)
+    description = db.deferred(db.Column(db.Text, nullable=True), group='details')  # وصف العملية
+    ip_address = db.Column(db.String(45), nullable=True)      # عنوان IP
+    user_agent = db.deferred(db.Column(db.Text, nullable=True), group='details')  # User Agent
+    
+    # التواريخ
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class SchemaVersion(db.Model):
+    version = db.Column(db.Integer, primary_key=True)          # رقم الترحيل المطبق
+    description = db.Column(db.String(200), nullable=False)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,96 @@
+"""كلمات مرور الطلاب: التشفير بتكلفة قابلة للضبط والتحقق مع قياس زمنه"""
+import hmac
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from werkzeug.security import check_password_hash, generate_password_hash
+from .metrics import PASSWORD_VERIFY_TIME
+from .models import db
+from .profiling import record_timing
+
+# حوالي 25ms للتحقق على نواة واحدة: يكفي لذروة دخول آلاف الطلاب يوم الاختبار بعدد عمال معقول.
+# يرفع عبر STUDENT_PASSWORD_METHOD (مثلاً pbkdf2:sha256:200000 أو scrypt:16384:8:1) وتُرقى
+# الكلمات المخزنة بالتكلفة القديمة تلقائياً عند أول دخول ناجح.
+DEFAULT_STUDENT_PASSWORD_METHOD = 'pbkdf2:sha256:50000'
+
+_HASH_PREFIXES = ('pbkdf2:', 'scrypt:')
+
+def password_method():
+    return current_app.config['STUDENT_PASSWORD_METHOD']
+
+def is_hashed(stored):
+    """هل القيمة المخزنة مشفرة (وليست كلمة مرور قديمة بنص صريح)"""
+    return bool(stored) and stored.startswith(_HASH_PREFIXES) and stored.count('$') == 2
+
+@lru_cache(maxsize=8)
+def normalized_method(method):
+    """الطريقة بكل معاملاتها كما تكتب في القيمة المخزنة (scrypt ← scrypt:32768:8:1)"""
+    return generate_password_hash('', method).split('$', 1)[0]
+
+def needs_rehash(stored, method=None):
+    """هل تحتاج القيمة المخزنة إعادة التشفير: نص صريح أو خوارزمية أو معاملات غير الحالية"""
+    if not is_hashed(stored):
+        return True
+    return stored.split('$', 1)[0] != normalized_method(method or password_method())
+
+def hash_student_password(password, method=None):
+    return generate_password_hash(password, method or password_method())
+
+def hash_student_passwords(passwords, method=None, workers=None):
+    """تشفير قائمة كلمات مرور بالتوازي مع الحفاظ على الترتيب
+
+    hashlib يحرر GIL أثناء حساب PBKDF2/scrypt، فالخيوط تستخدم كل الأنوية دون عمليات منفصلة.
+    """
+    method = method or password_method()
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(passwords) < 2:
+        return [generate_password_hash(password, method) for password in passwords]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda password: generate_password_hash(password, method), passwords))
+
+def verify_student_password(student, password):
+    """التحقق من كلمة مرور الطالب مع تسجيل زمن التحقق في المقاييس ورأس Server-Timing
+
+    الكلمات القديمة (نص صريح أو بتكلفة غير الحالية) تعاد تشفيرها بعد التحقق الناجح.
+    """
+    stored = student.password or ''
+    password = password or ''
+    start = time.perf_counter()
+    if is_hashed(stored):
+        scheme = stored.split('$', 1)[0]
+        valid = check_password_hash(stored, password)
+    else:
+        scheme = 'plaintext'
+        valid = hmac.compare_digest(stored.encode(), password.encode())
+    elapsed = time.perf_counter() - start
+    PASSWORD_VERIFY_TIME.observe(elapsed, kind='student', scheme=scheme)
+    record_timing('kdf', elapsed)
+
+    if valid and needs_rehash(stored):
+        student.password = hash_student_password(password)
+        db.session.commit()
+    return valid
+
+@click.command('password-benchmark')
+@click.option('--logins', default=3000, help='عدد تسجيلات الدخول المتوقعة في الذروة')
+@click.option('--minutes', default=5.0, help='المدة التي تحدث فيها الذروة بالدقائق')
+@click.option('--samples', default=20, help='عدد مرات التحقق للقياس')
+@with_appcontext
+def password_benchmark_command(logins, minutes, samples):
+    """قياس زمن التحقق بالتكلفة الحالية وتقدير الأنوية اللازمة لذروة الدخول"""
+    method = password_method()
+    stored = hash_student_password('123456', method)
+    start = time.perf_counter()
+    for _ in range(samples):
+        check_password_hash(stored, '123456')
+    per_login = (time.perf_counter() - start) / samples
+    required_rate = logins / (minutes * 60)
+    cores = required_rate * per_login
+    click.echo(f'الطريقة: {method}')
+    click.echo(f'زمن التحقق: {per_login * 1000:.1f}ms ({1 / per_login:.0f} دخول/ث لكل نواة)')
+    click.echo(f'{logins} دخول خلال {minutes:g} دقيقة = {required_rate:.1f} دخول/ث '
+               f'تحتاج {cores:.2f} نواة لحساب التشفير وحده')
@@ -0,0 +1,128 @@
+"""قياس أداء الطلبات: الزمن الكلي وعدد استعلامات SQL وزمنها وزمن عرض القوالب لكل مسار"""
+import threading
+import time
+from collections import defaultdict, deque
+from flask import current_app, g, has_request_context, request, before_render_template, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# عدد الطلبات الأخيرة المحفوظة لكل مسار لحساب النسب المئوية
+PROFILE_WINDOW = 500
+
+# (الزمن الكلي، عدد الاستعلامات، زمن SQL، زمن القوالب) بالثواني لكل طلب
+_samples = defaultdict(lambda: deque(maxlen=PROFILE_WINDOW))
+_samples_lock = threading.Lock()
+
+def _profiling():
+    return has_request_context() and 'profile_start' in g
+
+# دوال تستدعى بعد كل استعلام SQL بزمنه (مثل مقاييس Prometheus) حتى يكون على Engine زوج مستمعين واحد
+_query_observers = []
+
+def on_query(observer):
+    """تسجيل دالة observer(seconds) تستدعى بعد كل استعلام SQL داخل الطلبات وخارجها"""
+    _query_observers.append(observer)
+    return observer
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not conn.info.get('query_start'):
+        return
+    seconds = time.perf_counter() - conn.info['query_start'].pop()
+    if _profiling():
+        g.profile_sql_count += 1
+        g.profile_sql_time += seconds
+    for observer in _query_observers:
+        observer(seconds)
+
+def _before_render(sender, template, context, **extra):
+    if _profiling():
+        g.profile_template_stack.append(time.perf_counter())
+
+def _after_render(sender, template, context, **extra):
+    if _profiling() and g.profile_template_stack:
+        started = g.profile_template_stack.pop()
+        # القوالب المتداخلة محسوبة ضمن القالب الخارجي
+        if not g.profile_template_stack:
+            g.profile_template_time += time.perf_counter() - started
+
+def record_timing(name, seconds):
+    """إضافة زمن مرحلة داخل الطلب (مثل التحقق من كلمة المرور) إلى رأس Server-Timing"""
+    if _profiling():
+        g.profile_extra_timings.append((name, seconds))
+
+def _start_profile():
+    g.profile_start = time.perf_counter()
+    g.profile_sql_count = 0
+    g.profile_sql_time = 0.0
+    g.profile_template_time = 0.0
+    g.profile_template_stack = []
+    g.profile_extra_timings = []
+
+def _finish_profile(response):
+    if 'profile_start' not in g:
+        return response
+    wall = time.perf_counter() - g.profile_start
+    endpoint = request.endpoint or 'غير معروف'
+    with _samples_lock:
+        _samples[endpoint].append((wall, g.profile_sql_count, g.profile_sql_time, g.profile_template_time))
+
+    # يظهر في أدوات المطور في المتصفح (تبويب Network > Timing)
+    response.headers['Server-Timing'] = (
+        f"app;dur={wall * 1000:.1f}, db;dur={g.profile_sql_time * 1000:.1f};desc=\"{g.profile_sql_count} queries\", "
+        f"tpl;dur={g.profile_template_time * 1000:.1f}"
+    ) + ''.join(f", {name};dur={seconds * 1000:.1f}" for name, seconds in g.profile_extra_timings)
+
+    budget = current_app.config['PROFILE_QUERY_BUDGET']
+    if budget and g.profile_sql_count > budget:
+        current_app.logger.warning(
+            f"تجاوز ميزانية الاستعلامات: {endpoint} نفذ {g.profile_sql_count} استعلاماً "
+            f"(الحد {budget}) في {wall * 1000:.0f}ms — {request.method} {request.full_path}"
+        )
+    return response
+
+def _percentile(sorted_values, percent):
+    index = max(0, int(round(percent / 100 * len(sorted_values))) - 1)
+    return sorted_values[index]
+
+def endpoint_stats():
+    """ملخص لكل مسار من الطلبات الأخيرة في هذا العامل، مرتب حسب p95 تنازلياً"""
+    with _samples_lock:
+        snapshot = {endpoint: list(samples) for endpoint, samples in _samples.items()}
+    rows = []
+    for endpoint, samples in snapshot.items():
+        walls = sorted(s[0] for s in samples)
+        count = len(samples)
+        rows.append({
+            'endpoint': endpoint,
+            'count': count,
+            'p50_ms': _percentile(walls, 50) * 1000,
+            'p95_ms': _percentile(walls, 95) * 1000,
+            'p99_ms': _percentile(walls, 99) * 1000,
+            'max_ms': walls[-1] * 1000,
+            'sql_count_avg': sum(s[1] for s in samples) / count,
+            'sql_count_max': max(s[1] for s in samples),
+            'sql_ms_avg': sum(s[2] for s in samples) / count * 1000,
+            'template_ms_avg': sum(s[3] for s in samples) / count * 1000,
+        })
+    rows.sort(key=lambda row: row['p95_ms'], reverse=True)
+    return rows
+
+def reset_stats():
+    with _samples_lock:
+        _samples.clear()
+
+def init_app(app):
+    """تفعيل القياس على التطبيق (PROFILING_ENABLED و PROFILE_QUERY_BUDGET في الإعدادات)"""
+    app.config.setdefault('PROFILING_ENABLED', True)
+    app.config.setdefault('PROFILE_QUERY_BUDGET', 30)
+    if not app.config['PROFILING_ENABLED']:
+        return
+    app.before_request(_start_profile)
+    app.after_request(_finish_profile)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
@@ -0,0 +1,96 @@
+"""الصفحات العامة: الرئيسية والأخبار والأنشطة والتقويم"""
+from flask import Blueprint, render_template, request, flash, jsonify
+from datetime import datetime
+from .models import db, ActivityMedia, News, SchoolActivity
+from .helpers import NEWS_PER_PAGE, get_school_settings
+from .images import image_info
+from .media import media_url
+
+bp = Blueprint('public', __name__)
+
+@bp.route('/')
+def home():
+    news_list = News.query.order_by(News.id.desc()).limit(6).all()
+    school_settings = get_school_settings()
+    current_year = datetime.now().year
+    return render_template('index.html', news_list=news_list, school_settings=school_settings, current_year=current_year)
+
+@bp.route('/news_all')
+def news_all():
+    page = request.args.get('page', 1, type=int)
+    news_page = News.query.order_by(News.id.desc()).paginate(page=page, per_page=NEWS_PER_PAGE, error_out=False)
+    school_settings = get_school_settings()
+    current_year = datetime.now().year
+    return render_template('news_all.html', news_list=news_page.items, news_page=news_page, school_settings=school_settings, current_year=current_year)
+
+@bp.route('/news/<int:news_id>')
+def news_detail(news_id):
+    news = News.query.options(db.undefer(News.details)).filter_by(id=news_id).first_or_404()
+    school_settings = get_school_settings()
+    current_year = datetime.now().year
+    return render_template('news_detail.html', news=news, school_settings=school_settings, current_year=current_year)
+
+@bp.route('/activities')
+def activities_gallery():
+    """صفحة معرض الأنشطة للزوار"""
+    try:
+        # جلب الأنشطة مع الوسائط المرتبطة
+        query = SchoolActivity.query
+        activities = query.order_by(SchoolActivity.activity_date.desc()).all()
+        
+        # جلب الوسائط لكل نشاط
+        for activity in activities:
+            activity.media = ActivityMedia.query.filter_by(activity_id=activity.id).order_by(ActivityMedia.display_order).all()
+        
+        school_settings = get_school_settings()
+        current_year = datetime.now().year
+        
+        return render_template('activities_gallery.html', activities=activities, school_settings=school_settings, current_year=current_year)
+        
+    except Exception as e:
+        flash(f'حدث خطأ في عرض الأنشطة: {str(e)}', 'danger')
+        school_settings = get_school_settings()
+        current_year = datetime.now().year
+        return render_template('activities_gallery.html', activities=[], school_settings=school_settings, current_year=current_year)
+
+# مسارات التقويم المدرسي
+@bp.route('/calendar')
+def school_calendar():
+    school_settings = get_school_settings()
+    current_year = datetime.now().year
+    return render_template('school_calendar.html', school_settings=school_settings, current_year=current_year)
+
+@bp.route('/activities/<int:activity_id>/media')
+def get_activity_media_public(activity_id):
+    """جلب وسائط النشاط للزوار"""
+    try:
+        activity = SchoolActivity.query.get_or_404(activity_id)
+        media_list = ActivityMedia.query.filter_by(activity_id=activity_id).order_by(ActivityMedia.display_order).all()
+        
+        media_data = []
+        for media in media_list:
+            media_data.append({
+                'id': media.id,
+                'media_type': media.media_type,
+                'file_path': media.file_path,
+                'file_name': media.file_name,
+                'thumbnail_path': media.thumbnail_path,
+                'file_url': media_url('activity_file', media.file_path),
+                'thumbnail_url': media_url('activity_file', media.thumbnail_path),
+                # المقاسات الأصغر للصور (المعرض يعرضها بعرض ثلث الشاشة)
+                'srcset': (image_info('activity_file', media.file_path) or {}).get('srcset') if media.media_type == 'صورة' else None,
+                # نسخة MP4 للمتصفح إن وجدت، وإلا الأصل
+                'video_url': media_url('activity_file', media.web_path or media.file_path),
+                'video_low_url': media_url('activity_file', media.web_low_path),
+                'is_primary': media.is_primary,
+                'display_order': media.display_order,
+                'upload_date': media.upload_date.isoformat() if media.upload_date else None
+            })
+        
+        return jsonify({
+            'success': True,
+            'media': media_data
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'حدث خطأ: {str(e)}'})
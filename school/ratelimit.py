@@ -0,0 +1,189 @@
+"""تحديد معدل الطلبات بدلو الرموز (token bucket) لكل عنوان IP ولكل رقم مدني
+
+يُفحص الحد قبل تنفيذ المسار، فالطلب المرفوض يرجع 429 دون أي استعلام لقاعدة البيانات أو
+حساب لتشفير كلمة المرور. الحالة في ذاكرة العامل افتراضياً، ومع RATE_LIMIT_STORAGE (مسار ملف)
+تحفظ في SQLite منفصلة تشترك فيها كل عمال gunicorn.
+"""
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import Response, current_app, jsonify, request, session
+from .metrics import RATE_LIMITED
+
+# الحد: "العدد/المدة" مثل 10/minute أو 10/10minute أو 5/300 (بالثواني)
+# الطلاب في المدرسة قد يدخلون من عنوان IP واحد (NAT)، لذلك حد IP للطلاب واسع وحد الرقم المدني ضيق
+DEFAULT_RATE_LIMITS = {
+    'login_ip': '30/minute',
+    'login_civil_id': '10/10minute',
+    'student_login_ip': '600/minute',
+    'student_login_civil_id': '10/10minute',
+    'inquiry_ip': '60/hour',
+    'inquiry_civil_id': '10/hour',
+}
+
+# أقصى عدد دلاء في ذاكرة العامل؛ الأقدم استخداماً يحذف (أي يعود ممتلئاً)
+MEMORY_STORE_MAX_KEYS = 100_000
+
+_PERIODS = {'': 1, 's': 1, 'second': 1, 'm': 60, 'minute': 60, 'h': 3600, 'hour': 3600}
+_RATE_PATTERN = re.compile(r'^\s*(\d+)\s*/\s*(\d*)\s*([a-z]*)\s*$')
+
+RATE_LIMIT_PAGE = '''<!DOCTYPE html>
+<html lang="ar" dir="rtl"><head><meta charset="utf-8"><title>محاولات كثيرة</title></head>
+<body style="font-family: sans-serif; text-align: center; padding: 3rem;">
+<h1>محاولات كثيرة</h1>
+<p>تم تجاوز عدد المحاولات المسموح. يرجى المحاولة بعد {seconds} ثانية.</p>
+<p><a href="javascript:history.back()">رجوع</a></p>
+</body></html>'''
+
+def parse_rate(rate):
+    """تحويل "10/minute" إلى (السعة، الرموز في الثانية)"""
+    match = _RATE_PATTERN.match(rate)
+    if not match or match.group(3) not in _PERIODS:
+        raise ValueError(f'صيغة حد غير صحيحة: {rate}')
+    count = int(match.group(1))
+    period = int(match.group(2) or 1) * _PERIODS[match.group(3)]
+    return count, count / period
+
+def _take(state, capacity, refill_rate, now):
+    """سحب رمز من الدلو: (مسموح، الحالة الجديدة، ثواني الانتظار)"""
+    tokens, updated = state if state else (capacity, now)
+    tokens = min(capacity, tokens + (now - updated) * refill_rate)
+    if tokens >= 1:
+        return True, (tokens - 1, now), 0
+    return False, (tokens, now), math.ceil((1 - tokens) / refill_rate)
+
+class MemoryStore:
+    """دلاء في ذاكرة العامل الحالي"""
+
+    def __init__(self, max_keys=MEMORY_STORE_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, refill_rate):
+        with self._lock:
+            allowed, state, retry_after = _take(self._buckets.get(key), capacity, refill_rate, time.time())
+            self._buckets[key] = state
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+class SQLiteStore:
+    """دلاء في ملف SQLite مشترك بين العمال (منفصل عن قاعدة بيانات الموقع حتى لا ينافس كتاباتها)"""
+
+    # حذف الدلاء الخاملة كل هذا العدد من الطلبات؛ الدلو الخامل يوماً كاملاً ممتلئ حتماً
+    PRUNE_EVERY = 1000
+    PRUNE_AGE = 24 * 60 * 60
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._calls = 0
+        self._connection().execute(
+            'CREATE TABLE IF NOT EXISTS rate_limit_bucket (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+        )
+
+    def _connection(self):
+        # اتصال لكل خيط ولكل عملية (لا يصلح نقل اتصال SQLite عبر fork)
+        if getattr(self._local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=OFF')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return self._local.connection
+
+    def take(self, key, capacity, refill_rate):
+        connection = self._connection()
+        now = time.time()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            state = connection.execute('SELECT tokens, updated FROM rate_limit_bucket WHERE key = ?', (key,)).fetchone()
+            allowed, (tokens, updated), retry_after = _take(state, capacity, refill_rate, now)
+            connection.execute(
+                'INSERT INTO rate_limit_bucket (key, tokens, updated) VALUES (?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated',
+                (key, tokens, updated),
+            )
+            self._calls += 1
+            if self._calls % self.PRUNE_EVERY == 0:
+                connection.execute('DELETE FROM rate_limit_bucket WHERE updated < ?', (now - self.PRUNE_AGE,))
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        return allowed, retry_after
+
+def _wants_json():
+    """طلبات fetch/XHR أو JSON أو التي لا تقبل HTML تأخذ الرد بصيغة JSON مثل مسارات api"""
+    accept = request.accept_mimetypes
+    return (request.is_json or request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+            or (bool(accept) and not accept.accept_html))
+
+def _too_many_requests(retry_after):
+    if _wants_json():
+        response = jsonify({'error': f'تم تجاوز عدد المحاولات المسموح. يرجى المحاولة بعد {retry_after} ثانية.',
+                            'retry_after': retry_after})
+        response.status_code = 429
+    else:
+        response = Response(RATE_LIMIT_PAGE.format(seconds=retry_after), status=429, mimetype='text/html')
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+def check_limit(name, key):
+    """فحص حد واحد؛ يرجع ثواني الانتظار أو 0 إذا كان الطلب مسموحاً"""
+    limiter = current_app.extensions['rate_limiter']
+    capacity, refill_rate = limiter['limits'][name]
+    try:
+        allowed, retry_after = limiter['store'].take(f'{name}:{key}', capacity, refill_rate)
+    except sqlite3.Error as e:
+        # تعطل مخزن الحدود لا يمنع الدخول
+        print(f"خطأ في مخزن تحديد المعدل: {e}")
+        return 0
+    if allowed:
+        return 0
+    RATE_LIMITED.inc(limit=name)
+    return retry_after
+
+def rate_limited(rule, civil_id=None, methods=('POST',)):
+    """مزخرف يطبق حد IP وحد الرقم المدني (إن وجد) على طلبات methods قبل تنفيذ المسار
+
+    rule: بادئة الحدود في RATE_LIMITS (مثلاً 'login' لـ login_ip و login_civil_id)
+    civil_id: دالة ترجع الرقم المدني من الطلب أو الجلسة
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if current_app.config['RATE_LIMIT_ENABLED'] and request.method in methods:
+                retry_after = check_limit(f'{rule}_ip', request.remote_addr)
+                identity = civil_id() if civil_id and not retry_after else None
+                if identity:
+                    retry_after = check_limit(f'{rule}_civil_id', identity)
+                if retry_after:
+                    return _too_many_requests(retry_after)
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def form_civil_id():
+    return (request.form.get('civil_id') or '').strip()
+
+def session_civil_id():
+    return session.get('student_civil_id') or session.get('civil_id')
+
+def init_app(app):
+    """تجهيز مخزن الحدود (RATE_LIMIT_ENABLED و RATE_LIMIT_STORAGE و RATE_LIMITS في الإعدادات)"""
+    app.config.setdefault('RATE_LIMIT_ENABLED', True)
+    app.config.setdefault('RATE_LIMIT_STORAGE', '')
+    limits = dict(DEFAULT_RATE_LIMITS, **app.config.get('RATE_LIMITS', {}))
+    storage = app.config['RATE_LIMIT_STORAGE']
+    app.extensions['rate_limiter'] = {
+        'limits': {name: parse_rate(rate) for name, rate in limits.items()},
+        'store': SQLiteStore(storage) if storage else MemoryStore(),
+    }
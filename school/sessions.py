@@ -0,0 +1,319 @@
+"""جلسات على الخادم: الكوكي يحمل معرفاً قصيراً فقط، والبيانات في SQLite أو ملفات
+
+- معرف الجلسة عشوائي (192 بت) ويتغير عند تسجيل الدخول بهوية جديدة.
+- كل عامل يحتفظ بذاكرة LRU للجلسات الأخيرة، ويتحقق من صلاحيتها بعملية رخيصة
+  (PRAGMA data_version في SQLite أو stat للملف) فيبقى زمن الطلب ثابتاً.
+- انتهاء الجلسة بعد PERMANENT_SESSION_LIFETIME من آخر استخدام، والتمديد يكتب مرة كل نصف المدة على الأكثر.
+- revoke_sessions(civil_ids) ينهي كل جلسات المستخدم فوراً في كل العمال.
+"""
+import os
+import re
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SecureCookieSession, SessionInterface
+
+# عدد الجلسات في ذاكرة كل عامل
+SESSION_CACHE_SIZE = 5000
+# حذف الجلسات المنتهية تلقائياً كل هذا العدد من عمليات الحفظ في العامل
+SWEEP_EVERY = 1000
+
+_SID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{32}$')
+
+def new_session_id():
+    return secrets.token_urlsafe(24)
+
+class _LRUCache:
+    def __init__(self, max_size=SESSION_CACHE_SIZE):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            if len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+class SQLiteSessionStore:
+    """جدول واحد في ملف SQLite منفصل عن قاعدة بيانات الموقع، مع فهرس للرقم المدني ووقت الانتهاء"""
+
+    def __init__(self, path, cache_size=SESSION_CACHE_SIZE):
+        self.path = path
+        self.cache = _LRUCache(cache_size)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._data_version = None
+        with self._lock:
+            connection = self._connection()
+            connection.execute('CREATE TABLE IF NOT EXISTS session (id TEXT PRIMARY KEY, civil_id TEXT, '
+                               'data TEXT NOT NULL, expires REAL NOT NULL)')
+            connection.execute('CREATE INDEX IF NOT EXISTS ix_session_civil_id ON session (civil_id)')
+            connection.execute('CREATE INDEX IF NOT EXISTS ix_session_expires ON session (expires)')
+
+    def _connection(self):
+        # اتصال واحد لكل عملية خلف قفل: PRAGMA data_version يتغير فقط بكتابات العمليات الأخرى
+        if self._pid != os.getpid():
+            self._db = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('PRAGMA synchronous=NORMAL')
+            self._pid = os.getpid()
+            self._data_version = None
+            self.cache.clear()
+        return self._db
+
+    def _sync_cache(self, connection):
+        """إفراغ الذاكرة إذا كتب عامل آخر في الجدول منذ آخر فحص"""
+        version = connection.execute('PRAGMA data_version').fetchone()[0]
+        if version != self._data_version:
+            self.cache.clear()
+            self._data_version = version
+
+    def load(self, sid):
+        with self._lock:
+            connection = self._connection()
+            self._sync_cache(connection)
+            entry = self.cache.get(sid)
+            if entry is None:
+                entry = connection.execute('SELECT data, expires FROM session WHERE id = ?', (sid,)).fetchone()
+                if entry is None:
+                    return None
+                self.cache.set(sid, entry)
+        return entry if entry[1] > time.time() else None
+
+    def save(self, sid, data, civil_id, expires):
+        with self._lock:
+            connection = self._connection()
+            connection.execute('INSERT INTO session (id, civil_id, data, expires) VALUES (?, ?, ?, ?) '
+                               'ON CONFLICT(id) DO UPDATE SET civil_id = excluded.civil_id, data = excluded.data, '
+                               'expires = excluded.expires', (sid, civil_id, data, expires))
+            self.cache.set(sid, (data, expires))
+
+    def delete(self, sid):
+        with self._lock:
+            self._connection().execute('DELETE FROM session WHERE id = ?', (sid,))
+            self.cache.discard(sid)
+
+    def revoke(self, civil_ids):
+        civil_ids = list(civil_ids)
+        revoked = 0
+        with self._lock:
+            connection = self._connection()
+            for start in range(0, len(civil_ids), 500):
+                batch = civil_ids[start:start + 500]
+                revoked += connection.execute(f"DELETE FROM session WHERE civil_id IN ({','.join('?' * len(batch))})",
+                                              batch).rowcount
+            self.cache.clear()
+        return revoked
+
+    def sweep(self):
+        with self._lock:
+            return self._connection().execute('DELETE FROM session WHERE expires <= ?', (time.time(),)).rowcount
+
+class FileSessionStore:
+    """ملف لكل جلسة: السطر الأول الرقم المدني والباقي البيانات، ووقت تعديل الملف هو وقت الانتهاء"""
+
+    def __init__(self, directory, cache_size=SESSION_CACHE_SIZE):
+        self.directory = directory
+        self.cache = _LRUCache(cache_size)
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, sid):
+        return os.path.join(self.directory, sid)
+
+    def load(self, sid):
+        path = self._path(sid)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.cache.discard(sid)
+            return None
+        if stat.st_mtime <= time.time():
+            return None
+        # الملف لم يتغير منذ قراءته (نفس وقت الانتهاء والحجم): البيانات من الذاكرة
+        entry = self.cache.get(sid)
+        if entry is None or entry[0] != (stat.st_mtime_ns, stat.st_size):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    f.readline()
+                    entry = ((stat.st_mtime_ns, stat.st_size), f.read())
+            except OSError:
+                return None
+            self.cache.set(sid, entry)
+        return entry[1], stat.st_mtime
+
+    def save(self, sid, data, civil_id, expires):
+        path = self._path(sid)
+        temporary = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            f.write(f"{civil_id or ''}\n{data}")
+        os.utime(temporary, (expires, expires))
+        os.replace(temporary, path)
+
+    def delete(self, sid):
+        self.cache.discard(sid)
+        try:
+            os.remove(self._path(sid))
+        except OSError:
+            pass
+
+    def revoke(self, civil_ids):
+        civil_ids = set(civil_ids)
+        revoked = 0
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                try:
+                    with open(entry.path, encoding='utf-8') as f:
+                        owner = f.readline().rstrip('\n')
+                except OSError:
+                    continue
+                if owner in civil_ids:
+                    self.delete(entry.name)
+                    revoked += 1
+        return revoked
+
+    def sweep(self):
+        now = time.time()
+        swept = 0
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.stat().st_mtime <= now:
+                        os.remove(entry.path)
+                        swept += 1
+                except OSError:
+                    continue
+        return swept
+
+class ServerSideSession(SecureCookieSession):
+    def __init__(self, initial=None, sid=None, expires=None):
+        super().__init__(initial)
+        self.sid = sid
+        self.expires = expires
+        # الهوية عند التحميل لتغيير المعرف عند تسجيل الدخول (منع تثبيت الجلسة)
+        self.loaded_identity = session_identity(self)
+
+def session_identity(data):
+    return data.get('civil_id') or data.get('student_civil_id')
+
+class ServerSideSessionInterface(SessionInterface):
+    serializer = TaggedJSONSerializer()
+
+    def __init__(self, store):
+        self.store = store
+        self._saves = 0
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid and _SID_PATTERN.match(sid):
+            entry = self.store.load(sid)
+            if entry is not None:
+                return ServerSideSession(self.serializer.loads(entry[0]), sid=sid, expires=entry[1])
+        return ServerSideSession()
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        secure = self.get_cookie_secure(app)
+        samesite = self.get_cookie_samesite(app)
+        httponly = self.get_cookie_httponly(app)
+        if session.accessed:
+            response.vary.add('Cookie')
+
+        if not session:
+            if session.sid:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path, secure=secure, samesite=samesite, httponly=httponly)
+            return
+
+        lifetime = app.permanent_session_lifetime.total_seconds()
+        now = time.time()
+        sid = session.sid
+        if sid and session_identity(session) != session.loaded_identity:
+            self.store.delete(sid)
+            sid = None
+        # التمديد بلا تعديل يكتب فقط إذا مضى نصف المدة، فأغلب الطلبات لا تكتب شيئاً
+        if sid and not session.modified and session.expires - now > lifetime / 2:
+            return
+
+        if not sid:
+            sid = new_session_id()
+        self.store.save(sid, self.serializer.dumps(dict(session)), session_identity(session), now + lifetime)
+        if sid != session.sid:
+            response.set_cookie(name, sid, expires=self.get_expiration_time(app, session), httponly=httponly,
+                                domain=domain, path=path, secure=secure, samesite=samesite)
+
+        self._saves += 1
+        if self._saves % SWEEP_EVERY == 0:
+            self.store.sweep()
+
+def revoke_sessions(civil_ids):
+    """إنهاء كل جلسات أصحاب الأرقام المدنية (عند الحذف أو تغيير الصلاحية أو كلمة المرور)"""
+    interface = current_app.session_interface
+    if not isinstance(interface, ServerSideSessionInterface):
+        return 0
+    return interface.store.revoke([str(civil_id) for civil_id in civil_ids])
+
+def load_secret_key(app):
+    """SECRET_KEY من البيئة، وإلا مفتاح عشوائي يحفظ في instance/secret_key ويشترك فيه كل العمال"""
+    if os.environ.get('SECRET_KEY'):
+        return os.environ['SECRET_KEY']
+    path = os.path.join(app.instance_path, 'secret_key')
+    os.makedirs(app.instance_path, exist_ok=True)
+    try:
+        # O_EXCL: إذا أنشأه عامل آخر في نفس اللحظة يقرأ الجميع نفس المفتاح
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            f.write(secrets.token_hex(32))
+    except FileExistsError:
+        pass
+    with open(path) as f:
+        return f.read().strip()
+
+@click.command('sweep-sessions')
+@with_appcontext
+def sweep_sessions_command():
+    """حذف الجلسات المنتهية من مخزن الجلسات"""
+    interface = current_app.session_interface
+    if not isinstance(interface, ServerSideSessionInterface):
+        click.echo('الجلسات في الكوكي (SESSION_BACKEND=cookie)، لا يوجد ما يحذف')
+        return
+    click.echo(f'تم حذف {interface.store.sweep()} جلسة منتهية')
+
+def init_app(app):
+    """اختيار مخزن الجلسات حسب SESSION_BACKEND: sqlite (الافتراضي) أو file أو cookie"""
+    backend = app.config.setdefault('SESSION_BACKEND', 'sqlite')
+    if backend == 'cookie':
+        return
+    os.makedirs(app.instance_path, exist_ok=True)
+    if backend == 'sqlite':
+        store = SQLiteSessionStore(app.config.get('SESSION_STORAGE') or os.path.join(app.instance_path, 'sessions.db'))
+    elif backend == 'file':
+        store = FileSessionStore(app.config.get('SESSION_STORAGE') or os.path.join(app.instance_path, 'sessions'))
+    else:
+        raise ValueError(f'SESSION_BACKEND غير معروف: {backend}')
+    app.session_interface = ServerSideSessionInterface(store)
+    app.cli.add_command(sweep_sessions_command)
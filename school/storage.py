@@ -0,0 +1,260 @@
+"""مخزن الوسائط بحسب المحتوى: كل ملف يسمى ببصمة SHA-256 لما رفع، مع عدد مراجعه
+
+رفع نفس الصورة أو ملف PDF مرة ثانية لا ينشئ نسخة جديدة بل يزيد عدد المراجع في MediaFile،
+والحذف ينقص العدد ولا يحذف الملف من القرص إلا عند وصوله إلى صفر وبعد نجاح حفظ المعاملة.
+المراجع: News.image و ActivityMedia.file_path و thumbnail_path و web_path و web_low_path و
+EducationalMaterial.file_path، وصور محرر الأخبار (مرجع دائم لأنها داخل نص الخبر).
+الملفات الجديدة تحفظ في مجلدات فرعية حسب البصمة (shard_path)، والأمر shard-media ينقل الملفات القديمة.
+"""
+import hashlib
+import os
+import re
+import shutil
+import uuid
+from collections import Counter
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import event
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from .media import MEDIA_DIRECTORIES, SHARDED_DIRECTORIES, media_file_path, shard_path, variant_paths
+from .models import db, ActivityMedia, EducationalMaterial, MediaFile, News
+
+# الفئات التي تحسب مراجعها (مفاتيح MEDIA_DIRECTORIES)
+STORE_CATEGORIES = ('news_image', 'activity_file', 'material_file')
+
+BUFFER_SIZE = 1024 * 1024
+
+_EXTENSION_PATTERN = re.compile(r'^\.[a-z0-9]{1,5}$')
+
+def file_extension(original_name):
+    """امتداد الملف الأصلي بأحرف صغيرة، أو '' إذا لم يكن امتداداً صالحاً"""
+    extension = os.path.splitext(original_name or '')[1].lower()
+    return extension if _EXTENSION_PATTERN.match(extension) else ''
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(BUFFER_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def temp_path(category, extension=''):
+    """مسار مؤقت داخل مجلد الفئة نفسه، فالنقل إلى الاسم النهائي إعادة تسمية على نفس القرص"""
+    directory = MEDIA_DIRECTORIES[category]
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f'.tmp-{uuid.uuid4().hex}{extension}')
+
+def _store(category, sha256, original_name, write):
+    """إضافة مرجع للمحتوى ذي البصمة sha256؛ write() تكتب الملف وترجع مساره المؤقت، ولا تستدعى إذا كان مخزناً من قبل"""
+    existing = MediaFile.query.filter_by(category=category, sha256=sha256).first()
+    filename = existing.file_path if existing else shard_path(sha256 + file_extension(original_name))
+    destination = media_file_path(category, filename)
+
+    if not (existing and os.path.isfile(destination)):
+        path = write()
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        os.replace(path, destination)
+
+    # upsert: رفعان متزامنان لنفس المحتوى يزيدان نفس السجل بدلاً من تعارض القيد الفريد
+    db.session.execute(
+        insert(MediaFile)
+        .values(category=category, file_path=filename, sha256=sha256, size=os.path.getsize(destination), ref_count=1)
+        .on_conflict_do_update(index_elements=['category', 'file_path'], set_={'ref_count': MediaFile.ref_count + 1})
+    )
+    return filename
+
+def store_file(category, source_path, original_name, sha256=None, process=None):
+    """نقل ملف مؤقت إلى مجلد الفئة باسم بصمته وإضافة مرجع إليه؛ يرجع اسم الملف المخزن
+
+    sha256: بصمة المحتوى إن كانت محسوبة مسبقاً (مثلاً من الرفع على أجزاء).
+    process(source, destination): كتابة نسخة معالجة من الملف (ضغط الصور) ترجع False إذا تعذرت فيخزن
+    الملف كما هو، ولا تنفذ إذا كان المحتوى مخزناً من قبل.
+    """
+    sha256 = sha256 or file_sha256(source_path)
+
+    def write():
+        if process:
+            output = temp_path(category, file_extension(original_name))
+            if process(source_path, output):
+                return output
+        return source_path
+
+    try:
+        return _store(category, sha256, original_name, write)
+    finally:
+        if os.path.exists(source_path):
+            os.remove(source_path)
+
+def store_upload(category, file, process=None):
+    """حفظ ملف مرفوع (FileStorage) مع حساب بصمته أثناء الكتابة، ثم store_file
+
+    مع process تعالج الصورة من الطلب مباشرة (Werkzeug يحفظه في الذاكرة أو ملف مؤقت يمكن الرجوع فيه)،
+    فتكتب على القرص مرة واحدة بعد المعالجة بدلاً من حفظ الأصل ثم إعادة كتابته.
+    """
+    stream = file.stream
+    if process and stream.seekable():
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: stream.read(BUFFER_SIZE), b''):
+            digest.update(chunk)
+
+        def write():
+            output = temp_path(category, file_extension(file.filename))
+            stream.seek(0)
+            if not process(stream, output):
+                stream.seek(0)
+                with open(output, 'wb') as out:
+                    shutil.copyfileobj(stream, out, BUFFER_SIZE)
+            return output
+
+        return _store(category, digest.hexdigest(), file.filename, write)
+
+    path = temp_path(category, file_extension(file.filename))
+    digest = hashlib.sha256()
+    with open(path, 'wb') as out:
+        for chunk in iter(lambda: stream.read(BUFFER_SIZE), b''):
+            digest.update(chunk)
+            out.write(chunk)
+    return store_file(category, path, file.filename, digest.hexdigest(), process)
+
+def release_files(category, filenames):
+    """إنقاص مراجع الملفات؛ ما يصل إلى الصفر يحذف سجله ويحذف من القرص (مع مقاساته) بعد حفظ المعاملة
+
+    الملفات التي ليس لها سجل (أضيفت يدوياً أو بقيت من قبل) لا تحذف هنا، بل يعرضها فحص سلامة الوسائط.
+    """
+    counts = Counter(filename for filename in filenames if filename)
+    if not counts:
+        return
+    table = MediaFile.__table__
+    # executemany على الجدول مباشرة (ليس تحديثاً بالمفتاح الأساسي عبر ORM)
+    db.session.execute(
+        table.update()
+        .where(table.c.category == category, table.c.file_path == db.bindparam('name'))
+        .values(ref_count=table.c.ref_count - db.bindparam('count')),
+        [{'name': name, 'count': count} for name, count in counts.items()],
+    )
+    released = db.session.execute(
+        db.delete(MediaFile)
+        .where(MediaFile.category == category, MediaFile.ref_count <= 0, MediaFile.file_path.in_(list(counts)))
+        .returning(MediaFile.file_path, MediaFile.variants)
+    ).all()
+    db.session.info.setdefault('media_unlink', []).extend(
+        (category, filename, variant_paths(filename, variants)) for filename, variants in released)
+
+def release_file(category, filename):
+    release_files(category, [filename])
+
+@event.listens_for(Session, 'after_commit')
+def _unlink_released_files(session):
+    released = session.info.pop('media_unlink', None)
+    if not released:
+        return
+    from .images import forget_image_info
+    with db.engine.connect() as connection:
+        for category, filename, variants in released:
+            # رفع جديد لنفس المحتوى بعد الحذف أعاد إنشاء السجل: الملف مستخدم
+            if connection.execute(db.select(MediaFile.id).where(MediaFile.category == category, MediaFile.file_path == filename)).first():
+                continue
+            forget_image_info(category, filename)
+            for path in [filename, *variants]:
+                try:
+                    os.remove(media_file_path(category, path))
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    print(f"خطأ في حذف ملف الوسائط {path}: {e}")
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_released_files(session):
+    session.info.pop('media_unlink', None)
+
+# مسارات المواد القديمة كانت تخزن مع مجلدها (انظر fix_material_paths)
+LEGACY_MATERIAL_PREFIX = 'assets/materials/'
+
+# اسم بدون مجلد فرعي فقط، فإعادة تشغيل الأمر لا تغير الروابط المجزأة
+_EDITOR_IMAGE_PATTERN = re.compile(r'(/assets/images/news/)([^"/?]+)(?=["?])')
+
+def sharded_name(category, path):
+    """القيمة المخزنة الجديدة لمسار قديم بدون مجلد فرعي (المسارات المجزأة ترجع كما هي)"""
+    if not path:
+        return path
+    if category == 'material_file' and path.startswith(LEGACY_MATERIAL_PREFIX):
+        path = path[len(LEGACY_MATERIAL_PREFIX):]
+    return path if '/' in path else shard_path(path)
+
+def shard_existing_files(dry_run=False):
+    """نقل ملفات الوسائط من جذر مجلداتها إلى المجلدات المجزأة وتحديث كل المسارات المخزنة
+
+    الملفات تنقل أولاً ثم تحدث المسارات في معاملة واحدة؛ بينهما يجد media_file_path الملف في
+    مكانه الجديد، وإعادة تشغيل الأمر بعد انقطاع تكمل من حيث توقف. يرجع عدد الملفات والسجلات لكل فئة.
+    """
+    moved = Counter()
+    for category in SHARDED_DIRECTORIES:
+        directory = MEDIA_DIRECTORIES[category]
+        if not os.path.isdir(directory):
+            continue
+        with os.scandir(directory) as entries:
+            names = [entry.name for entry in entries if entry.is_file() and not entry.name.startswith('.')]
+        for name in names:
+            if not dry_run:
+                destination = os.path.join(directory, *shard_path(name).split('/'))
+                os.makedirs(os.path.dirname(destination), exist_ok=True)
+                os.replace(os.path.join(directory, name), destination)
+            moved[category] += 1
+
+    columns = [
+        ('news_image', News, News.image),
+        ('news_image', News, News.cover_image),
+        ('activity_file', ActivityMedia, ActivityMedia.file_path),
+        ('activity_file', ActivityMedia, ActivityMedia.thumbnail_path),
+        ('material_file', EducationalMaterial, EducationalMaterial.file_path),
+    ]
+    rewritten = Counter()
+    for category, model, column in columns:
+        rows = db.session.query(model.id, column).filter(column.isnot(None)).all()
+        changes = [{'id': row_id, column.key: sharded_name(category, path)} for row_id, path in rows
+                   if sharded_name(category, path) != path]
+        if changes:
+            # تحديث مجمع بالمفتاح الأساسي (executemany)
+            db.session.execute(db.update(model), changes)
+        rewritten[category] += len(changes)
+
+    # روابط صور المحرر داخل نص الخبر
+    changes = []
+    for news_id, details in db.session.query(News.id, News.details).filter(News.details.like('%/assets/images/news/%')):
+        updated = _EDITOR_IMAGE_PATTERN.sub(lambda match: match.group(1) + shard_path(match.group(2)), details)
+        if updated != details:
+            changes.append({'id': news_id, 'details': updated})
+    if changes:
+        db.session.execute(db.update(News), changes)
+    rewritten['news_image'] += len(changes)
+
+    # مقاسات الصور تنقل بأسمائها إلى مجلدات أخرى، فتمسح بياناتها ويعيد إنشاءها الأمر describe-images
+    for category in SHARDED_DIRECTORIES:
+        rows = db.session.query(MediaFile.id, MediaFile.file_path).filter_by(category=category).all()
+        changes = [{'id': row_id, 'file_path': sharded_name(category, path),
+                    'width': None, 'height': None, 'variants': None, 'placeholder': None}
+                   for row_id, path in rows if sharded_name(category, path) != path]
+        if changes:
+            db.session.execute(db.update(MediaFile), changes)
+        rewritten[category] += len(changes)
+
+    if dry_run:
+        db.session.rollback()
+    else:
+        db.session.commit()
+    return moved, rewritten
+
+@click.command('shard-media')
+@click.option('--dry-run', is_flag=True, help='عرض عدد الملفات والسجلات دون نقل أو تعديل')
+@with_appcontext
+def shard_media_command(dry_run):
+    """نقل ملفات الأخبار والأنشطة والمواد القديمة إلى المجلدات المجزأة وتحديث مساراتها"""
+    from .feeds import invalidate_materials_feed
+    moved, rewritten = shard_existing_files(dry_run)
+    for category in SHARDED_DIRECTORIES:
+        print(f"{category}: {moved[category]} ملف، {rewritten[category]} مسار")
+    if dry_run:
+        print('تجربة فقط: لم ينقل أي ملف')
+    elif rewritten['material_file']:
+        invalidate_materials_feed()
@@ -0,0 +1,165 @@
+"""دخول الطلاب وصفحاتهم"""
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash
+from datetime import datetime
+from .models import db, Inquiry, Seat, Student
+from .helpers import get_school_settings, get_system_setting
+from .metrics import LOGIN_ATTEMPTS
+from .passwords import hash_student_password, verify_student_password
+from .ratelimit import form_civil_id, rate_limited, session_civil_id
+
+bp = Blueprint('student', __name__)
+
+@bp.route('/student_login', methods=['GET', 'POST'])
+@rate_limited('student_login', civil_id=form_civil_id)
+def student_login():
+    if request.method == 'POST':
+        civil_id = request.form.get('civil_id')
+        password = request.form.get('password')
+        student = Student.query.filter_by(civil_id=civil_id).first()
+        if student and verify_student_password(student, password):
+            LOGIN_ATTEMPTS.inc(kind='student', result='success')
+            session['student_civil_id'] = civil_id
+            return redirect(url_for('student.student_home'))
+        else:
+            LOGIN_ATTEMPTS.inc(kind='student', result='failure')
+            flash('الرقم المدني أو كلمة المرور غير صحيحة', 'danger')
+    school_settings = get_school_settings()
+    current_year = datetime.now().year
+    return render_template('student_login.html', school_settings=school_settings, current_year=current_year)
+
+@bp.route('/student_home')
+def student_home():
+    if 'student_civil_id' not in session:
+        return redirect(url_for('student.student_login'))
+    try:
+        student = Student.query.filter_by(civil_id=session['student_civil_id']).first()
+        # حساب الاستفسارات غير المقروءة للطالب
+        unread_inquiries_count = Inquiry.query.filter_by(
+            student_civil_id=session['student_civil_id'],
+            status='تم الرد',
+            is_read=False
+        ).count()
+        # الحصول على حالة تفعيل استفسارات الطلاب
+        student_inquiries_enabled = get_system_setting('student_inquiries_enabled', '1')
+        school_settings = get_school_settings()
+        current_year = datetime.now().year
+        return render_template('student_home.html', student=student, unread_inquiries_count=unread_inquiries_count, student_inquiries_enabled=student_inquiries_enabled, school_settings=school_settings, current_year=current_year)
+    except Exception as e:
+        student = Student.query.filter_by(civil_id=session['student_civil_id']).first()
+        student_inquiries_enabled = get_system_setting('student_inquiries_enabled', '1')
+        school_settings = get_school_settings()
+        current_year = datetime.now().year
+        return render_template('student_home.html', student=student, unread_inquiries_count=0, student_inquiries_enabled=student_inquiries_enabled, school_settings=school_settings, current_year=current_year)
+
+@bp.route('/student_seat')
+def student_seat():
+    if 'student_civil_id' not in session:
+        return redirect(url_for('student.student_login'))
+    seat = Seat.query.filter_by(civil_id=session['student_civil_id']).first()
+    school_settings = get_school_settings()
+    current_year = datetime.now().year
+    return render_template('student_seat.html', seat=seat, school_settings=school_settings, current_year=current_year)
+
+@bp.route('/student_change_password', methods=['GET', 'POST'])
+def student_change_password():
+    if 'student_civil_id' not in session:
+        return redirect(url_for('student.student_login'))
+    student = Student.query.filter_by(civil_id=session['student_civil_id']).first()
+    if request.method == 'POST':
+        current_password = request.form.get('current_password')
+        new_password = request.form.get('new_password')
+        confirm_password = request.form.get('confirm_password')
+        if not student or not verify_student_password(student, current_password):
+            flash('كلمة المرور الحالية غير صحيحة', 'danger')
+        elif new_password != confirm_password:
+            flash('كلمة المرور الجديدة غير متطابقة مع التأكيد', 'danger')
+        elif len(new_password) < 4:
+            flash('كلمة المرور الجديدة يجب أن تكون 4 أحرف أو أكثر', 'danger')
+        else:
+            student.password = hash_student_password(new_password)
+            db.session.commit()
+            flash('تم تغيير كلمة المرور بنجاح', 'success')
+            return redirect(url_for('student.student_home'))
+    school_settings = get_school_settings()
+    current_year = datetime.now().year
+    return render_template('student_change_password.html', school_settings=school_settings, current_year=current_year)
+
+@bp.route('/student_materials')
+def student_materials():
+    if 'student_civil_id' not in session:
+        return redirect(url_for('student.student_login'))
+    
+    student = Student.query.filter_by(civil_id=session['student_civil_id']).first()
+    if not student:
+        return redirect(url_for('student.student_login'))
+    
+    school_settings = get_school_settings()
+    current_year = datetime.now().year
+    return render_template('student_materials.html', student=student, school_settings=school_settings, current_year=current_year)
+
+@bp.route('/student_inquiries', methods=['GET', 'POST'])
+@rate_limited('inquiry', civil_id=session_civil_id)
+def student_inquiries():
+    if 'student_civil_id' not in session:
+        return redirect(url_for('student.student_login'))
+    
+    # التحقق من حالة تفعيل استفسارات الطلاب
+    student_inquiries_enabled = get_system_setting('student_inquiries_enabled', '1')
+    if student_inquiries_enabled != '1':
+        flash('استفسارات الطلاب معطلة مؤقتاً من قبل الإدارة', 'warning')
+        return redirect(url_for('student.student_home'))
+    
+    student = Student.query.filter_by(civil_id=session['student_civil_id']).first()
+    if not student:
+        return redirect(url_for('student.student_login'))
+    
+    if request.method == 'POST':
+        try:
+            # التحقق من رقم التليفون
+            phone = request.form['phone'].strip()
+            if not phone.isdigit() or len(phone) != 8:
+                flash('يجب أن يكون رقم التليفون مكون من 8 أرقام فقط', 'danger')
+                return redirect(url_for('student.student_inquiries'))
+            
+            # إنشاء استفسار جديد
+            inquiry = Inquiry(
+                student_civil_id=student.civil_id,
+                student_name=student.name,
+                student_grade=student.grade,
+                student_section=student.section,
+                user_type='طالب',
+                message_type=request.form['message_type'],
+                title=request.form['title'],
+                message=request.form['message'],
+                phone=phone,
+                status='قيد المراجعة'
+            )
+            
+            db.session.add(inquiry)
+            db.session.commit()
+            
+            flash('تم إرسال الرسالة، شكرًا لتواصلك معنا', 'success')
+            return redirect(url_for('student.student_inquiries'))
+        except Exception as e:
+            flash('حدث خطأ أثناء إرسال الرسالة. يرجى المحاولة مرة أخرى.', 'danger')
+            return redirect(url_for('student.student_inquiries'))
+    
+    try:
+        # تحديث حالة القراءة للاستفسارات المردود عليها
+        Inquiry.query.filter_by(
+            student_civil_id=student.civil_id,
+            status='تم الرد',
+            is_read=False
+        ).update({'is_read': True})
+        db.session.commit()
+        
+        # جلب استفسارات الطالب
+        inquiries = Inquiry.query.options(db.undefer_group('body')).filter_by(student_civil_id=student.civil_id).order_by(Inquiry.submission_date.desc()).all()
+        school_settings = get_school_settings()
+        current_year = datetime.now().year
+        return render_template('student_inquiries.html', student=student, inquiries=inquiries, school_settings=school_settings, current_year=current_year)
+    except Exception as e:
+        flash('حدث خطأ في عرض الاستفسارات. يرجى المحاولة مرة أخرى.', 'danger')
+        school_settings = get_school_settings()
+        current_year = datetime.now().year
+        return render_template('student_inquiries.html', student=student, inquiries=[], school_settings=school_settings, current_year=current_year)
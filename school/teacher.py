@@ -0,0 +1,170 @@
+"""دخول المعلمين وصفحاتهم"""
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash
+from werkzeug.security import generate_password_hash, check_password_hash
+from datetime import datetime
+from .models import db, Inquiry, Observer, User
+from .helpers import get_school_settings, get_system_setting
+from .metrics import LOGIN_ATTEMPTS
+from .ratelimit import form_civil_id, rate_limited, session_civil_id
+
+bp = Blueprint('teacher', __name__)
+
+@bp.route('/login', methods=['GET', 'POST'])
+@rate_limited('login', civil_id=form_civil_id)
+def login():
+    if request.method == 'POST':
+        civil_id = request.form['civil_id']
+        password = request.form['password']
+        user = User.query.filter_by(civil_id=civil_id).first()
+        if user and check_password_hash(user.password, password):
+            LOGIN_ATTEMPTS.inc(kind='staff', result='success')
+            session['civil_id'] = user.civil_id
+            session['name'] = user.name
+            session['role'] = user.role
+            flash('تم تسجيل الدخول بنجاح!', 'success')
+            if user.role == 'مشرف' or user.role == 'مشرف محتوى':
+                return redirect(url_for('admin.admin_dashboard'))
+            else:
+                return redirect(url_for('teacher.user_dashboard'))
+        else:
+            LOGIN_ATTEMPTS.inc(kind='staff', result='failure')
+            flash('الرقم المدني أو كلمة المرور غير صحيحة', 'danger')
+    school_settings = get_school_settings()
+    current_year = datetime.now().year
+    return render_template('login.html', school_settings=school_settings, current_year=current_year)
+
+@bp.route('/user')
+def user_dashboard():
+    if 'role' in session and session['role'] == 'عادي':
+        try:
+            # حساب الاستفسارات غير المقروءة للمستخدم
+            unread_inquiries_count = Inquiry.query.filter_by(
+                student_civil_id=session['civil_id'],
+                status='تم الرد',
+                is_read=False
+            ).count()
+            
+            # التحقق من تفعيل استفسارات المعلمين
+            teacher_inquiries_enabled = get_system_setting('teacher_inquiries_enabled', '1')
+            
+            school_settings = get_school_settings()
+            current_year = datetime.now().year
+            return render_template('user_home.html', 
+                                 unread_inquiries_count=unread_inquiries_count,
+                                 teacher_inquiries_enabled=teacher_inquiries_enabled,
+                                 school_settings=school_settings,
+                                 current_year=current_year)
+        except Exception as e:
+            school_settings = get_school_settings()
+            current_year = datetime.now().year
+            return render_template('user_home.html', 
+                                 unread_inquiries_count=0,
+                                 teacher_inquiries_enabled='1',
+                                 school_settings=school_settings,
+                                 current_year=current_year)
+    return redirect(url_for('teacher.login'))
+
+@bp.route('/logout')
+def logout():
+    session.clear()
+    return redirect(url_for('teacher.login'))
+
+@bp.route('/user/note')
+def user_note():
+    if 'civil_id' not in session:
+        return redirect(url_for('teacher.login'))
+    observer = Observer.query.filter_by(civil_id=session['civil_id']).first()
+    school_settings = get_school_settings()
+    current_year = datetime.now().year
+    return render_template('user_observer.html', observer=observer, school_settings=school_settings, current_year=current_year)
+
+@bp.route('/user/inquiries', methods=['GET', 'POST'])
+@rate_limited('inquiry', civil_id=session_civil_id)
+def user_inquiries():
+    if 'civil_id' not in session or session['role'] != 'عادي':
+        return redirect(url_for('teacher.login'))
+    
+    # التحقق من حالة تفعيل استفسارات المعلمين
+    teacher_inquiries_enabled = get_system_setting('teacher_inquiries_enabled', '1')
+    if teacher_inquiries_enabled != '1':
+        flash('استفسارات المعلمين معطلة مؤقتاً من قبل الإدارة', 'warning')
+        return redirect(url_for('teacher.user_dashboard'))
+    
+    user = User.query.filter_by(civil_id=session['civil_id']).first()
+    if not user:
+        return redirect(url_for('teacher.login'))
+    
+    if request.method == 'POST':
+        try:
+            # التحقق من رقم التليفون
+            phone = request.form['phone'].strip()
+            if not phone.isdigit() or len(phone) != 8:
+                flash('يجب أن يكون رقم التليفون مكون من 8 أرقام فقط', 'danger')
+                return redirect(url_for('teacher.user_inquiries'))
+            
+            # إنشاء استفسار جديد للمستخدم
+            inquiry = Inquiry(
+                student_civil_id=user.civil_id,  # استخدام الرقم المدني للمستخدم
+                student_name=user.name,          # اسم المستخدم
+                student_grade=user.subject,      # المادة في حقل student_grade
+                student_section='-',             # لا يوجد شعبة للمستخدمين
+                user_type=user.job_title if user.job_title else 'مستخدم',  # المسمى الوظيفي في حقل user_type
+                message_type=request.form['message_type'],
+                title=request.form['title'],
+                message=request.form['message'],
+                phone=phone,
+                status='قيد المراجعة'
+            )
+            
+            db.session.add(inquiry)
+            db.session.commit()
+            
+            flash('تم إرسال الرسالة، شكرًا لتواصلك معنا', 'success')
+            return redirect(url_for('teacher.user_inquiries'))
+        except Exception as e:
+            flash('حدث خطأ أثناء إرسال الرسالة. يرجى المحاولة مرة أخرى.', 'danger')
+            return redirect(url_for('teacher.user_inquiries'))
+    
+    try:
+        # تحديث حالة القراءة للاستفسارات المردود عليها
+        Inquiry.query.filter_by(
+            student_civil_id=user.civil_id,
+            status='تم الرد',
+            is_read=False
+        ).update({'is_read': True})
+        db.session.commit()
+        
+        # جلب استفسارات المستخدم
+        inquiries = Inquiry.query.options(db.undefer_group('body')).filter_by(student_civil_id=user.civil_id).order_by(Inquiry.submission_date.desc()).all()
+        school_settings = get_school_settings()
+        current_year = datetime.now().year
+        return render_template('user_inquiries.html', user=user, inquiries=inquiries, school_settings=school_settings, current_year=current_year)
+    except Exception as e:
+        flash('حدث خطأ في عرض الاستفسارات. يرجى المحاولة مرة أخرى.', 'danger')
+        school_settings = get_school_settings()
+        current_year = datetime.now().year
+        return render_template('user_inquiries.html', user=user, inquiries=[], school_settings=school_settings, current_year=current_year)
+
+@bp.route('/user_change_password', methods=['GET', 'POST'])
+def user_change_password():
+    if 'civil_id' not in session or session['role'] != 'عادي':
+        return redirect(url_for('teacher.login'))
+    user = User.query.filter_by(civil_id=session['civil_id']).first()
+    if request.method == 'POST':
+        current_password = request.form.get('current_password')
+        new_password = request.form.get('new_password')
+        confirm_password = request.form.get('confirm_password')
+        if not user or not check_password_hash(user.password, current_password):
+            flash('كلمة المرور الحالية غير صحيحة', 'danger')
+        elif new_password != confirm_password:
+            flash('كلمة المرور الجديدة غير متطابقة مع التأكيد', 'danger')
+        elif len(new_password) < 4:
+            flash('كلمة المرور الجديدة يجب أن تكون 4 أحرف أو أكثر', 'danger')
+        else:
+            user.password = generate_password_hash(new_password)
+            db.session.commit()
+            flash('تم تغيير كلمة المرور بنجاح', 'success')
+            return redirect(url_for('teacher.user_dashboard'))
+    school_settings = get_school_settings()
+    current_year = datetime.now().year
+    return render_template('user_change_password.html', school_settings=school_settings, current_year=current_year)
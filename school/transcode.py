@@ -0,0 +1,247 @@
+"""تحويل فيديو الأنشطة إلى MP4 (H.264) يبدأ تشغيله في المتصفح فوراً، مع نسخة بدقة منخفضة
+
+يستدعى من عامل معالجة الفيديو (school/video.py) بعد الصورة المصغرة، وينتج ملفين مؤقتين يخزنان
+بجانب الأصل في مخزن الوسائط (ActivityMedia.web_path و web_low_path) ويفضلهما المعرض على الأصل:
+
+- web: الضلع الأطول حتى 1280 بكسل ومعدل بت الفيديو حتى 2500 kbit/s
+- low: الضلع الأطول حتى 640 بكسل و 800 kbit/s (للجوال وتوفير البيانات)
+
+المحول (VIDEO_TRANSCODER): 'auto' يستخدم ffmpeg إذا وجد؛ 'opencv' يستخدم مشفر H.264 في OpenCV
+إن كان مبنياً به (بدون صوت ودون تحكم بمعدل البت، لذلك لا يختار تلقائياً)؛ 'off' يوقف التحويل.
+ملف MP4 بترميز H.264 ضمن الحدود لا يعاد ترميزه، وإذا كان صندوق moov في آخره ينقل إلى أوله فقط.
+"""
+import os
+import shutil
+import struct
+import subprocess
+from flask import current_app
+from .storage import temp_path
+
+# (أقصى طول للضلع الأطول، أقصى معدل بت للفيديو kbit/s، معدل بت الصوت kbit/s)
+VIDEO_VARIANTS = {
+    'web': (1280, 2500, 128),
+    'low': (640, 800, 64),
+}
+# هامش فوق حد معدل البت قبل إعادة ترميز ملف H.264 (الصوت والحاوية)
+BITRATE_TOLERANCE = 1.2
+H264_FOURCCS = ('avc1', 'h264', 'x264')
+WEB_EXTENSIONS = ('.mp4', '.m4v')
+
+OPENCV_FOURCC = 'avc1'
+OPENCV_MAX_FPS = 30
+
+class TranscodeUnavailable(Exception):
+    """لا يوجد محول يستطيع إنتاج H.264"""
+
+def transcoder():
+    """المحول المستخدم: 'ffmpeg' أو 'opencv' أو None"""
+    mode = current_app.config['VIDEO_TRANSCODER']
+    if mode == 'auto':
+        return 'ffmpeg' if ffmpeg_binary() else None
+    if mode == 'off':
+        return None
+    return mode
+
+def ffmpeg_binary():
+    return current_app.config['FFMPEG_BINARY'] or shutil.which('ffmpeg')
+
+def ffmpeg_transcode(source, destination, max_side, video_kbps, audio_kbps):
+    """ترميز H.264/AAC بمعدل بت محدود (crf مع maxrate) و faststart، مع الحفاظ على النسبة والاتجاه"""
+    scale = (f"scale='min(iw,{max_side})':'min(ih,{max_side})':force_original_aspect_ratio=decrease,"
+             "scale=trunc(iw/2)*2:trunc(ih/2)*2")
+    command = [
+        ffmpeg_binary(), '-nostdin', '-y', '-loglevel', 'error', '-i', source,
+        '-map', '0:v:0', '-map', '0:a:0?',
+        '-c:v', 'libx264', '-preset', 'veryfast', '-profile:v', 'high', '-pix_fmt', 'yuv420p',
+        '-crf', '23', '-maxrate', f'{video_kbps}k', '-bufsize', f'{video_kbps * 2}k', '-vf', scale,
+        '-c:a', 'aac', '-b:a', f'{audio_kbps}k', '-ac', '2',
+        '-threads', str(current_app.config['VIDEO_TRANSCODE_THREADS']),
+        '-movflags', '+faststart', '-f', 'mp4', destination,
+    ]
+    try:
+        subprocess.run(command, check=True, capture_output=True, timeout=current_app.config['VIDEO_TRANSCODE_TIMEOUT'])
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(e.stderr.decode('utf-8', 'replace').strip() or str(e)) from e
+
+def _scaled_size(width, height, max_side):
+    ratio = min(max_side / max(width, height), 1)
+    return max(2, int(width * ratio) // 2 * 2), max(2, int(height * ratio) // 2 * 2)
+
+def opencv_transcode(source, destination, max_side, video_kbps, audio_kbps):
+    """ترميز الصورة فقط بمشفر H.264 في OpenCV (إن وجد) ثم نقل moov إلى أول الملف"""
+    import cv2
+    video = cv2.VideoCapture(source)
+    if not video.isOpened():
+        raise ValueError(f'تعذر فتح الفيديو: {source}')
+    writer = None
+    try:
+        source_fps = video.get(cv2.CAP_PROP_FPS) or 25
+        fps = min(source_fps, OPENCV_MAX_FPS)
+        # إسقاط إطارات الفيديو الأعلى من OPENCV_MAX_FPS
+        step, position = source_fps / fps, 0.0
+        index = 0
+        while True:
+            ok, frame = video.read()
+            if not ok:
+                break
+            if index >= position:
+                position += step
+                if writer is None:
+                    size = _scaled_size(frame.shape[1], frame.shape[0], max_side)
+                    writer = cv2.VideoWriter(destination, cv2.VideoWriter_fourcc(*OPENCV_FOURCC), fps, size)
+                    if not writer.isOpened():
+                        raise TranscodeUnavailable('OpenCV مبني بدون مشفر H.264')
+                if (frame.shape[1], frame.shape[0]) != size:
+                    frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+                writer.write(frame)
+            index += 1
+    finally:
+        video.release()
+        if writer is not None:
+            writer.release()
+    if writer is None:
+        raise ValueError(f'لا توجد إطارات في الفيديو: {source}')
+    faststart(destination)
+
+def video_codec(path):
+    import cv2
+    video = cv2.VideoCapture(path)
+    try:
+        code = int(video.get(cv2.CAP_PROP_FOURCC))
+    finally:
+        video.release()
+    return ''.join(chr((code >> shift) & 0xFF) for shift in (0, 8, 16, 24)).strip('\x00 ').lower()
+
+def is_web_ready(path, duration, width, height, max_side, video_kbps):
+    """ملف MP4 بترميز H.264 ضمن حدود الدقة ومعدل البت لا يحتاج إعادة ترميز"""
+    if os.path.splitext(path)[1].lower() not in WEB_EXTENSIONS or not (duration and width and height):
+        return False
+    if max(width, height) > max_side:
+        return False
+    if os.path.getsize(path) * 8 / duration / 1000 > video_kbps * BITRATE_TOLERANCE:
+        return False
+    return video_codec(path) in H264_FOURCCS
+
+def make_web_variants(source, duration, width, height):
+    """{'web': مسار مؤقت، 'low': مسار مؤقت} للنسخ التي تحتاج إنشاء فقط (الأصل المناسب لا ينسخ)"""
+    variants = {}
+    mode = transcoder()
+    encode = {'ffmpeg': ffmpeg_transcode, 'opencv': opencv_transcode}.get(mode)
+    try:
+        for name, (max_side, video_kbps, audio_kbps) in VIDEO_VARIANTS.items():
+            if name == 'low' and width and height and max(width, height) <= max_side:
+                # الأصل صغير أصلاً: نسخة web تكفي
+                continue
+            if name == 'web' and is_web_ready(source, duration, width, height, max_side, video_kbps):
+                if has_faststart(source):
+                    continue
+                destination = temp_path('activity_file', '.mp4')
+                shutil.copyfile(source, destination)
+                variants[name] = destination
+                faststart(destination)
+                continue
+            if encode is None:
+                continue
+            destination = temp_path('activity_file', '.mp4')
+            variants[name] = destination
+            encode(source, destination, max_side, video_kbps, audio_kbps)
+    except Exception:
+        for path in variants.values():
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    return variants
+
+# صناديق MP4 التي تحتوي صناديق أخرى في الطريق إلى جداول إزاحات الأجزاء (stco/co64)
+_CONTAINER_ATOMS = {b'moov', b'trak', b'mdia', b'minf', b'stbl'}
+
+def _read_atoms(f, end):
+    """(النوع، الإزاحة، الحجم) لصناديق المستوى الأعلى في الملف"""
+    atoms = []
+    offset = 0
+    while offset + 8 <= end:
+        f.seek(offset)
+        size, kind = struct.unpack('>I4s', f.read(8))
+        if size == 1:
+            size = struct.unpack('>Q', f.read(8))[0]
+        elif size == 0:
+            size = end - offset
+        if size < 8:
+            raise ValueError('ملف MP4 تالف')
+        atoms.append((kind, offset, size))
+        offset += size
+    return atoms
+
+def _shift_chunk_offsets(moov, shift, before):
+    """إضافة shift إلى إزاحات الأجزاء داخل moov التي تقع قبل الإزاحة before"""
+    def walk(start, end):
+        offset = start
+        while offset + 8 <= end:
+            size, kind = struct.unpack_from('>I4s', moov, offset)
+            header = 8
+            if size == 1:
+                size = struct.unpack_from('>Q', moov, offset + 8)[0]
+                header = 16
+            elif size == 0:
+                size = end - offset
+            if size < header:
+                raise ValueError('ملف MP4 تالف')
+            if kind in _CONTAINER_ATOMS:
+                walk(offset + header, offset + size)
+            elif kind in (b'stco', b'co64'):
+                item = 'I' if kind == b'stco' else 'Q'
+                count = struct.unpack_from('>I', moov, offset + header + 4)[0]
+                table = offset + header + 8
+                offsets = [value + shift if value < before else value
+                           for value in struct.unpack_from(f'>{count}{item}', moov, table)]
+                if kind == b'stco' and offsets and max(offsets) > 0xFFFFFFFF:
+                    raise ValueError('الملف أكبر من أن ينقل moov دون تحويل stco إلى co64')
+                struct.pack_into(f'>{count}{item}', moov, table, *offsets)
+            offset += size
+    walk(0, len(moov))
+
+def has_faststart(path):
+    """هل صندوق moov قبل بيانات الفيديو (mdat) فيبدأ التشغيل قبل اكتمال التنزيل"""
+    with open(path, 'rb') as f:
+        kinds = [kind for kind, _, _ in _read_atoms(f, os.fstat(f.fileno()).st_size)]
+    return b'moov' in kinds and b'mdat' in kinds and kinds.index(b'moov') < kinds.index(b'mdat')
+
+def faststart(path):
+    """نقل صندوق moov إلى أول ملف MP4 (مثل qt-faststart)؛ يرجع False إذا كان في أوله مسبقاً"""
+    with open(path, 'rb') as f:
+        atoms = _read_atoms(f, os.fstat(f.fileno()).st_size)
+        kinds = [kind for kind, _, _ in atoms]
+        if b'moov' not in kinds or b'mdat' not in kinds or kinds.index(b'moov') < kinds.index(b'mdat'):
+            return False
+        _, moov_offset, moov_size = atoms[kinds.index(b'moov')]
+        f.seek(moov_offset)
+        moov = bytearray(f.read(moov_size))
+        # كل ما كان قبل moov (ما عدا ftyp) يتأخر بحجم moov
+        _shift_chunk_offsets(moov, moov_size, moov_offset)
+
+        head = [atom for atom in atoms[:1] if atom[0] == b'ftyp']
+        rest = [atom for atom in atoms if atom[0] != b'moov' and atom not in head]
+        output = path + '.faststart'
+        with open(output, 'wb') as out:
+            for _, offset, size in head:
+                f.seek(offset)
+                out.write(f.read(size))
+            out.write(moov)
+            for _, offset, size in rest:
+                f.seek(offset)
+                remaining = size
+                while remaining:
+                    chunk = f.read(min(remaining, 1024 * 1024))
+                    if not chunk:
+                        raise ValueError('ملف MP4 ناقص')
+                    out.write(chunk)
+                    remaining -= len(chunk)
+    os.replace(output, path)
+    return True
+
+def init_app(app):
+    """VIDEO_TRANSCODER و FFMPEG_BINARY و VIDEO_TRANSCODE_THREADS و VIDEO_TRANSCODE_TIMEOUT"""
+    app.config.setdefault('VIDEO_TRANSCODER', 'auto')
+    app.config.setdefault('FFMPEG_BINARY', '')
+    app.config.setdefault('VIDEO_TRANSCODE_THREADS', 2)
+    app.config.setdefault('VIDEO_TRANSCODE_TIMEOUT', 3600)
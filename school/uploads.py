@@ -0,0 +1,261 @@
+"""رفع الملفات الكبيرة (الفيديو وملفات PDF) على أجزاء قابلة للاستئناف
+
+كل جزء يكتب مباشرة من جسم الطلب إلى ملف مؤقت في UPLOAD_DIR مع حساب SHA-256 أثناء الكتابة،
+فلا يحمل الملف في الذاكرة ولا ينسخ مرة ثانية: بعد اكتمال الرفع يرسل النموذج upload_id بدل
+الملف، وينقله المسار إلى مجلد الوسائط بـ claim_upload(). حالة كل رفع في ملف JSON بجانب
+الجزء المكتوب فيستطيع أي عامل إكمال الرفع أو عرض تقدمه.
+
+    POST   /admin/uploads         {"filename", "size"} -> {"upload_id", "offset", "chunk_size"}
+    PATCH  /admin/uploads/<id>    الجزء التالي في جسم الطلب مع رأس Upload-Offset -> {"offset", "complete"}
+    GET    /admin/uploads/<id>    التقدم: {"offset", "size", "percent", "complete"}
+    DELETE /admin/uploads/<id>    إلغاء الرفع
+"""
+import fcntl
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+import click
+from flask import Response, current_app, jsonify, request
+from flask.cli import with_appcontext
+from werkzeug.exceptions import RequestEntityTooLarge
+from .metrics import UPLOAD_SIZE
+
+# حجم الجزء الذي يرسله المتصفح في كل طلب (أصغر من MAX_CONTENT_LENGTH)
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+# القراءة من جسم الطلب والكتابة إلى الملف بهذا الحجم
+STREAM_BUFFER_SIZE = 1024 * 1024
+
+_UPLOAD_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+# حالات الهاش المفتوحة في هذا العامل: upload_id -> (الإزاحة، كائن sha256)
+_hashers = {}
+
+class UploadError(Exception):
+    """خطأ في الرفع مع رمز HTTP المناسب"""
+
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+        self.offset = offset
+
+def _upload_dir():
+    return current_app.config['UPLOAD_DIR']
+
+def _paths(upload_id):
+    if not _UPLOAD_ID_PATTERN.match(upload_id or ''):
+        raise UploadError('معرف رفع غير صالح', 404)
+    base = os.path.join(_upload_dir(), upload_id)
+    return base + '.json', base + '.part'
+
+def _read_meta(upload_id):
+    meta_path, _ = _paths(upload_id)
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise UploadError('الرفع غير موجود أو انتهت صلاحيته', 404)
+
+def _write_meta(upload_id, meta):
+    meta_path, _ = _paths(upload_id)
+    tmp_path = meta_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp_path, meta_path)
+
+def progress(meta):
+    """حالة الرفع كما ترجع للمتصفح"""
+    return {
+        'upload_id': meta['upload_id'],
+        'filename': meta['filename'],
+        'offset': meta['offset'],
+        'size': meta['size'],
+        'percent': round(meta['offset'] * 100 / meta['size'], 1) if meta['size'] else 100.0,
+        'complete': meta['offset'] == meta['size'],
+    }
+
+def create_upload(filename, size, owner):
+    """تسجيل رفع جديد وإنشاء ملفه الفارغ"""
+    if not filename or size is None or size < 0:
+        raise UploadError('اسم الملف وحجمه مطلوبان')
+    if size > current_app.config['UPLOAD_MAX_SIZE']:
+        raise UploadError(f"حجم الملف أكبر من المسموح ({current_app.config['UPLOAD_MAX_SIZE'] // (1024 * 1024)}MB)", 413)
+    os.makedirs(_upload_dir(), exist_ok=True)
+    sweep_uploads()
+    upload_id = uuid.uuid4().hex
+    _, part_path = _paths(upload_id)
+    open(part_path, 'wb').close()
+    meta = {'upload_id': upload_id, 'filename': filename, 'size': size, 'offset': 0,
+            'owner': owner, 'sha256': None, 'created': time.time()}
+    _write_meta(upload_id, meta)
+    _hashers[upload_id] = (0, hashlib.sha256())
+    return meta
+
+def get_upload(upload_id, owner, complete=False):
+    """بيانات الرفع لصاحبه فقط؛ complete=True يشترط اكتمال الرفع (قبل استلامه في النموذج)"""
+    meta = _read_meta(upload_id)
+    if meta['owner'] != owner:
+        raise UploadError('الرفع غير موجود أو انتهت صلاحيته', 404)
+    if complete and meta['offset'] != meta['size']:
+        raise UploadError('لم يكتمل رفع الملف بعد', 409, meta['offset'])
+    return meta
+
+def append_chunk(upload_id, owner, offset, stream, length):
+    """كتابة الجزء التالي من stream عند الإزاحة offset
+
+    الإزاحة يجب أن تساوي ما كتب حتى الآن، فإعادة إرسال جزء بعد انقطاع الاتصال ترجع 409
+    مع الإزاحة الصحيحة ليكمل المتصفح منها.
+    """
+    meta = get_upload(upload_id, owner)
+    _, part_path = _paths(upload_id)
+    with open(part_path, 'r+b') as f:
+        try:
+            # جزء واحد في كل مرة لكل رفع حتى لو وصل جزءان لعاملين مختلفين
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadError('جزء آخر من هذا الملف قيد الكتابة', 409, meta['offset'])
+        # الحالة قد تغيرت قبل أخذ القفل
+        meta = _read_meta(upload_id)
+        written = os.fstat(f.fileno()).st_size
+        if offset != written:
+            raise UploadError('الإزاحة لا تطابق ما تم رفعه', 409, written)
+        if length is None or offset + length > meta['size']:
+            raise UploadError('الجزء يتجاوز حجم الملف المعلن', 413, written)
+
+        cached = _hashers.get(upload_id)
+        hasher = cached[1] if cached and cached[0] == offset else None
+        f.seek(offset)
+        remaining = length
+        try:
+            while remaining:
+                data = stream.read(min(STREAM_BUFFER_SIZE, remaining))
+                if not data:
+                    break
+                f.write(data)
+                if hasher:
+                    hasher.update(data)
+                remaining -= len(data)
+        finally:
+            # جزء انقطع في منتصفه يحذف كاملاً ليعاد إرساله من بدايته
+            if remaining:
+                f.truncate(offset)
+                _hashers.pop(upload_id, None)
+        if remaining:
+            raise UploadError('انقطع إرسال الجزء قبل اكتماله', 400, offset)
+        f.flush()
+        meta['offset'] = offset + length
+
+        if hasher:
+            _hashers[upload_id] = (meta['offset'], hasher)
+        else:
+            # الأجزاء السابقة كتبها عامل آخر: الهاش يحسب مرة واحدة عند الاكتمال
+            _hashers.pop(upload_id, None)
+        if meta['offset'] == meta['size']:
+            meta['sha256'] = hasher.hexdigest() if hasher else _file_sha256(part_path)
+            _hashers.pop(upload_id, None)
+            UPLOAD_SIZE.observe(meta['size'], endpoint='resumable_upload')
+        _write_meta(upload_id, meta)
+    return meta
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(STREAM_BUFFER_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def cancel_upload(upload_id, owner):
+    get_upload(upload_id, owner)
+    _remove(upload_id)
+
+def _remove(upload_id):
+    _hashers.pop(upload_id, None)
+    for path in _paths(upload_id):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+def claim_upload(upload_id, owner, destination):
+    """نقل رفع مكتمل إلى destination (دون نسخ على نفس القرص) وإرجاع بياناته
+
+    يرجع dict فيه filename (الاسم الأصلي) و size و sha256.
+    """
+    meta = get_upload(upload_id, owner, complete=True)
+    _, part_path = _paths(upload_id)
+    os.makedirs(os.path.dirname(destination) or '.', exist_ok=True)
+    shutil.move(part_path, destination)
+    _remove(upload_id)
+    return meta
+
+def sweep_uploads(max_age=None):
+    """حذف الرفوع غير المكتملة أو غير المستلمة الأقدم من UPLOAD_EXPIRY_HOURS"""
+    directory = _upload_dir()
+    if not os.path.isdir(directory):
+        return 0
+    max_age = max_age if max_age is not None else current_app.config['UPLOAD_EXPIRY_HOURS'] * 3600
+    cutoff = time.time() - max_age
+    removed = 0
+    for name in os.listdir(directory):
+        upload_id, _ = os.path.splitext(name)
+        if not _UPLOAD_ID_PATTERN.match(upload_id):
+            continue
+        try:
+            if os.path.getmtime(os.path.join(directory, name)) < cutoff:
+                os.remove(os.path.join(directory, name))
+                removed += name.endswith('.json')
+        except FileNotFoundError:
+            pass
+    return removed
+
+def file_size(file):
+    """حجم ملف مرفوع (FileStorage) دون قراءته في الذاكرة"""
+    stream = file.stream
+    position = stream.tell()
+    stream.seek(0, os.SEEK_END)
+    size = stream.tell()
+    stream.seek(position)
+    return size
+
+TOO_LARGE_PAGE = '''<!DOCTYPE html>
+<html lang="ar" dir="rtl"><head><meta charset="utf-8"><title>الملف كبير جداً</title></head>
+<body style="font-family: sans-serif; text-align: center; padding: 3rem;">
+<h1>الملف كبير جداً</h1>
+<p>حجم الطلب أكبر من {limit}MB.</p>
+<p><a href="javascript:history.back()">رجوع</a></p>
+</body></html>'''
+
+def _check_request_size():
+    """رفض الطلب الأكبر من MAX_CONTENT_LENGTH قبل قراءة جسمه وقبل فحص الصلاحية أو أي استعلام"""
+    limit = current_app.config.get('MAX_CONTENT_LENGTH')
+    if limit and request.content_length and request.content_length > limit:
+        raise RequestEntityTooLarge()
+
+@click.command('sweep-uploads')
+@with_appcontext
+def sweep_uploads_command():
+    """حذف الرفوع المؤقتة المنتهية من UPLOAD_DIR"""
+    print(f"تم حذف {sweep_uploads()} رفع منتهٍ")
+
+def _too_large(error):
+    limit = (current_app.config.get('MAX_CONTENT_LENGTH') or 0) // (1024 * 1024)
+    if request.accept_mimetypes.best == 'text/html':
+        return Response(TOO_LARGE_PAGE.format(limit=limit), status=413, mimetype='text/html')
+    message = f'حجم الطلب أكبر من {limit}MB'
+    return jsonify({'success': False, 'error': message, 'message': message}), 413
+
+def init_app(app):
+    """إعدادات الرفع: UPLOAD_DIR و UPLOAD_MAX_SIZE و UPLOAD_CHUNK_SIZE و UPLOAD_EXPIRY_HOURS"""
+    app.config.setdefault('UPLOAD_DIR', '')
+    if not app.config['UPLOAD_DIR']:
+        app.config['UPLOAD_DIR'] = os.path.join(app.instance_path, 'uploads')
+    app.config.setdefault('UPLOAD_MAX_SIZE', 2048 * 1024 * 1024)
+    app.config.setdefault('UPLOAD_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+    app.config.setdefault('UPLOAD_EXPIRY_HOURS', 24)
+    app.before_request(_check_request_size)
+    app.register_error_handler(RequestEntityTooLarge, _too_large)
+    app.cli.add_command(sweep_uploads_command)
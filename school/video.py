@@ -0,0 +1,235 @@
+"""معالجة فيديو الأنشطة في الخلفية: صورة مصغرة ممثلة للفيديو، ومدته ودقته، ونسخ MP4 للمتصفح
+
+رفع الفيديو يحفظ الملف ويسجل ActivityMedia بحالة pending فقط فيرجع الطلب فوراً، ثم يعالجه خيط
+في نفس العامل (MEDIA_WORKER=thread، الافتراضي) أو عملية منفصلة بالأمر:
+
+    flask --app app process-media --watch
+
+الصورة المصغرة من أفضل إطار بين عدة مواضع في الفيديو (لا من الثانية الأولى التي تكون غالباً سوداء
+أو غير موجودة في المقاطع القصيرة)، مصغرة إلى مقاس بطاقات المعرض.
+"""
+import os
+import threading
+import time
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from .images import describe_image
+from .media import media_file_path
+from .metrics import MEDIA_PROCESSING, observe_duration
+from .models import db, ActivityMedia
+from .storage import release_file, store_file, temp_path
+from .transcode import make_web_variants
+
+# مواضع الإطارات المرشحة كنسبة من طول الفيديو
+SAMPLE_POSITIONS = (0.1, 0.25, 0.4, 0.55, 0.7)
+# إذا لم يعرف عدد الإطارات: إطار كل SEQUENTIAL_STEP من أول SEQUENTIAL_FRAMES إطار
+SEQUENTIAL_FRAMES = 300
+SEQUENTIAL_STEP = 30
+# الإطار الأغمق من هذا المتوسط (0-255) أو الأقل تبايناً منه يعتبر فارغاً (شاشة سوداء أو لون واحد)
+BLACK_FRAME_MEAN = 20
+FLAT_FRAME_STDDEV = 12
+# بطاقات معرض الأنشطة بارتفاع 192 بكسل: 640×360 تكفي لشاشات 2x
+THUMBNAIL_SIZE = (640, 360)
+THUMBNAIL_QUALITY = 80
+
+# حالات ActivityMedia.processing_status (None للصور)
+STATUS_PENDING = 'pending'
+STATUS_PROCESSING = 'processing'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+# فترة فحص الفيديوهات المعلقة في process-media --watch (ثوانٍ)
+WATCH_INTERVAL = 10
+
+_wakeup = threading.Event()
+_worker_pid = None
+
+def _frame_score(frame):
+    """(غير فارغ، التباين) لإطار مصغر؛ الإطار الأكثر تبايناً أكثر تمثيلاً للفيديو"""
+    import cv2
+    height, width = frame.shape[:2]
+    small = cv2.resize(frame, (160, max(1, height * 160 // width)), interpolation=cv2.INTER_AREA)
+    mean, stddev = cv2.meanStdDev(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY))
+    mean, stddev = float(mean[0][0]), float(stddev[0][0])
+    return mean >= BLACK_FRAME_MEAN and stddev >= FLAT_FRAME_STDDEV, stddev
+
+def pick_frame(frames):
+    """أفضل إطار غير فارغ، أو الأكثر تبايناً إذا كانت كلها فارغة"""
+    if not frames:
+        return None
+    return max(frames, key=_frame_score)
+
+def scale_frame(frame, size=THUMBNAIL_SIZE):
+    """تصغير الإطار ليدخل في size مع الحفاظ على النسبة (دون تكبير)"""
+    import cv2
+    height, width = frame.shape[:2]
+    ratio = min(size[0] / width, size[1] / height, 1)
+    if ratio == 1:
+        return frame
+    return cv2.resize(frame, (max(1, round(width * ratio)), max(1, round(height * ratio))), interpolation=cv2.INTER_AREA)
+
+def analyze_video(path):
+    """(إطار الصورة المصغرة أو None، المدة بالثواني أو None، العرض، الارتفاع)"""
+    import cv2
+    video = cv2.VideoCapture(path)
+    if not video.isOpened():
+        raise ValueError(f'تعذر فتح الفيديو: {path}')
+    try:
+        width = int(video.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(video.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        fps = video.get(cv2.CAP_PROP_FPS)
+        frame_count = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
+        duration = frame_count / fps if fps > 0 and frame_count > 0 else None
+
+        frames = []
+        if frame_count > 0:
+            # مواضع مختلفة للمقاطع القصيرة جداً قد تكون نفس الإطار
+            for index in sorted({min(int(frame_count * position), frame_count - 1) for position in SAMPLE_POSITIONS}):
+                video.set(cv2.CAP_PROP_POS_FRAMES, index)
+                ok, frame = video.read()
+                if ok:
+                    frames.append(frame)
+        if not frames:
+            # عدد الإطارات غير معروف أو القفز غير مدعوم (بعض ملفات AVI و MOV): القراءة بالتسلسل
+            video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            for index in range(SEQUENTIAL_FRAMES):
+                ok, frame = video.read()
+                if not ok:
+                    break
+                if index % SEQUENTIAL_STEP == 0:
+                    frames.append(frame)
+    finally:
+        video.release()
+
+    frame = pick_frame(frames)
+    if frame is not None and not (width and height):
+        height, width = frame.shape[:2]
+    return (scale_frame(frame) if frame is not None else None), duration, width or None, height or None
+
+def process_video(media_id):
+    """تحليل فيديو واحد وحفظ صورته المصغرة ومدته ودقته؛ يرجع False إذا حذف الفيديو أثناء المعالجة"""
+    import cv2
+    media = db.session.get(ActivityMedia, media_id)
+    if media is None:
+        return False
+    path = media_file_path('activity_file', media.file_path)
+    # القراءة دون إبقاء معاملة مفتوحة أثناء التحليل
+    db.session.commit()
+
+    with observe_duration(MEDIA_PROCESSING, operation='video_thumbnail'):
+        frame, duration, width, height = analyze_video(path)
+        thumbnail_file = None
+        if frame is not None:
+            thumbnail_file = temp_path('activity_file', '.jpg')
+            cv2.imwrite(thumbnail_file, frame, [cv2.IMWRITE_JPEG_QUALITY, THUMBNAIL_QUALITY, cv2.IMWRITE_JPEG_OPTIMIZE, 1])
+
+    # نسخ MP4 للمتصفح؛ فشلها لا يمنع حفظ الصورة المصغرة (المعرض يعرض الأصل)
+    variants = {}
+    with observe_duration(MEDIA_PROCESSING, operation='video_transcode'):
+        try:
+            variants = make_web_variants(path, duration, width, height)
+        except Exception as e:
+            print(f"خطأ في تحويل الفيديو {media_id}: {e}")
+
+    media = db.session.get(ActivityMedia, media_id)
+    if media is None:
+        for temp_file in [thumbnail_file, *variants.values()]:
+            if temp_file:
+                os.remove(temp_file)
+        return False
+    if thumbnail_file:
+        old_thumbnail = media.thumbnail_path
+        media.thumbnail_path = store_file('activity_file', thumbnail_file, 'thumb.jpg')
+        describe_image('activity_file', media.thumbnail_path)
+        release_file('activity_file', old_thumbnail)
+    for name, column in (('web', 'web_path'), ('low', 'web_low_path')):
+        old_path = getattr(media, column)
+        setattr(media, column, store_file('activity_file', variants[name], 'video.mp4') if name in variants else None)
+        release_file('activity_file', old_path)
+    media.duration = duration
+    media.width = width
+    media.height = height
+    media.processing_status = STATUS_DONE
+    db.session.commit()
+    return True
+
+def claim_next():
+    """حجز أقدم فيديو معلق لهذا العامل (تحديث ذري فلا يعالجه عاملان)؛ يرجع معرفه أو None"""
+    table = ActivityMedia.__table__
+    next_id = db.select(table.c.id).where(table.c.processing_status == STATUS_PENDING).order_by(table.c.id).limit(1).scalar_subquery()
+    media_id = db.session.execute(
+        table.update()
+        .where(table.c.id == next_id, table.c.processing_status == STATUS_PENDING)
+        .values(processing_status=STATUS_PROCESSING)
+        .returning(table.c.id)
+    ).scalar()
+    db.session.commit()
+    return media_id
+
+def run_pending(limit=None):
+    """معالجة الفيديوهات المعلقة حتى تنتهي (أو limit فيديو)؛ يرجع عدد ما عولج"""
+    processed = 0
+    while limit is None or processed < limit:
+        media_id = claim_next()
+        if media_id is None:
+            break
+        try:
+            process_video(media_id)
+        except Exception as e:
+            db.session.rollback()
+            print(f"خطأ في معالجة الفيديو {media_id}: {e}")
+            db.session.execute(db.update(ActivityMedia).where(ActivityMedia.id == media_id).values(processing_status=STATUS_FAILED))
+            db.session.commit()
+        processed += 1
+    return processed
+
+def _worker_loop(app):
+    while True:
+        _wakeup.wait()
+        _wakeup.clear()
+        with app.app_context():
+            try:
+                run_pending()
+            except Exception as e:
+                print(f"خطأ في عامل معالجة الفيديو: {e}")
+
+def _ensure_worker(app):
+    """تشغيل خيط المعالجة مرة واحدة في كل عملية (بعد تفرع عمال gunicorn)"""
+    global _worker_pid
+    if _worker_pid != os.getpid():
+        _worker_pid = os.getpid()
+        threading.Thread(target=_worker_loop, args=(app,), daemon=True, name='video-worker').start()
+
+def schedule_processing():
+    """تنبيه عامل المعالجة بعد حفظ فيديو جديد بحالة pending (بعد commit)"""
+    if current_app.config['MEDIA_WORKER'] != 'thread':
+        return
+    _ensure_worker(current_app._get_current_object())
+    _wakeup.set()
+
+@click.command('process-media')
+@click.option('--watch', is_flag=True, help='الاستمرار في معالجة الفيديوهات الجديدة (عامل منفصل)')
+@click.option('--retry', is_flag=True, help='إعادة محاولة الفيديوهات التي فشلت أو توقفت معالجتها')
+@click.option('--all', 'reprocess_all', is_flag=True, help='إعادة معالجة كل الفيديوهات')
+@with_appcontext
+def process_media_command(watch, retry, reprocess_all):
+    """إنشاء الصور المصغرة وحساب المدة والدقة للفيديوهات المعلقة"""
+    if retry or reprocess_all:
+        query = db.update(ActivityMedia).where(ActivityMedia.media_type == 'فيديو')
+        if not reprocess_all:
+            query = query.where(ActivityMedia.processing_status.in_([STATUS_FAILED, STATUS_PROCESSING]))
+        db.session.execute(query.values(processing_status=STATUS_PENDING))
+        db.session.commit()
+    while True:
+        processed = run_pending()
+        if processed:
+            print(f"تمت معالجة {processed} فيديو")
+        if not watch:
+            break
+        time.sleep(WATCH_INTERVAL)
+
+def init_app(app):
+    """MEDIA_WORKER: 'thread' (خيط في كل عامل ويب) أو 'off' (المعالجة بالأمر process-media فقط)"""
+    app.config.setdefault('MEDIA_WORKER', 'thread')
+    app.cli.add_command(process_media_command)
@@ -0,0 +1,16 @@
+/** @type {import('tailwindcss').Config} */
+module.exports = {
+  content: [
+    './templates/**/*.html',
+    './school/**/*.py',
+  ],
+  safelist: [
+    // أصناف تبنى ديناميكياً داخل القوالب
+    'text-red-600',
+    'text-green-600',
+  ],
+  theme: {
+    extend: {},
+  },
+  plugins: [],
+}
@@ -0,0 +1,26 @@
+"""إعداد الاختبارات: تطبيق بقاعدة بيانات مؤقتة وجلسات في الكوكي حتى لا تلمس ملفات instance
+
+تشغل من مجلد المشروع (مسارات assets نسبية): python -m pytest -q
+"""
+import pytest
+from school import create_app
+from school.models import db
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "school.db"}',
+        'SESSION_BACKEND': 'cookie',
+        'RATE_LIMIT_ENABLED': False,
+        'MEDIA_WORKER': 'off',
+    })
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,57 @@
+import io
+import pytest
+from PIL import Image, ImageCms
+from school.helpers import compress_image
+from school.models import db
+
+SRGB_PROFILE = ImageCms.ImageCmsProfile(ImageCms.createProfile('sRGB')).tobytes()
+
+
+@pytest.mark.parametrize('mode, keeps_profile', [('RGB', True), ('CMYK', False)])
+def test_icc_profile_kept_only_without_mode_conversion(tmp_path, mode, keeps_profile):
+    source = io.BytesIO()
+    Image.new(mode, (1200, 900)).save(source, 'JPEG', icc_profile=SRGB_PROFILE)
+    source.seek(0)
+    destination = tmp_path / 'out.jpg'
+    assert compress_image(source, str(destination))
+    with Image.open(destination) as img:
+        assert img.mode == 'RGB'
+        assert img.size == (800, 600)
+        assert (img.info.get('icc_profile') == SRGB_PROFILE) is keeps_profile
+
+
+@pytest.fixture
+def news_image(app, monkeypatch, tmp_path):
+    """صورة خبر مخزنة بسجلها دون مقاسات (كالصور المرفوعة قبل describe-images)"""
+    from school import media
+    from school.storage import store_file
+    monkeypatch.setitem(media.MEDIA_DIRECTORIES, 'news_image', str(tmp_path / 'news'))
+    source = tmp_path / 'upload.jpg'
+    Image.new('RGB', (1200, 900), 'red').save(source, 'JPEG')
+    with app.app_context():
+        filename = store_file('news_image', str(source), 'upload.jpg', process=compress_image)
+        db.session.commit()
+    return filename
+
+
+def test_image_info_is_refreshed_after_describe_and_delete(app, news_image):
+    from school.images import describe_image, image_info
+    from school.storage import release_file
+    with app.test_request_context():
+        assert image_info('news_image', news_image) is None
+        assert describe_image('news_image', news_image)
+        db.session.commit()
+        assert image_info('news_image', news_image)['width'] == 800
+        release_file('news_image', news_image)
+        db.session.commit()
+        assert image_info('news_image', news_image) is None
+
+
+def test_image_info_cache_is_bounded(app, monkeypatch):
+    from school import images
+    monkeypatch.setattr(images, 'IMAGE_INFO_CACHE_SIZE', 2)
+    monkeypatch.setattr(images, '_image_info', images.OrderedDict())
+    with app.test_request_context():
+        for index in range(5):
+            images.image_info('news_image', f'missing-{index}.jpg')
+    assert list(images._image_info) == [('news_image', 'missing-3.jpg'), ('news_image', 'missing-4.jpg')]
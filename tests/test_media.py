@@ -0,0 +1,60 @@
+"""تقديم ملفات الوسائط من الخادم الأمامي (x-accel و x-sendfile) بأسماء غير لاتينية"""
+import os
+from urllib.parse import unquote
+import pytest
+
+# ملف مادة تعليمية حقيقي في المستودع باسم عربي ومسافات
+MATERIAL = 'material_20250808_152300_اختبار عاشر منهج كامل.pdf'
+
+
+@pytest.mark.parametrize('mode, header', [('x-accel', 'X-Accel-Redirect'), ('x-sendfile', 'X-Sendfile')])
+def test_sendfile_header_is_percent_encoded(app, client, mode, header):
+    app.config['MEDIA_SENDFILE_MODE'] = mode
+    app.config['USE_X_SENDFILE'] = mode == 'x-sendfile'
+    response = client.get(f'/assets/materials/{MATERIAL}')
+    assert response.status_code == 200
+    value = response.headers[header]
+    # الرؤوس تكتب latin-1 في WSGI؛ الاسم العربي غير المرمّز يقطع الاتصال
+    value.encode('latin-1')
+    assert ' ' not in value
+    assert unquote(value).endswith('assets/materials/' + MATERIAL)
+
+
+@pytest.fixture
+def large_file(monkeypatch, tmp_path):
+    """ملف مادة أكبر من حد البصمة الكاملة (الحد مصغر حتى يبقى الاختبار سريعاً)"""
+    from school import media
+    monkeypatch.setitem(media.MEDIA_DIRECTORIES, 'material_file', str(tmp_path))
+    monkeypatch.setattr(media, 'MEDIA_FULL_HASH_LIMIT', 2 * 1024 * 1024)
+    path = tmp_path / 'large.pdf'
+    path.write_bytes(b'a' * 3 * 1024 * 1024)
+    return path
+
+
+def test_sampled_fingerprint_is_weak_and_not_immutable(app, client, large_file):
+    from school.media import media_url
+    with app.test_request_context():
+        assert 'v=' not in media_url('material_file', 'large.pdf')
+    response = client.get('/assets/materials/large.pdf?v=whatever')
+    etag = response.headers['ETag']
+    assert etag.startswith('W/')
+    assert not response.cache_control.immutable
+    assert client.get('/assets/materials/large.pdf', headers={'If-None-Match': etag}).status_code == 304
+
+    # تعديل في وسط الملف (بنفس الحجم) يغير وقت التعديل فيغير البصمة
+    with open(large_file, 'r+b') as f:
+        f.seek(1536 * 1024)
+        f.write(b'b')
+    stat = large_file.stat()
+    os.utime(large_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+    assert client.get('/assets/materials/large.pdf').headers['ETag'] != etag
+
+
+def test_fingerprint_cache_is_bounded(monkeypatch, tmp_path):
+    from school import media
+    monkeypatch.setattr(media, 'MEDIA_FINGERPRINT_CACHE_SIZE', 2)
+    monkeypatch.setattr(media, '_media_fingerprints', media.OrderedDict())
+    for name in ('a', 'b', 'c'):
+        (tmp_path / name).write_bytes(name.encode())
+        assert media.media_fingerprint(str(tmp_path / name))
+    assert list(media._media_fingerprints) == [str(tmp_path / 'b'), str(tmp_path / 'c')]
@@ -0,0 +1,33 @@
+import os
+from school import metrics
+from school.models import db
+
+
+def _counter(client, name):
+    body = client.get('/metrics').get_data(as_text=True)
+    return sum(float(line.rsplit(' ', 1)[1]) for line in body.splitlines() if line.startswith(name + '{'))
+
+
+def test_dead_worker_snapshots_are_archived(app, client, tmp_path):
+    metrics_dir = str(tmp_path / 'metrics')
+    app.config['METRICS_DIR'] = metrics_dir
+    metrics.LOGIN_ATTEMPTS.inc(kind='test', result='ok')
+    metrics.write_snapshot(metrics_dir)
+    before = _counter(client, 'school_login_attempts_total')
+
+    # عامل منتهٍ برقم عملية سيعاد استخدامه
+    pid_file = os.path.join(metrics_dir, '99999.json')
+    os.replace(os.path.join(metrics_dir, f'{os.getpid()}.json'), pid_file)
+    metrics.archive_snapshot(metrics_dir, 99999)
+    assert not os.path.exists(pid_file)
+    assert os.path.exists(os.path.join(metrics_dir, metrics.ARCHIVE_NAME))
+
+    # الأرشيف يبقى مع لقطة العامل الحي فلا تنقص العدادات
+    assert _counter(client, 'school_login_attempts_total') >= 2 * before
+
+
+def test_queries_are_counted_once_per_listener_pair(app, client):
+    with app.app_context():
+        before = sum(metrics.DB_QUERIES.values.values())
+        db.session.execute(db.text('SELECT 1'))
+        assert sum(metrics.DB_QUERIES.values.values()) == before + 1
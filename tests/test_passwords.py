@@ -0,0 +1,35 @@
+import pytest
+from sqlalchemy import event
+from school.models import db, Student
+from school.passwords import hash_student_password, needs_rehash
+
+
+@pytest.mark.parametrize('method', ['scrypt', 'pbkdf2', 'pbkdf2:sha256:50000', 'scrypt:16384:8:1'])
+def test_needs_rehash_compares_normalized_method(app, method):
+    stored = hash_student_password('123456', method)
+    assert not needs_rehash(stored, method)
+    assert needs_rehash(stored, 'pbkdf2:sha256:60000')
+    assert needs_rehash('123456', method)
+
+
+def test_second_login_does_not_rewrite_password(app, client):
+    app.config['STUDENT_PASSWORD_METHOD'] = 'scrypt'
+    with app.app_context():
+        db.session.add(Student(civil_id='300000000001', name='طالب', grade='10', section='1', password='123456'))
+        db.session.commit()
+
+    updates = []
+
+    def count_updates(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith('UPDATE STUDENT'):
+            updates.append(statement)
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', count_updates)
+    form = {'civil_id': '300000000001', 'password': '123456'}
+    assert client.post('/student_login', data=form).status_code == 302
+    assert len(updates) == 1  # النص الصريح يشفر عند أول دخول
+    assert client.post('/student_login', data=form).status_code == 302
+    assert len(updates) == 1
+    with app.app_context():
+        assert db.session.get(Student, '300000000001').password.startswith('scrypt:32768:8:1$')
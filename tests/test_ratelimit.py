@@ -0,0 +1,32 @@
+import pytest
+
+
+@pytest.fixture
+def limited_client(app):
+    app.config['RATE_LIMIT_ENABLED'] = True
+    app.extensions['rate_limiter']['limits']['student_login_civil_id'] = (1, 0.001)
+    return app.test_client()
+
+
+def _exhaust(client, **kwargs):
+    form = {'civil_id': '300000000002', 'password': 'x'}
+    client.post('/student_login', data=form, **kwargs)
+    return client.post('/student_login', data=form, **kwargs)
+
+
+@pytest.mark.parametrize('headers', [
+    {'X-Requested-With': 'XMLHttpRequest'},
+    {'Accept': 'application/json'},
+])
+def test_json_clients_get_json_429(limited_client, headers):
+    response = _exhaust(limited_client, headers=headers)
+    assert response.status_code == 429
+    assert response.is_json
+    assert response.get_json()['retry_after'] == int(response.headers['Retry-After'])
+
+
+def test_browsers_get_html_429(limited_client):
+    response = _exhaust(limited_client, headers={'Accept': 'text/html,application/xhtml+xml,*/*;q=0.8'})
+    assert response.status_code == 429
+    assert response.mimetype == 'text/html'
+    assert 'Retry-After' in response.headers
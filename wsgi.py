@@ -0,0 +1,7 @@
+"""نقطة دخول WSGI للإنتاج
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+from school import create_app
+
+app = create_app()